@@ -1,5 +1,7 @@
 from django import forms
 
+from website.models import Thesis
+
 
 class RejectForm(forms.Form):
     reason_widget = forms.Textarea(attrs={'cols': 40, 'rows': 5})
@@ -9,3 +11,36 @@ class RejectForm(forms.Form):
                              required=True,
                              strip=True,
                              widget=reason_widget)
+
+
+class BulkDecisionForm(forms.Form):
+    APPROVE = "approve"
+    REJECT = "reject"
+
+    action = forms.ChoiceField(choices=((APPROVE, "Genehmigen"),
+                                        (REJECT, "Ablehnen")))
+    theses = forms.ModelMultipleChoiceField(queryset=Thesis.objects.all(),
+                                            to_field_name='surrogate_key')
+    reason = forms.CharField(label="Begründung",
+                             max_length=2000,
+                             required=False,
+                             strip=True,
+                             widget=forms.Textarea(attrs={'cols': 40, 'rows': 2}))
+
+    def clean(self):
+        cleaned_data = super(BulkDecisionForm, self).clean()
+
+        if cleaned_data.get("action") == self.REJECT and not cleaned_data.get("reason"):
+            self.add_error("reason", "Eine Ablehnung braucht eine Begründung.")
+
+        return cleaned_data
+
+    def persist(self, user):
+        """Approve or reject the selected theses, return the changed and the
+        skipped ones"""
+        theses = self.cleaned_data["theses"]
+
+        if self.cleaned_data["action"] == self.APPROVE:
+            return theses.approve(user)
+
+        return theses.reject(user, self.cleaned_data["reason"])
@@ -1,7 +1,9 @@
 from django.test import TestCase, Client
+from django.db.models import F
 from django.urls import reverse
 
 import uuid
+from unittest import mock
 
 from website.models import *
 from website.test.test import ThesisStub, LoggedInTestCase
@@ -83,3 +85,112 @@ class ApprovalTests(TestCase):
         self.assertEqual(1, len(response.context["theses"]))
         self.assertTrue(thesis.is_rejected())
         self.assertEqual(reason, thesis.excom_reject_reason)
+
+    def test_can_search_open_theses(self):
+        response = self.client.get("/approvals/", {"q": "einzelne"})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([self.thesis], list(response.context["theses"]))
+
+        response = self.client.get("/approvals/", {"q": "gibtsnicht"})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(0, len(response.context["theses"]))
+
+
+class BulkDecisionTests(TestCase):
+
+    def setUp(self):
+        user = User(username="prof", password="pass",
+                    initials="PPP", is_excom=True)
+        user.save()
+
+        self.client = Client()
+        self.client.force_login(user)
+
+        supervisor = Supervisor(
+            id="t.prof", first_name="Test", last_name="Prof", initials="TPF")
+        supervisor.save()
+
+        self.theses = [ThesisStub.applied(supervisor) for _ in range(3)]
+        for thesis in self.theses:
+            thesis.save()
+
+    def post(self, **data):
+        data.setdefault("theses", [t.surrogate_key for t in self.theses])
+
+        return self.client.post(reverse('bulk'), data)
+
+    def test_can_approve_several_theses(self):
+        self.theses[0].approve(User.objects.get(username="prof"))
+
+        response = self.post(action="approve")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(self.theses[1:], response.context["changed"])
+        self.assertEqual(self.theses[:1], response.context["skipped"])
+        self.assertEqual(3, Thesis.objects.filter(excom_status=Thesis.EXCOM_APPROVED).count())
+        self.assertEqual({"prof"}, set(Thesis.objects.values_list("excom_chairman", flat=True)))
+        self.assertEqual(1, ExcomChairman.objects.count())
+
+    def test_can_reject_several_theses_with_one_reason(self):
+        self.theses[0].approve(User.objects.get(username="prof"))
+        self.theses[1].reject(User.objects.get(username="prof"), "Früher")
+
+        response = self.post(action="reject", reason="Ein Grund")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(self.theses[2:], response.context["changed"])
+        self.assertEqual(self.theses[:2], response.context["skipped"])
+
+        reasons = dict(Thesis.objects.values_list("id", "excom_reject_reason"))
+        self.assertEqual("Früher", reasons[self.theses[1].id])
+        self.assertEqual("Ein Grund", reasons[self.theses[2].id])
+        self.assertTrue(Thesis.objects.get(id=self.theses[2].id).is_rejected())
+
+    def test_theses_decided_in_between_are_skipped(self):
+        save = ExcomChairman.save
+
+        def decide_concurrently(chairman, *args, **kwargs):
+            # another chairman rejects the first thesis after it was read
+            Thesis.objects.filter(id=self.theses[0].id).update(
+                excom_status=Thesis.EXCOM_REJECTED, excom_reject_reason="Anderer Grund",
+                version=F('version') + 1)
+            save(chairman, *args, **kwargs)
+
+        with mock.patch.object(ExcomChairman, 'save', autospec=True, side_effect=decide_concurrently):
+            response = self.post(action="reject", reason="Ein Grund")
+
+        self.assertEqual(self.theses[1:], response.context["changed"])
+        self.assertEqual(self.theses[:1], response.context["skipped"])
+
+        first = Thesis.objects.get(id=self.theses[0].id)
+        self.assertEqual("Anderer Grund", first.excom_reject_reason)
+        self.assertEqual(1, first.version)
+        self.assertEqual([1, 1], [Thesis.objects.get(id=t.id).version for t in self.theses[1:]])
+
+    def test_reject_needs_reason(self):
+        response = self.post(action="reject", reason="  ")
+
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(0, Thesis.objects.exclude(excom_status=Thesis.APPLIED).count())
+
+    def test_batch_is_written_with_single_update(self):
+        # session, user, form lookup, savepoint, select,
+        # chairman upsert (update, insert), thesis update, release
+        with self.assertNumQueries(9):
+            self.post(action="approve")
+
+    def test_get_is_not_allowed(self):
+        response = self.client.get(reverse('bulk'))
+
+        self.assertEqual(405, response.status_code)
+
+
+class BulkDecisionPermissionTests(LoggedInTestCase):
+
+    def test_normal_user_can_not_decide_in_bulk(self):
+        response = self.client.post(reverse('bulk'), {"action": "approve"})
+
+        self.assertEqual(302, response.status_code)
+        self.assertIn("/login/", response.url)
@@ -1,9 +1,12 @@
 from django.shortcuts import render, redirect, reverse, get_object_or_404
 from django.contrib.auth.decorators import user_passes_test
 from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
 
-from website.models import Thesis, User
-from approvals.forms import RejectForm
+from website.models import Thesis, ThesisChanged, User
+from website.forms import CONFLICT_MESSAGE
+from website.queries import query_budget
+from approvals.forms import BulkDecisionForm, RejectForm
 
 
 def is_excom_member(user):
@@ -12,10 +15,16 @@ def is_excom_member(user):
 
 @user_passes_test(is_excom_member, login_url='/accounts/login/')
 @never_cache
+@query_budget()
 def index(request):
-    open_theses = Thesis.objects.exclude(excom_status=Thesis.EXCOM_APPROVED)
+    open_theses = Thesis.objects.with_relations().exclude(
+        excom_status=Thesis.EXCOM_APPROVED)
 
-    context = {'theses': open_theses}
+    query = request.GET.get('q', '')
+    if query:
+        open_theses = open_theses.search(query).order_by('search_rank', 'id')
+
+    context = {'theses': open_theses, 'q': query}
 
     return render(request, 'approvals/index.html', context)
 
@@ -25,7 +34,11 @@ def index(request):
 def approve(request, key):
     thesis = get_object_or_404(Thesis, surrogate_key=key)
 
-    thesis.approve(request.user)
+    try:
+        thesis.approve(request.user)
+    except ThesisChanged:
+        # decided by someone else in the meantime, the list shows the result
+        pass
 
     return redirect(reverse('index'))
 
@@ -38,7 +51,14 @@ def reject(request, key):
     if request.POST:
         form = RejectForm(request.POST)
         if form.is_valid():
-            thesis.reject(request.user, form.cleaned_data["reason"])
+            try:
+                thesis.reject(request.user, form.cleaned_data["reason"])
+            except ThesisChanged:
+                thesis.refresh_from_db()
+                form.add_error(None, CONFLICT_MESSAGE)
+
+                return render(request, 'approvals/reject.html',
+                              {'thesis': thesis, 'form': form}, status=409)
 
             return redirect(reverse('index'))
 
@@ -51,3 +71,25 @@ def reject(request, key):
     }
 
     return render(request, 'approvals/reject.html', context)
+
+
+@user_passes_test(is_excom_member, login_url='/accounts/login/')
+@never_cache
+@require_POST
+def bulk(request):
+    """Approve or reject all selected theses at once"""
+    form = BulkDecisionForm(request.POST)
+
+    if not form.is_valid():
+        return render(request, 'approvals/bulk.html', {'form': form}, status=400)
+
+    changed, skipped = form.persist(request.user)
+
+    context = {
+        'form': form,
+        'approve': form.cleaned_data["action"] == BulkDecisionForm.APPROVE,
+        'changed': changed,
+        'skipped': skipped,
+    }
+
+    return render(request, 'approvals/bulk.html', context)
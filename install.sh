@@ -34,6 +34,7 @@ a2enmod xsendfile
 # make db and folder above it owned by www-data
 python3 manage.py makemigrations
 python3 manage.py migrate
+python3 manage.py createcachetable
 python3 manage.py collectstatic --no-input
 
 cp conf/thesispool.conf /etc/apache2/sites-available/
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import logging
+import os
+import zipfile
+
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from thesispool.pdf import DossierPDF
+from thesispool.render import RenderUnavailable, render_executor
+
+logger = logging.getLogger(__name__)
+
+
+class ZipStream(object):
+    """Write-only, unseekable file for ZipFile: everything written is kept
+    until the next drain()"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class PDFExport(object):
+    """ZIP archive of the given PDF types for each thesis, generated while
+    it is sent.
+
+    Iterating yields the archive in chunks. Each thesis only gets the forms
+that apply to it, as in its dossier. PDFs are rendered in the render
+    pool, at most WORKERS at a time, and added in the order they are done.
+    Only the chunk of a single PDF that is currently copied is held in
+    memory. PDFs that could not be rendered are listed in FEHLER.txt at the
+    end of the archive. progress is called with the number of PDFs done.
+    """
+    CHUNK_SIZE = 64 * 1024
+    ERROR_FILE = "FEHLER.txt"
+
+    def __init__(self, theses, pdf_types, executor=render_executor, progress=None):
+        self.theses = theses
+        self.pdf_types = pdf_types
+        self.executor = executor
+        self.progress = progress
+
+    def pdfs(self):
+        for thesis in self.theses:
+            applicable = DossierPDF.pdf_types(thesis)
+
+            for pdf_type in self.pdf_types:
+                if pdf_type in applicable:
+                    yield pdf_type(thesis)
+
+    def count(self):
+        """Number of PDFs in the archive, including failed ones"""
+        return sum(1 for _ in self.pdfs())
+
+    def rendered(self):
+        """(pdf, PDFInfo or exception) in the order renders finish"""
+        pdfs = self.pdfs()
+        window = self.executor.config.get('WORKERS', 4)
+        timeout = self.executor.config.get('TIMEOUT', 30)
+        running = {}
+        exhausted = False
+
+        while True:
+            while not exhausted and len(running) < window:
+                pdf = next(pdfs, None)
+                if pdf is None:
+                    exhausted = True
+                    break
+
+                try:
+                    running[self.executor.submit_when_free(timeout, pdf.get)] = pdf
+                except RenderUnavailable as e:
+                    yield pdf, e
+
+            if not running:
+                return
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                pdf = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # a single broken form must not cut off the archive
+                    result = e
+
+                yield pdf, result
+
+    def __iter__(self):
+        return (chunk for chunk in self.archive() if chunk)
+
+    def archive(self):
+        stream = ZipStream()
+        names = set()
+        failed = []
+
+        with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as archive:
+            for done, (pdf, result) in enumerate(self.rendered(), 1):
+                if self.progress is not None:
+                    self.progress(done)
+
+                if isinstance(result, Exception):
+                    logger.warning("Exporting %s of thesis %s failed: %s",
+                                   pdf.form_name, pdf.thesis.surrogate_key, result)
+                    failed.append("{0} {1}: {2}".format(pdf.form_name, pdf.thesis.student.id, result))
+                    continue
+
+                with open(result.path, "rb") as source, \
+                        archive.open(self.unique(result.filename, names), "w") as target:
+                    for chunk in iter(lambda: source.read(self.CHUNK_SIZE), b""):
+                        target.write(chunk)
+                        yield stream.drain()
+
+                yield stream.drain()
+
+            if failed:
+                archive.writestr(self.ERROR_FILE, "\n".join(failed) + "\n")
+
+        yield stream.drain()
+
+    def unique(self, filename, names):
+        """filename, numbered if a student has more than one thesis"""
+        name, extension = os.path.splitext(filename)
+        candidate, number = filename, 1
+
+        while candidate in names:
+            number += 1
+            candidate = "{0}_{1}{2}".format(name, number, extension)
+
+        names.add(candidate)
+
+        return candidate
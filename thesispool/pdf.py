@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import subprocess
-import tempfile
 import os
 import math
 from thesispool.settings import BASE_DIR
+from thesispool.pdf_cache import pdf_cache
+from thesispool.pdf_engine import pdf_engine
+from thesispool.pdf_fields import field_maps
+from thesispool.render import render_executor
+from thesispool.scratch import scratch_space
 from datetime import datetime
 
 
@@ -43,14 +46,16 @@ class XFDF(object):
         field_str = '<field name="{0}">\n' \
                     '<value>{1}</value>\n' \
                     '</field>'
-        fields = [field_str.format(t, v) for t, v in self.fields.items()]
+        fields = [field_str.format(self._escape(t), v) for t, v in self.fields.items()]
         return "\n".join(fields)
 
     def add_field(self, key, value):
         """adds value to field; convert xml-used chars to their entity-equivalents"""
+        self.fields[key] = self._escape(value)
+
+    def _escape(self, value):
         value = str(value).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        value = value.replace("'", "&apos;").replace("\"", "&quot;")
-        self.fields[key] = value
+        return value.replace("'", "&apos;").replace("\"", "&quot;")
 
     def generate(self):
         return self._header() + self._fields() + self._footer()
@@ -69,7 +74,6 @@ class AbstractPDF(object):
     Override with name of form that should be used for populating
     form fields with data from the thesis instance.
     """
-    TMP_DIR = "/tmp/thesispool"
     BASE_PDF = os.path.join(BASE_DIR, 'website/pdf/{0}.pdf')
 
     def __init__(self, thesis, form_name):
@@ -85,157 +89,144 @@ class AbstractPDF(object):
         """Generate PDF file from Thesis instance.
 
         Creates an XFDF file with all fields populated from a Thesis
-        instance and runs pdftk to merge it with the base PDF to fill
-        all form fields. Result is written to tempdir.
+        instance and lets the form engine (pdftk by default, see
+        settings.PDF_ENGINE) merge it with the base PDF to fill all form
+        fields. Result is written to tempdir, PDFs generated before from
+        the same XFDF and base PDF are taken from the cache.
 
         Returns the absolute path of the generated pdf without suffix.
         """
         if not self.__generated_pdf:
-            self.__ensure_temp_dir_exists()
-
+            engine = pdf_engine()
             xfdf = self._generate_xfdf()
-            xfdf_path = self.__write_xfdf_to_tmp(xfdf)
+            key = self._cache_key(engine, xfdf)
+            pdf_path = pdf_cache.get(key)
+
+            if pdf_path is None:
+                self.__ensure_temp_dir_exists()
+
+                if engine.streams:
+                    # written once, to the cache or the scratch space
+                    data = render_executor.run(engine.render, self.input_pdf_path, xfdf)
+                    pdf_path = pdf_cache.write(key, data) or scratch_space.write(data)
+                else:
+                    pdf_path = render_executor.run(engine.fill, self.input_pdf_path,
+                                                   xfdf, scratch_space.directory)
+
+                    if os.path.exists(pdf_path):
+                        pdf_path = pdf_cache.put(key, pdf_path)
+
+                scratch_space.sweep_if_due()
 
-            self.__generated_pdf = self.__run_pdftk(xfdf_path)
+            self.__generated_pdf = self.__generate_pdf_info(pdf_path)
 
         return self.__generated_pdf
 
+    def _cache_key(self, engine, xfdf=None):
+        if xfdf is None:
+            xfdf = self._generate_xfdf()
+
+        return pdf_cache.key(self.form_name, self.input_pdf_path,
+                             xfdf.generate(), engine.name)
+
     def __ensure_temp_dir_exists(self):
-        os.makedirs(self.TMP_DIR, exist_ok=True)
+        os.makedirs(scratch_space.directory, exist_ok=True)
 
     def _generate_xfdf(self):
-        """Generate XFDF data used in PDF form data population"""
+        """Generate XFDF data used in PDF form data population, only with the
+        fields the form has (see thesispool.pdf_fields)"""
         xfdf = XFDF("On")
 
-        # certain fields are similar, field names in pdfs differ individually
-        xfdf.add_field("Name, Vorname", self.thesis.student.last_name + ", " + self.thesis.student.first_name)
-        xfdf.add_field("Beginn der Arbeit",
-                       self.__date_format(self.thesis.begin_date))
-        xfdf.add_field("Beginn_Arbeit",
-                       self.__date_format(self.thesis.begin_date))
-        xfdf.add_field("Abgabedatum",
-                       self.__date_format(self.thesis.due_date))
-        xfdf.add_field("Ende_Arbeit",
-                       self.__date_format(self.thesis.due_date))
-        xfdf.add_field("Datum_urspruengliche_Abgabe",
-                       self.__date_format(self.thesis.due_date))
-        xfdf.add_field("Matrikelnr", self.thesis.student.id)
-        xfdf.add_field("Matrikelnummer", self.thesis.student.id)
-        xfdf.add_field("Thema_der_Arbeit", self.thesis.title)
-        xfdf.add_field("Kurztitel der Arbeit", self.thesis.title)
-        xfdf.add_field("Email", self.thesis.student_contact)
+        for name, value in field_maps.get(self.form_name).fields(self._values()):
+            xfdf.add_field(name, value)
+
+        return xfdf
+
+    def _values(self):
+        """Values shown in the forms, named as in FORM_FIELDS"""
+        values = {}
+
+        values["student_name"] = self.thesis.student.last_name + ", " + self.thesis.student.first_name
+        values["begin_date"] = self.__date_format(self.thesis.begin_date)
+        values["due_date"] = self.__date_format(self.thesis.due_date)
+        values["student_id"] = self.thesis.student.id
+        values["title"] = self.thesis.title
+        values["email"] = self.thesis.student_contact
 
         if self.thesis.thesis_program in ["IB", "CSB", "UIB", "IMB", "IM"]:
-            xfdf.add_field("Fakultät Studiengang", "Fakultät für Informatik / " + self.thesis.thesis_program)
-            xfdf.add_field("Fakultät_Studiengang", "Fakultät für Informatik / " + self.thesis.thesis_program)
-            xfdf.add_field("Kurzzeichen_Fakultät", "I")
-            xfdf.add_field("Fakultät", "I")
+            values["faculty_program"] = "Fakultät für Informatik / " + self.thesis.thesis_program
+            values["faculty"] = "I"
 
-        xfdf.add_field("Kurzzeichen1", self.thesis.supervisor.initials)
-        xfdf.add_field("Kurzzeichen_erst", self.thesis.supervisor.initials)
-        xfdf.add_field("Kurzzeichen_Prof", self.thesis.supervisor.initials)
-        xfdf.add_field("Name Erstprüfer", self.thesis.supervisor.short_name)
-        xfdf.add_field("Hochschullehrer/in", self.thesis.supervisor.short_name)
+        values["supervisor_initials"] = self.thesis.supervisor.initials
+        values["supervisor_name"] = self.thesis.supervisor.short_name
 
         if self.thesis.is_master():
-            xfdf.add_field("Auswahl_Arbeit", "1")
-            xfdf.add_field("Wahlt_Arbeit", "Masterarbeit")
+            values["thesis_kind"] = "1"
+            values["thesis_kind_name"] = "Masterarbeit"
         else:
-            xfdf.add_field("Auswahl_Arbeit", "0")
-            xfdf.add_field("Wahlt_Arbeit", "Bachelor")
+            values["thesis_kind"] = "0"
+            values["thesis_kind_name"] = "Bachelor"
 
         if self.thesis.assessor:
-            xfdf.add_field("Name Zweitprüfer", self.thesis.assessor.short_name)
-            xfdf.add_field("Zweitkorrektor/in", self.thesis.assessor.short_name)
+            values["assessor_name"] = self.thesis.assessor.short_name
             if self.thesis.assessor.academic_title is not None:
-                xfdf.add_field("Zweitkorrektor/in", self.thesis.assessor.short_name + ', ' + 
-                		self.thesis.assessor.academic_title)
-                xfdf.add_field("Name Zweitprüfer", self.thesis.assessor.short_name + ', ' +
-                               self.thesis.assessor.academic_title)
+                values["assessor_name"] = self.thesis.assessor.short_name + ', ' + \
+                    self.thesis.assessor.academic_title
 
         if self.thesis.external:
             if self.form_name == "bewertung":
-                xfdf.add_field("Ort_der_Arbeit", "0")
+                values["location"] = "0"
             else:
-                xfdf.add_field("Ort_der_Arbeit", "außer_Hause")
+                values["location"] = "außer_Hause"
 
         else:
             if self.form_name == "bewertung":
-                xfdf.add_field("Ort_der_Arbeit", "1")
+                values["location"] = "1"
             else:
-                xfdf.add_field("Ort_der_Arbeit", "im Hause")
+                values["location"] = "im Hause"
 
         if self.thesis.grade:
             grade = ('%.1f' % self.thesis.grade).replace('.', ',')
-            xfdf.add_field("Note Erstprüfer", grade)
+            values["grade"] = grade
             if self.thesis.assessor_grade is not None:
                 assessor_grade = ('%.1f' % self.thesis.assessor_grade).replace('.', ',')
-                xfdf.add_field("Note Zweitprüfer", assessor_grade)
+                values["assessor_grade"] = assessor_grade
                 grade = math.floor(((self.thesis.grade + self.thesis.assessor_grade) / 2) * 10) / 10
                 grade = str(grade).replace('.', ',')
-            xfdf.add_field("Gesamtnote", grade)
+            values["final_grade"] = grade
 
         if self.thesis.external_where:
-            xfdf.add_field("Adresse_der_Firma", self.thesis.external_where)
+            values["company_address"] = self.thesis.external_where
 
         if self.thesis.is_prolonged():
-            xfdf.add_field("Begründung_Antrag",
-                           self.thesis.prolongation_reason)
-            # Typo in "Syomtome" is intentional
-            xfdf.add_field("Symtome / Auswirkung",
-                           self.thesis.prolongation_reason)
-            xfdf.add_field("Zeitraum_Verlängerung",
-                           self.thesis.prolongation_weeks)
-            xfdf.add_field("Zeitraum", "Wochen")
-            xfdf.add_field("Datum_neue_Abgabe", self.__date_format(
-                self.thesis.prolongation_date))
-            xfdf.add_field("Datum_neuer Abgabetermin", self.__date_format(
-                self.thesis.prolongation_date))
+            values["prolongation_reason"] = self.thesis.prolongation_reason
+            values["prolongation_weeks"] = self.thesis.prolongation_weeks
+            values["prolongation_unit"] = "Wochen"
+            values["prolongation_date"] = self.__date_format(self.thesis.prolongation_date)
 
             if self.form_name == "bewertung":
-                xfdf.add_field("Datum", self.__date_format(self.thesis.handed_in_date))
+                values["handed_in_date"] = self.__date_format(self.thesis.handed_in_date)
 
             # "mit verlängerung"
-            xfdf.add_field("auswählen", "1")
+            values["punctuality"] = "1"
         else:
             # "termingerecht"
-            xfdf.add_field("auswählen", "0")
+            values["punctuality"] = "0"
 
         if self.thesis.is_late():
             # "verspätet"
-            xfdf.add_field("auswählen", "2")
+            values["punctuality"] = "2"
 
         if self.thesis.examination_date:
-            xfdf.add_field("Datum Kolloquium", self.__date_format(self.thesis.examination_date))
+            values["examination_date"] = self.__date_format(self.thesis.examination_date)
             # "mit Erfolg gehalten"
-            xfdf.add_field("Mit Note", "1")
+            values["examination_passed"] = "1"
 
-        return xfdf
+        return values
 
     def __date_format(self, date):
         return date.strftime("%d.%m.%Y")
 
-    def __write_xfdf_to_tmp(self, xfdf):
-        fd, xfdf_path = tempfile.mkstemp(suffix=".xfdf",
-                                         dir=self.TMP_DIR,
-                                         prefix="gen_")
-
-        os.write(fd, xfdf.generate().encode())
-        os.close(fd)
-
-        return xfdf_path
-
-    def __run_pdftk(self, xfdf_path):
-        """Run pdftk to merge the generated XFDF with all PDF files."""
-        pdf_path = xfdf_path.replace(".xfdf", ".pdf")
-
-        # run pdftk to fill form fields
-        subprocess.run(["pdftk", self.input_pdf_path,
-                        "fill_form", xfdf_path,
-                        "output", pdf_path, "flatten"])
-
-        return self.__generate_pdf_info(pdf_path)
-
     def __generate_pdf_info(self, path):
         today = datetime.now().strftime("%Y%m%d")
         student_id = self.thesis.student.id
@@ -272,3 +263,63 @@ class ProlongIllnessPDF(AbstractPDF):
 
     def __init__(self, thesis):
         super(ProlongIllnessPDF, self).__init__(thesis, 'verlaengerung_krankheit')
+
+
+# PDF types by the names used in request parameters
+PDF_TYPES = {
+    "application": ApplicationPDF,
+    "prolongation": ProlongationPDF,
+    "prolong_illness": ProlongIllnessPDF,
+    "grading": GradingPDF,
+}
+
+
+class DossierPDF(object):
+    """All forms that apply to a thesis joined into one PDF.
+
+    The forms are rendered and joined in a single render job. Prolongation
+    forms are only part of the dossier for prolonged theses, the grading
+    form only for graded ones.
+    """
+    form_name = 'dossier'
+
+    def __init__(self, thesis):
+        self.thesis = thesis
+        self.parts = [pdf_type(thesis) for pdf_type in self.pdf_types(thesis)]
+        self.__generated_pdf = None
+
+    @staticmethod
+    def pdf_types(thesis):
+        pdf_types = [ApplicationPDF]
+
+        if thesis.is_prolonged():
+            pdf_types += [ProlongationPDF, ProlongIllnessPDF]
+
+        if thesis.is_graded():
+            pdf_types.append(GradingPDF)
+
+        return pdf_types
+
+    def get(self):
+        if not self.__generated_pdf:
+            engine = pdf_engine()
+            key = pdf_cache.combined_key(self.form_name,
+                                         [part._cache_key(engine) for part in self.parts])
+            pdf_path = pdf_cache.get(key)
+
+            if pdf_path is None:
+                data = render_executor.run(self.__render, engine)
+                pdf_path = pdf_cache.write(key, data) or scratch_space.write(data)
+
+                scratch_space.sweep_if_due()
+
+            filename = "{0}_{1}_{2}.pdf".format(
+                datetime.now().strftime("%Y%m%d"), self.form_name, self.thesis.student.id)
+
+            self.__generated_pdf = PDFInfo(pdf_path, filename)
+
+        return self.__generated_pdf
+
+    def __render(self, engine):
+        # the parts render inline, this already is a render job
+        return engine.concatenate([part.get().path for part in self.parts])
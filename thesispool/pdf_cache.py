@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+
+class PDFCache(object):
+    """Generated PDFs stored on disk by content hash.
+
+    The key covers the form name, the checksum of the base PDF, the
+    generated XFDF and the form engine, so a changed thesis or template
+    never hits a stale file. Configured by settings.PDF_CACHE: files live in DIR (below
+    SENDFILE_ROOT, so they can be sent directly) and the least recently
+    used files are removed once the cache grows beyond MAX_SIZE bytes.
+    The modification time of a file is its last use, files used within the
+    last MIN_AGE seconds may still be sent and are never evicted.
+    """
+
+    def __init__(self):
+        self._checksums = {}
+        self._lock = threading.Lock()
+
+    @property
+    def config(self):
+        return settings.PDF_CACHE
+
+    @property
+    def enabled(self):
+        return self.config.get('ENABLED', True)
+
+    @property
+    def directory(self):
+        return self.config['DIR']
+
+    def key(self, form_name, base_pdf, xfdf, engine=""):
+        digest = hashlib.sha256()
+        digest.update(engine.encode())
+        digest.update(b"\0")
+        digest.update(form_name.encode())
+        digest.update(b"\0")
+        digest.update(self.checksum(base_pdf).encode())
+        digest.update(b"\0")
+        digest.update(xfdf if isinstance(xfdf, bytes) else xfdf.encode())
+
+        return digest.hexdigest()
+
+    def combined_key(self, name, keys):
+        """Key of a PDF made from the PDFs with the given keys"""
+        digest = hashlib.sha256(name.encode())
+
+        for key in keys:
+            digest.update(b"\0")
+            digest.update(key.encode())
+
+        return digest.hexdigest()
+
+    def checksum(self, path):
+        """sha256 of a file, computed once per version of the file"""
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._checksums.get(path)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+        with open(path, "rb") as f:
+            checksum = hashlib.sha256(f.read()).hexdigest()
+
+        with self._lock:
+            self._checksums[path] = (version, checksum)
+
+        return checksum
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".pdf")
+
+    def get(self, key):
+        """Path of the cached PDF, None if it is not cached"""
+        if not self.enabled:
+            return None
+
+        path = self.path(key)
+
+        try:
+            # mark as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        return path
+
+    def put(self, key, pdf_path):
+        """Move a generated PDF into the cache and return its new path"""
+        if not self.enabled:
+            return pdf_path
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        path = self.path(key)
+        os.replace(pdf_path, path)
+
+        self.evict()
+
+        return path
+
+    def write(self, key, data):
+        """Store a generated PDF, return its path (None if the cache is
+        disabled)"""
+        if not self.enabled:
+            return None
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+
+        return self.put(key, tmp_path)
+
+    def entries(self):
+        """(path, size, last use) of all cached files, oldest first.
+        Files still being written (.tmp) are not part of the cache yet."""
+        entries = []
+
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+
+        for name in names:
+            if not name.endswith(".pdf"):
+                continue
+
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_size=None):
+        """Remove least recently used files until the cache fits into
+        max_size bytes (MAX_SIZE by default), return the number removed.
+        Files used within the last MIN_AGE seconds are kept, even if the
+        cache stays larger."""
+        if max_size is None:
+            max_size = self.config.get('MAX_SIZE', 100 * 1024 * 1024)
+
+        now = time.time()
+        min_age = self.config.get('MIN_AGE', 60)
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for path, size, used in entries:
+            if total <= max_size:
+                break
+            if now - used <= min_age:
+                continue
+
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+
+            total -= size
+
+        return removed
+
+    def clear(self):
+        return self.evict(0)
+
+
+pdf_cache = PDFCache()
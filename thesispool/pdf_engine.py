@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+import subprocess
+import tempfile
+import threading
+
+from xml.sax.saxutils import unescape
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from io import BytesIO
+
+try:
+    import pypdf
+    from pypdf.generic import NameObject
+except ImportError:  # pragma: no cover
+    pypdf = None
+
+
+class RenderError(Exception):
+    """The form engine failed to generate a PDF"""
+    pass
+
+
+class PdftkEngine(object):
+    """Fill PDF forms by running pdftk with the XFDF file.
+
+    With settings.PDFTK_PIPE the XFDF is passed on stdin and the PDF read
+    from stdout, without temporary files.
+    """
+    name = "pdftk"
+
+    @property
+    def streams(self):
+        return settings.PDFTK_PIPE
+
+    @property
+    def timeout(self):
+        """a stuck pdftk is killed after the render timeout"""
+        return settings.PDF_RENDER.get('TIMEOUT', 30)
+
+    def render(self, base_pdf, xfdf):
+        """Merge xfdf into base_pdf, return the flattened PDF"""
+        try:
+            result = subprocess.run(["pdftk", base_pdf,
+                                     "fill_form", "-",
+                                     "output", "-", "flatten"],
+                                    input=xfdf.generate().encode(),
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE,
+                                    timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            raise RenderError("pdftk timed out for {0}".format(base_pdf))
+
+        if result.returncode != 0 or not result.stdout:
+            raise RenderError("pdftk failed for {0}: {1}".format(
+                base_pdf, result.stderr.decode(errors="replace").strip()))
+
+        return result.stdout
+
+    def fill(self, base_pdf, xfdf, directory):
+        """Merge xfdf into base_pdf, return the path of the flattened PDF"""
+        fd, xfdf_path = tempfile.mkstemp(suffix=".xfdf", dir=directory, prefix="gen_")
+
+        os.write(fd, xfdf.generate().encode())
+        os.close(fd)
+
+        pdf_path = xfdf_path.replace(".xfdf", ".pdf")
+
+        try:
+            subprocess.run(["pdftk", base_pdf,
+                            "fill_form", xfdf_path,
+                            "output", pdf_path, "flatten"],
+                           timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            raise RenderError("pdftk timed out for {0}".format(base_pdf))
+        finally:
+            os.remove(xfdf_path)
+
+        return pdf_path
+
+    def concatenate(self, paths):
+        """Join the PDFs at paths into one, return it"""
+        try:
+            result = subprocess.run(["pdftk"] + list(paths) + ["cat", "output", "-"],
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE,
+                                    timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            raise RenderError("pdftk timed out joining {0}".format(", ".join(paths)))
+
+        if result.returncode != 0 or not result.stdout:
+            raise RenderError("pdftk failed joining {0}: {1}".format(
+                ", ".join(paths), result.stderr.decode(errors="replace").strip()))
+
+        return result.stdout
+
+
+class PypdfEngine(object):
+    """Fill and flatten PDF forms in process with pypdf.
+
+    The base PDFs are parsed once and kept in memory, every fill works on a
+    copy. Text fields are drawn with their generated appearance, buttons
+    with the appearance of the state named by the XFDF value.
+    """
+    name = "pypdf"
+    streams = True
+
+    # push buttons (print, save, ...) have no value
+    PUSH_BUTTON = 1 << 16
+
+    def __init__(self):
+        if pypdf is None:
+            raise ImproperlyConfigured("PDF_ENGINE 'pypdf' needs the pypdf package")
+
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def template(self, path):
+        """Parsed base PDF and its fields, reloaded when the file changes"""
+        version = os.stat(path).st_mtime_ns
+
+        with self._lock:
+            cached = self._templates.get(path)
+
+            if cached is None or cached[0] != version:
+                reader = pypdf.PdfReader(path)
+                cached = (version, reader, reader.get_fields() or {})
+                self._templates[path] = cached
+
+            return cached[1], cached[2]
+
+    def values(self, fields, xfdf):
+        """Field values for pypdf: text as is, buttons as state names. Text
+        fields without a value keep the one of the base PDF."""
+        values = {}
+
+        for name, field in fields.items():
+            if field.get('/FT') == '/Btn':
+                if int(field.get('/Ff', 0)) & self.PUSH_BUTTON:
+                    continue
+
+                value = xfdf.fields.get(name)
+                state = self.state(field, value) if value is not None else None
+                values[name] = state or field.get('/V') or '/Off'
+
+            elif name in xfdf.fields:
+                values[name] = unescape(xfdf.fields[name], {"&apos;": "'", "&quot;": '"'})
+
+            else:
+                values[name] = field.get('/V') or ""
+
+        return values
+
+    def state(self, field, value):
+        state = "/" + self.pdf_name(value)
+
+        return state if state in field.get('/_States_', []) else None
+
+    @staticmethod
+    def pdf_name(value):
+        """value as pypdf reads it from a name the forms store in latin-1.
+        pypdf decodes names with the first of NameObject.CHARSETS that fits,
+        for non-ASCII latin-1 this usually is gbk."""
+        try:
+            raw = value.encode("latin-1")
+        except UnicodeError:
+            return value
+
+        for charset in NameObject.CHARSETS:
+            try:
+                return raw.decode(charset)
+            except UnicodeError:
+                continue
+
+        return value
+
+    def render(self, base_pdf, xfdf):
+        reader, fields = self.template(base_pdf)
+
+        with self._lock:
+            writer = pypdf.PdfWriter(clone_from=reader)
+
+        # flatten draws the appearance of every filled widget into its page
+        writer.update_page_form_field_values(None, self.values(fields, xfdf),
+                                             auto_regenerate=False, flatten=True)
+        writer.remove_annotations(subtypes="/Widget")
+        del writer.root_object["/AcroForm"]
+
+        pdf = BytesIO()
+        writer.write(pdf)
+
+        return pdf.getvalue()
+
+    def fill(self, base_pdf, xfdf, directory):
+        fd, pdf_path = tempfile.mkstemp(suffix=".pdf", dir=directory, prefix="gen_")
+
+        with os.fdopen(fd, "wb") as pdf:
+            pdf.write(self.render(base_pdf, xfdf))
+
+        return pdf_path
+
+    def concatenate(self, paths):
+        writer = pypdf.PdfWriter()
+
+        for path in paths:
+            writer.append(path)
+
+        pdf = BytesIO()
+        writer.write(pdf)
+
+        return pdf.getvalue()
+
+
+ENGINES = {
+    'pdftk': PdftkEngine,
+    'pypdf': PypdfEngine,
+}
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def pdf_engine(name=None):
+    """Form filling engine selected by settings.PDF_ENGINE"""
+    name = name or settings.PDF_ENGINE
+
+    with _engines_lock:
+        if name not in _engines:
+            if name not in ENGINES:
+                raise ImproperlyConfigured("Unknown PDF_ENGINE '{0}'".format(name))
+            _engines[name] = ENGINES[name]()
+
+        return _engines[name]
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import logging
+import os
+import shutil
+import subprocess
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+
+from thesispool.settings import BASE_DIR
+
+try:
+    import pypdf
+except ImportError:  # pragma: no cover
+    pypdf = None
+
+logger = logging.getLogger(__name__)
+
+BASE_PDF = os.path.join(BASE_DIR, 'website/pdf/{0}.pdf')
+
+# Form fields of each base PDF in website/pdf/, by the thesis value they
+# show (see AbstractPDF._values). Every field has to exist in its PDF.
+FORM_FIELDS = {
+    'ausgabe': {
+        'student_name': "Name, Vorname",
+        'begin_date': "Beginn_Arbeit",
+        'due_date': "Ende_Arbeit",
+        'student_id': "Matrikelnr",
+        'title': "Thema_der_Arbeit",
+        'email': "Email",
+        'faculty_program': "Fakultät_Studiengang",
+        'supervisor_initials': "Kurzzeichen_erst",
+        'supervisor_name': "Hochschullehrer/in",
+        'thesis_kind': "Auswahl_Arbeit",
+        'assessor_name': "Zweitkorrektor/in",
+        'location': "Ort_der_Arbeit",
+        'company_address': "Adresse_der_Firma",
+    },
+    'bewertung': {
+        'student_name': "Name, Vorname",
+        'begin_date': "Beginn der Arbeit",
+        'due_date': "Abgabedatum",
+        'student_id': "Matrikelnr",
+        'title': "Thema_der_Arbeit",
+        'email': "Email",
+        'faculty_program': "Fakultät_Studiengang",
+        'supervisor_initials': "Kurzzeichen1",
+        'supervisor_name': "Name Erstprüfer",
+        'thesis_kind': "Auswahl_Arbeit",
+        'assessor_name': "Name Zweitprüfer",
+        'location': "Ort_der_Arbeit",
+        'grade': "Note Erstprüfer",
+        'assessor_grade': "Note Zweitprüfer",
+        'final_grade': "Gesamtnote",
+        'handed_in_date': "Datum",
+        'punctuality': "auswählen",
+        'examination_date': "Datum Kolloquium",
+        'examination_passed': "Mit Note",
+    },
+    'verlaengerung': {
+        'student_name': "Name, Vorname",
+        'due_date': "Datum_urspruengliche_Abgabe",
+        'student_id': "Matrikelnummer",
+        'title': "Kurztitel der Arbeit",
+        'email': "Email",
+        'faculty_program': "Fakultät Studiengang",
+        'faculty': "Kurzzeichen_Fakultät",
+        'supervisor_initials': "Kurzzeichen_Prof",
+        'thesis_kind_name': "Wahlt_Arbeit",
+        'prolongation_reason': "Begründung_Antrag",
+        'prolongation_weeks': "Zeitraum_Verlängerung",
+        'prolongation_unit': "Zeitraum",
+        'prolongation_date': "Datum_neue_Abgabe",
+    },
+    'verlaengerung_krankheit': {
+        'student_name': "Name, Vorname",
+        'due_date': "Datum_urspruengliche_Abgabe",
+        'student_id': "Matrikelnummer",
+        'title': "Kurztitel der Arbeit",
+        'email': "Email",
+        'faculty_program': "Fakultät Studiengang",
+        'faculty': "Fakultät",
+        'thesis_kind_name': "Wahlt_Arbeit",
+        # Typo in "Symtome" is intentional
+        'prolongation_reason': "Symtome / Auswirkung",
+        'prolongation_weeks': "Zeitraum_Verlängerung",
+        'prolongation_unit': "Zeitraum",
+        'prolongation_date': "Datum_neuer Abgabetermin",
+    },
+}
+
+
+def template_fields(path):
+    """Names of the form fields of a PDF, None if neither pypdf nor pdftk
+    is available to read them"""
+    if pypdf is not None:
+        return set(pypdf.PdfReader(path).get_fields() or {})
+
+    if shutil.which("pdftk") is not None:
+        result = subprocess.run(["pdftk", path, "dump_data_fields_utf8"],
+                                stdout=subprocess.PIPE, check=True)
+        return {line[len("FieldName: "):]
+                for line in result.stdout.decode().splitlines()
+                if line.startswith("FieldName: ")}
+
+    return None
+
+
+class FieldMap(object):
+    """Fields of one form as (value, field name) pairs"""
+
+    def __init__(self, pairs):
+        self.pairs = tuple(pairs)
+
+    def fields(self, values):
+        """(field name, value) of all fields with a value"""
+        return [(name, values[key]) for key, name in self.pairs if key in values]
+
+
+class FieldMaps(object):
+    """FORM_FIELDS compiled into one FieldMap per form. Forms without an
+    entry get every field of every form."""
+
+    def __init__(self, forms=FORM_FIELDS):
+        self.forms = forms
+        self._maps = {key: FieldMap(fields.items()) for key, fields in forms.items()}
+        self._all = FieldMap(self.all_pairs())
+        self._validated = False
+        self._lock = threading.Lock()
+
+    def all_pairs(self):
+        pairs = []
+
+        for fields in self.forms.values():
+            for pair in fields.items():
+                if pair not in pairs:
+                    pairs.append(pair)
+
+        return pairs
+
+    def get(self, form_name):
+        return self._maps.get(form_name, self._all)
+
+    def validate(self):
+        """Raise ImproperlyConfigured if a base PDF lacks a mapped field"""
+        with self._lock:
+            if self._validated:
+                return
+
+            missing = []
+
+            for form_name, fields in self.forms.items():
+                path = BASE_PDF.format(form_name)
+
+                try:
+                    existing = template_fields(path)
+                except FileNotFoundError:
+                    missing.append("{0} does not exist".format(path))
+                    continue
+
+                if existing is None:
+                    logger.warning("Cannot read form fields without pypdf or pdftk, "
+                                   "the field maps are not validated")
+                    return
+
+                missing += ["{0}: {1}".format(os.path.basename(path), name)
+                            for name in fields.values() if name not in existing]
+
+            if missing:
+                raise ImproperlyConfigured("Form fields missing in the base PDFs: " +
+                                           ", ".join(missing))
+
+            self._validated = True
+
+
+field_maps = FieldMaps()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+from thesispool.pdf_cache import pdf_cache
+from thesispool.render import Saturated, render_executor
+
+logger = logging.getLogger(__name__)
+
+
+def prerender(thesis, *pdf_types):
+    """Render PDFs of a thesis in the background once the current
+    transaction commits, so that downloading them is a cache hit.
+
+    Only with settings.PDF_PRERENDER and the PDF cache enabled.
+    """
+    if not settings.PDF_PRERENDER or not pdf_cache.enabled:
+        return
+
+    model, pk = type(thesis), thesis.pk
+
+    transaction.on_commit(lambda: submit(model, pk, pdf_types))
+
+
+def submit(model, pk, pdf_types):
+    # the committed state with all relations, render jobs must not query
+    # the database
+    thesis = model.objects.with_relations().get(pk=pk)
+
+    for pdf_type in pdf_types:
+        # pre-rendering only uses idle workers, downloads must not wait for it
+        if render_executor.pending >= render_executor.config.get('WORKERS', 4):
+            logger.info("Skipped pre-rendering %s of thesis %s, all workers are busy",
+                        pdf_type.__name__, thesis.surrogate_key)
+            return
+
+        try:
+            future = render_executor.submit(pdf_type(thesis).get)
+        except Saturated:
+            return
+
+        future.add_done_callback(lambda f, name=pdf_type.__name__: log_failure(f, name, thesis))
+
+
+def log_failure(future, name, thesis):
+    if future.exception() is not None:
+        logger.warning("Pre-rendering %s of thesis %s failed: %s",
+                       name, thesis.surrogate_key, future.exception())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import bisect
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+
+
+class RenderUnavailable(Exception):
+    """PDF rendering is not possible right now, retry after some seconds"""
+
+    def __init__(self, message, retry_after):
+        super(RenderUnavailable, self).__init__(message)
+        self.retry_after = retry_after
+
+
+class Saturated(RenderUnavailable):
+    """All workers are busy and the queue is full"""
+    pass
+
+
+class RenderTimeout(RenderUnavailable):
+    """A render job did not finish in time"""
+    pass
+
+
+class Histogram(object):
+    """Durations in seconds, counted in buckets (upper bounds)"""
+    BUCKETS = [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self):
+        buckets = [str(bound) for bound in self.BUCKETS] + ["+Inf"]
+
+        return {'count': self.count,
+                'sum': round(self.sum, 6),
+                'max': round(self.max, 6),
+                'buckets': dict(zip(buckets, self.counts))}
+
+
+class RenderExecutor(object):
+    """Thread pool shared by all PDF renders.
+
+    Configured by settings.PDF_RENDER: at most WORKERS renders run at the
+    same time and QUEUE_SIZE more wait for a worker. Further jobs are
+    rejected with Saturated, callers waiting longer than TIMEOUT seconds
+    get RenderTimeout. Both carry RETRY_AFTER for the client.
+    """
+
+    def __init__(self):
+        self._lock = threading.Condition()
+        self._pool = None
+        self._workers = None
+        self._local = threading.local()
+        self.pending = 0
+        self.reset_stats()
+
+    @property
+    def config(self):
+        return settings.PDF_RENDER
+
+    @property
+    def retry_after(self):
+        return self.config.get('RETRY_AFTER', 5)
+
+    def pool(self):
+        workers = self.config.get('WORKERS', 4)
+
+        with self._lock:
+            if self._pool is None or self._workers != workers:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False)
+                self._pool = ThreadPoolExecutor(max_workers=workers,
+                                                thread_name_prefix="pdf-render")
+                self._workers = workers
+
+            return self._pool
+
+    def submit(self, function, *args, **kwargs):
+        """Queue a render job, raise Saturated if the queue is full"""
+        return self._submit(None, function, args, kwargs)
+
+    def submit_when_free(self, timeout, function, *args, **kwargs):
+        """Queue a render job, wait up to timeout seconds for a free place
+        in the queue before raising Saturated"""
+        return self._submit(timeout, function, args, kwargs)
+
+    def _submit(self, timeout, function, args, kwargs):
+        pool = self.pool()
+        limit = self._workers + self.config.get('QUEUE_SIZE', 16)
+        deadline = time.monotonic() + (timeout or 0)
+
+        with self._lock:
+            while self.pending >= limit:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.rejected += 1
+                    raise Saturated("PDF rendering is saturated", self.retry_after)
+                self._lock.wait(remaining)
+            self.pending += 1
+            self.submitted += 1
+
+        queued = time.monotonic()
+
+        def job():
+            started = time.monotonic()
+            self._local.worker = True
+
+            try:
+                return function(*args, **kwargs)
+            finally:
+                finished = time.monotonic()
+                with self._lock:
+                    self.pending -= 1
+                    self.queue_wait.observe(started - queued)
+                    self.render_time.observe(finished - started)
+                    self._lock.notify()
+
+        return pool.submit(job)
+
+    def run(self, function, *args, **kwargs):
+        """Render in the pool and wait for the result"""
+        if getattr(self._local, 'worker', False):
+            # already inside a render job, waiting for another one could
+            # deadlock the pool
+            return function(*args, **kwargs)
+
+        future = self.submit(function, *args, **kwargs)
+
+        try:
+            return future.result(timeout=self.config.get('TIMEOUT', 30))
+        except TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise RenderTimeout("PDF rendering timed out", self.retry_after)
+
+    def reset_stats(self):
+        with self._lock:
+            self.submitted = 0
+            self.rejected = 0
+            self.timeouts = 0
+            self.queue_wait = Histogram()
+            self.render_time = Histogram()
+
+    def stats(self):
+        with self._lock:
+            return {'workers': self._workers or self.config.get('WORKERS', 4),
+                    'pending': self.pending,
+                    'submitted': self.submitted,
+                    'rejected': self.rejected,
+                    'timeouts': self.timeouts,
+                    'queue_wait': self.queue_wait.as_dict(),
+                    'render_time': self.render_time.as_dict()}
+
+
+render_executor = RenderExecutor()
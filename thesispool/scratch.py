@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+from thesispool.pdf_cache import pdf_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ScratchSpace(object):
+    """Files generated below SENDFILE_ROOT while rendering PDFs.
+
+    Generated files (gen_*) are only needed until X-Sendfile has sent them.
+    Configured by settings.PDF_SCRATCH: a sweep removes generated files
+    older than MAX_AGE seconds and, oldest first, as many as needed to keep
+    generated files and the PDF cache below MAX_SIZE bytes. Files younger
+    than MIN_AGE seconds are never removed. PDF generation triggers a sweep
+    every SWEEP_INTERVAL seconds, "manage.py sweep_pdfs" runs one directly.
+    """
+    PREFIX = "gen_"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_sweep = 0
+        self.reset_stats()
+
+    @property
+    def config(self):
+        return settings.PDF_SCRATCH
+
+    @property
+    def directory(self):
+        return settings.SENDFILE_ROOT
+
+    def files(self):
+        """(path, size, modification time) of all generated files, oldest
+        first"""
+        files = []
+
+        try:
+            entries = os.scandir(self.directory)
+        except FileNotFoundError:
+            return files
+
+        with entries:
+            for entry in entries:
+                if not entry.name.startswith(self.PREFIX) or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((entry.path, stat.st_size, stat.st_mtime))
+
+        return sorted(files, key=lambda f: f[2])
+
+    def usage(self):
+        files = self.files()
+        cached = pdf_cache.entries()
+
+        return {'scratch_files': len(files),
+                'scratch_bytes': sum(size for _, size, _ in files),
+                'cache_files': len(cached),
+                'cache_bytes': sum(size for _, size, _ in cached)}
+
+    def write(self, data, suffix=".pdf"):
+        """Write a generated file, return its path"""
+        os.makedirs(self.directory, exist_ok=True)
+
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=self.directory, prefix=self.PREFIX)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+
+        return path
+
+    def remove(self, path):
+        """Remove a file, return its size (0 if it was already gone)"""
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+
+        return size
+
+    def sweep(self, max_age=None, max_size=None):
+        """Remove stale generated files and shrink everything to max_size
+        bytes, return the number of removed files and bytes"""
+        if max_age is None:
+            max_age = self.config.get('MAX_AGE', 3600)
+        if max_size is None:
+            max_size = self.config.get('MAX_SIZE', 500 * 1024 * 1024)
+
+        now = time.time()
+        min_age = self.config.get('MIN_AGE', 60)
+        removed_files, removed_bytes = 0, 0
+        kept = []
+
+        for path, size, modified in self.files():
+            age = now - modified
+            if age > max_age and age > min_age:
+                removed_bytes += self.remove(path)
+                removed_files += 1
+            else:
+                kept.append((path, size, modified))
+
+        total = sum(size for _, size, _ in kept) + pdf_cache.size()
+
+        for path, size, modified in kept:
+            if total <= max_size:
+                break
+            if now - modified <= min_age:
+                continue
+
+            removed_bytes += self.remove(path)
+            removed_files += 1
+            total -= size
+
+        if total > max_size:
+            scratch_bytes = total - pdf_cache.size()
+            before = pdf_cache.entries()
+            removed_files += pdf_cache.evict(max(max_size - scratch_bytes, 0))
+            removed_bytes += sum(size for _, size, _ in before) - pdf_cache.size()
+
+        with self._lock:
+            self._last_sweep = time.monotonic()
+            self.sweeps += 1
+            self.removed_files += removed_files
+            self.removed_bytes += removed_bytes
+
+        if removed_files:
+            logger.info("Removed %d generated files (%d bytes) from %s",
+                        removed_files, removed_bytes, self.directory)
+
+        return removed_files, removed_bytes
+
+    def sweep_if_due(self):
+        with self._lock:
+            due = time.monotonic() - self._last_sweep > self.config.get('SWEEP_INTERVAL', 300)
+            if due:
+                # claim the sweep, concurrent renders skip it
+                self._last_sweep = time.monotonic()
+
+        if due:
+            try:
+                self.sweep()
+            except OSError:
+                logger.exception("Sweeping %s failed", self.directory)
+
+    def reset_stats(self):
+        self.sweeps = 0
+        self.removed_files = 0
+        self.removed_bytes = 0
+
+    def stats(self):
+        return dict(self.usage(),
+                    sweeps=self.sweeps,
+                    removed_files=self.removed_files,
+                    removed_bytes=self.removed_bytes)
+
+
+scratch_space = ScratchSpace()
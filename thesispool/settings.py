@@ -23,6 +23,58 @@ ALLOWED_HOSTS = [
 SENDFILE_BACKEND = 'django_sendfile.backends.xsendfile'
 SENDFILE_ROOT = '/tmp/thesispool'
 
+# Engine filling the PDF forms (see thesispool.pdf_engine): 'pdftk' runs
+# pdftk per document, 'pypdf' fills them in process (needs pypdf, tested with 6.x)
+PDF_ENGINE = 'pdftk'
+# pass the XFDF to pdftk on stdin and read the PDF from stdout instead of
+# using temporary files
+PDFTK_PIPE = True
+
+# PDFs are rendered by a pool of WORKERS threads (see thesispool.render),
+# QUEUE_SIZE more jobs may wait. Beyond that, and for renders taking longer
+# than TIMEOUT seconds, downloads answer 503 with Retry-After: RETRY_AFTER.
+PDF_RENDER = {
+    'WORKERS': 4,
+    'QUEUE_SIZE': 16,
+    'TIMEOUT': 30,
+    'RETRY_AFTER': 5,
+}
+
+# Generated PDFs are cached by content (see thesispool.pdf_cache), least
+# recently used files are removed when the cache exceeds MAX_SIZE bytes.
+# Files used within the last MIN_AGE seconds may still be sent and are kept.
+PDF_CACHE = {
+    'ENABLED': True,
+    'DIR': os.path.join(SENDFILE_ROOT, 'cache'),
+    'MAX_SIZE': 200 * 1024 * 1024,
+    'MIN_AGE': 60,
+}
+
+# Background render jobs (see website.jobs), run by "manage.py
+# run_render_jobs". Workers look for new jobs every POLL_INTERVAL seconds,
+# results are written to DIR and removed EXPIRE_AFTER seconds after the
+# job finished.
+RENDER_JOBS = {
+    'DIR': os.path.join(SENDFILE_ROOT, 'jobs'),
+    'POLL_INTERVAL': 2,
+    'EXPIRE_AFTER': 24 * 3600,
+}
+
+# Render the form needed next in the background after a thesis is
+# created, prolonged or graded, so that its download is a cache hit
+PDF_PRERENDER = False
+
+# Generated files below SENDFILE_ROOT (see thesispool.scratch) are removed
+# after MAX_AGE seconds, or earlier (but not before MIN_AGE) when they and
+# the PDF cache exceed MAX_SIZE bytes. Sweeps run every SWEEP_INTERVAL
+# seconds while PDFs are generated, or with "manage.py sweep_pdfs".
+PDF_SCRATCH = {
+    'MAX_AGE': 3600,
+    'MIN_AGE': 60,
+    'MAX_SIZE': 500 * 1024 * 1024,
+    'SWEEP_INTERVAL': 300,
+}
+
 # insert generated SECRET_KEY
 SECRET_KEY = ''
 
@@ -94,6 +146,33 @@ DATABASES = {
 
 AUTH_USER_MODEL = 'website.User'
 
+# Where StudentManager reads student records from: 'faculty' queries the
+# faculty DB directly, 'mirror' uses the local copy maintained by
+# "manage.py sync_students" (run it regularly, e.g. via cron)
+STUDENT_SOURCE = 'faculty'
+
+# Shared by all worker processes and management commands (supervisor
+# directory, optionally student lookups). The table is created with
+# "manage.py createcachetable" (install.sh and update.sh run it).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'thesispool_cache',
+    },
+}
+
+# Cache for student lookups: BACKEND is 'lru' (per process), 'django'
+# (CACHES[CACHE_ALIAS], shared by all processes if that cache is, like the
+# database cache above) or None (no caching).
+# Unknown matriculation numbers are cached for NEGATIVE_TIMEOUT seconds.
+STUDENT_CACHE = {
+    'BACKEND': 'lru',
+    'TIMEOUT': 300,
+    'NEGATIVE_TIMEOUT': 60,
+    'MAX_SIZE': 2048,
+    'CACHE_ALIAS': 'default',
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/1.10/ref/settings/#auth-password-validators
 
@@ -137,6 +216,34 @@ AUTH_LDAP_USER_ATTR_MAP = {"first_name": "givenName",
 
 AUTH_LDAP_PROF_DN = "cn=profI,ou=groups,dc=informatik,dc=hs-mannheim,dc=de"
 
+# Cached list of all professors (see website.directory), refreshed in the
+# background after TIMEOUT seconds and dropped after TIMEOUT + STALE_TIMEOUT.
+# Clear it with "manage.py refresh_supervisors" or the supervisor admin.
+SUPERVISOR_DIRECTORY = {
+    'TIMEOUT': 3600,
+    'STALE_TIMEOUT': 86400,
+    'CACHE_ALIAS': 'default',
+}
+
+# Persistent LDAP connections per process (see website.ldap_pool): at most
+# SIZE connections, borrowers wait TIMEOUT seconds for a free one.
+# Connections idle for more than CHECK_AFTER seconds are checked before use.
+LDAP_POOL = {
+    'SIZE': 4,
+    'TIMEOUT': 5,
+    'CHECK_AFTER': 60,
+}
+
+# In-memory stand-in for the LDAP server (see website.fake_ldap), seeded
+# from FIXTURE. BACKEND is 'ldap' (AUTH_LDAP_SERVER_URI) or 'fake'; use
+# THESISPOOL_LDAP=fake for local development. LATENCY delays every
+# 'connect', 'bind' and 'search' call by the given seconds.
+LDAP_DIRECTORY = {
+    'BACKEND': os.environ.get('THESISPOOL_LDAP', 'ldap'),
+    'FIXTURE': os.path.join(BASE_DIR, 'website', 'fixtures', 'ldap_directory.json'),
+    'LATENCY': {'connect': 0, 'bind': 0, 'search': 0},
+}
+
 # map group permissions
 AUTH_LDAP_USER_FLAGS_BY_GROUP = {
     "is_prof": AUTH_LDAP_PROF_DN,
@@ -176,6 +283,14 @@ STATICFILES_DIRs = [
 
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
 
+# Maximum number of DB queries per request for views decorated with
+# website.queries.query_budget, exceeding it logs a warning
+QUERY_BUDGET = 10
+QUERY_BUDGET_STRICT = False
+
+# Number of theses per page in the overview
+OVERVIEW_PAGE_SIZE = 50
+
 # from .settings_secret import *  #noqa
 
 # For testing purposes, let faculty be a sqlite3 file to allow setup / teardown
@@ -184,6 +299,12 @@ if 'test' in sys.argv:
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'students.sqlite3'),
     }
+    QUERY_BUDGET_STRICT = True
+    STUDENT_CACHE['BACKEND'] = None
+    LDAP_DIRECTORY['BACKEND'] = 'fake'
+
+if LDAP_DIRECTORY['BACKEND'] == 'fake':
+    AUTHENTICATION_BACKENDS[0] = 'website.backends.FakeLDAPBackend'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGOUT_REDIRECT_URL = reverse_lazy('login')
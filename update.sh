@@ -1,4 +1,5 @@
 git pull
 python3 manage.py migrate
+python3 manage.py createcachetable
 python3 manage.py collectstatic
 systemctl restart apache2
@@ -1,8 +1,18 @@
 from django.contrib import admin
+from website.directory import supervisor_directory
 from website.models import Thesis, Assessor, Supervisor, Student
 
 
+@admin.register(Supervisor)
+class SupervisorAdmin(admin.ModelAdmin):
+    actions = ['refresh_directory']
+
+    @admin.action(description="Professorenliste aus dem LDAP neu laden")
+    def refresh_directory(self, request, queryset):
+        supervisor_directory.invalidate()
+        self.message_user(request, "Die Professorenliste wird beim nächsten Aufruf neu geladen.")
+
+
 admin.site.register(Thesis)
 admin.site.register(Assessor)
-admin.site.register(Supervisor)
 admin.site.register(Student)
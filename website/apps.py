@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class WebsiteConfig(AppConfig):
     name = 'website'
+
+    def ready(self):
+        # connect signal receivers
+        from website import signals  # noqa
+
+        # fail at startup, not on the first download, if a base PDF lacks
+        # a mapped field
+        from thesispool.pdf_fields import field_maps
+        field_maps.validate()
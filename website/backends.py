@@ -0,0 +1,12 @@
+from django_auth_ldap.backend import LDAPBackend
+
+from website.fake_ldap import FakeLDAPModule
+
+
+class FakeLDAPBackend(LDAPBackend):
+    """LDAPBackend authenticating against the in-memory directory of
+    website.fake_ldap instead of AUTH_LDAP_SERVER_URI"""
+
+    @property
+    def ldap(self):
+        return FakeLDAPModule()
@@ -0,0 +1,147 @@
+import threading
+import time
+
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class LRUCache(object):
+    """Thread safe in-process cache with a size limit (least recently used
+    entries are dropped first) and a timeout per entry. Implements the
+    subset of Django's cache API used here."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return default
+
+            value, expires = entry
+
+            if expires < time.monotonic():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + timeout)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class StudentCache(object):
+    """Read-through cache for student records of the faculty DB.
+
+    Configured by settings.STUDENT_CACHE: BACKEND is 'lru' (per process),
+    'django' (the Django cache CACHE_ALIAS, shared between processes) or
+    None to disable caching. Unknown matriculation numbers are cached for
+    NEGATIVE_TIMEOUT seconds, so that typos do not hit the faculty DB.
+    """
+    KEY = "student:{0}"
+    UNKNOWN = "unknown"
+
+    def __init__(self):
+        self._lru = None
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def config(self):
+        return settings.STUDENT_CACHE
+
+    @property
+    def backend(self):
+        backend = self.config.get('BACKEND')
+
+        if backend == 'django':
+            return caches[self.config.get('CACHE_ALIAS', 'default')]
+
+        if backend == 'lru':
+            max_size = self.config.get('MAX_SIZE', 1024)
+            if self._lru is None or self._lru.max_size != max_size:
+                self._lru = LRUCache(max_size)
+            return self._lru
+
+        return None
+
+    def get(self, matnr):
+        """Return (True, record) for cached students, (True, None) for
+        cached unknown numbers and (False, None) on a cache miss"""
+        backend = self.backend
+        value = backend.get(self.KEY.format(matnr)) if backend is not None else None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return False, None
+
+            if value == self.UNKNOWN:
+                self.negative_hits += 1
+                return True, None
+
+            self.hits += 1
+            return True, tuple(value)
+
+    def set(self, matnr, record):
+        backend = self.backend
+
+        if backend is None:
+            return
+
+        if record is None:
+            backend.set(self.KEY.format(matnr), self.UNKNOWN,
+                        self.config.get('NEGATIVE_TIMEOUT', 60))
+        else:
+            backend.set(self.KEY.format(matnr), tuple(record),
+                        self.config.get('TIMEOUT', 300))
+
+    def invalidate(self, matnr):
+        backend = self.backend
+
+        if backend is not None:
+            backend.delete(self.KEY.format(matnr))
+
+    def clear(self):
+        """Drop all entries of the in-process cache and reset the stats"""
+        if self._lru is not None:
+            self._lru.clear()
+
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses}
+
+
+student_cache = StudentCache()
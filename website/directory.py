@@ -0,0 +1,87 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from website.models import Supervisor
+
+logger = logging.getLogger(__name__)
+
+
+class SupervisorDirectory(object):
+    """Supervisors of the professors group, cached in the Django cache so
+    that all worker processes share one copy.
+
+    Configured by settings.SUPERVISOR_DIRECTORY: after TIMEOUT seconds the
+    cached list is still served, but refreshed from LDAP in a background
+    thread (only one process refreshes at a time). After additional
+    STALE_TIMEOUT seconds the list is dropped and reloaded synchronously.
+    """
+    KEY = "supervisor_directory"
+    LOCK_KEY = "supervisor_directory:refreshing"
+
+    @property
+    def config(self):
+        return settings.SUPERVISOR_DIRECTORY
+
+    @property
+    def cache(self):
+        return caches[self.config.get('CACHE_ALIAS', 'default')]
+
+    def supervisors(self):
+        """All supervisors ordered by last name"""
+        data = self.cache.get(self.KEY)
+
+        if data is None:
+            data = self.refresh()
+        elif data['fetched_at'] + self.config.get('TIMEOUT', 3600) < time.time():
+            self.refresh_in_background()
+
+        return [Supervisor(**fields) for fields in data['supervisors']]
+
+    def find(self, uid):
+        """Supervisor with the given uid, None if it is not a professor"""
+        for supervisor in self.supervisors():
+            if supervisor.id == uid:
+                return supervisor
+
+        return None
+
+    def refresh(self):
+        """Reload all supervisors from LDAP and store them in the cache"""
+        supervisors = Supervisor.objects.fetch_supervisors_from_ldap()
+        supervisors = sorted(supervisors, key=lambda s: s.last_name.lower())
+
+        data = {
+            'fetched_at': time.time(),
+            'supervisors': [{'id': s.id,
+                             'first_name': s.first_name,
+                             'last_name': s.last_name,
+                             'initials': s.initials} for s in supervisors],
+        }
+
+        timeout = self.config.get('TIMEOUT', 3600) + self.config.get('STALE_TIMEOUT', 86400)
+        self.cache.set(self.KEY, data, timeout)
+
+        return data
+
+    def refresh_in_background(self):
+        # cache.add is atomic, so only one process starts a refresh
+        if self.cache.add(self.LOCK_KEY, True, 60):
+            threading.Thread(target=self._refresh_and_unlock, daemon=True).start()
+
+    def invalidate(self):
+        self.cache.delete(self.KEY)
+
+    def _refresh_and_unlock(self):
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Refreshing the supervisor directory failed")
+        finally:
+            self.cache.delete(self.LOCK_KEY)
+
+
+supervisor_directory = SupervisorDirectory()
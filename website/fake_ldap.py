@@ -0,0 +1,355 @@
+import json
+import re
+import threading
+import time
+
+from collections import Counter
+
+import ldap
+
+from django.conf import settings
+
+
+class FakeDirectory(object):
+    """In-memory LDAP directory, a stand-in for the server at
+    AUTH_LDAP_SERVER_URI in tests, benchmarks and local development.
+
+    Entries map a DN to its attributes, every attribute is a list of values.
+    The userPassword attribute is used for binds and never returned by a
+    search. latency maps the kinds of calls ('connect', 'bind', 'search') to
+    the seconds each call is delayed, to simulate a remote server.
+    """
+
+    def __init__(self, entries, latency=None):
+        self.entries = {}
+        self.latency = latency or {}
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+        for dn, attributes in entries.items():
+            self.add(dn, attributes)
+
+    @classmethod
+    def from_fixture(cls, path, latency=None):
+        with open(path, encoding="utf-8") as fixture:
+            return cls(json.load(fixture)['entries'], latency)
+
+    def add(self, dn, attributes):
+        values = {}
+
+        for name, value in attributes.items():
+            value = value if isinstance(value, list) else [value]
+            values[name] = [v if isinstance(v, bytes) else str(v).encode() for v in value]
+
+        self.entries[normalize_dn(dn)] = (dn, values)
+
+    def delay(self, kind):
+        with self._lock:
+            self.calls[kind] += 1
+
+        seconds = self.latency.get(kind, 0)
+        if seconds:
+            time.sleep(seconds)
+
+    def bind(self, dn, password):
+        if not dn:
+            return
+
+        entry = self.entries.get(normalize_dn(dn))
+        password = password.encode() if isinstance(password, str) else password
+
+        if entry is None or password not in entry[1].get('userPassword', []):
+            raise ldap.INVALID_CREDENTIALS({'desc': 'Invalid credentials'})
+
+    def search(self, base, scope, filterstr, attrlist):
+        base = normalize_dn(base)
+
+        if not base and scope == ldap.SCOPE_BASE:
+            # rootDSE
+            return [("", {})]
+
+        if base not in self.entries and not any(dn.endswith("," + base) for dn in self.entries):
+            raise ldap.NO_SUCH_OBJECT({'desc': 'No such object', 'matched': ''})
+
+        matches = parse_filter(filterstr or "(objectClass=*)")
+        results = []
+
+        for dn, (original_dn, attributes) in self.entries.items():
+            if in_scope(dn, base, scope) and matches(attributes):
+                results.append((original_dn, select(attributes, attrlist)))
+
+        return results
+
+    def compare(self, dn, attribute, value):
+        entry = self.entries.get(normalize_dn(dn))
+
+        if entry is None:
+            raise ldap.NO_SUCH_OBJECT({'desc': 'No such object', 'matched': ''})
+
+        values = lookup(entry[1], attribute)
+
+        if values is None:
+            raise ldap.NO_SUCH_ATTRIBUTE({'desc': 'No such attribute'})
+
+        value = value.decode() if isinstance(value, bytes) else value
+
+        return any(v.decode().lower() == value.lower() for v in values)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.calls)
+
+
+class FakeLDAPObject(object):
+    """The subset of python-ldap's LDAPObject used by SupervisorManager and
+    django_auth_ldap, answered from a FakeDirectory"""
+
+    def __init__(self, directory, uri):
+        self.directory = directory
+        self.uri = uri
+        self.options = {}
+        self._connected = False
+        self._results = {}
+        self._msgid = 0
+
+    def _connect(self):
+        if not self._connected:
+            self.directory.delay('connect')
+            self._connected = True
+
+    def set_option(self, option, value):
+        self.options[option] = value
+
+    def get_option(self, option):
+        return self.options.get(option)
+
+    def start_tls_s(self):
+        self._connect()
+
+    def simple_bind_s(self, who=None, cred=None, serverctrls=None, clientctrls=None):
+        self._connect()
+        self.directory.delay('bind')
+        self.directory.bind(who, cred)
+
+    def search_s(self, base, scope, filterstr=None, attrlist=None, attrsonly=0):
+        self._connect()
+        self.directory.delay('search')
+
+        return self.directory.search(base, scope, filterstr, attrlist)
+
+    def search_ext(self, base, scope, filterstr=None, attrlist=None, attrsonly=0,
+                   serverctrls=None, clientctrls=None, timeout=-1, sizelimit=0):
+        results = self.search_s(base, scope, filterstr, attrlist)
+
+        self._msgid += 1
+        self._results[self._msgid] = results
+
+        return self._msgid
+
+    search = search_ext
+
+    def result(self, msgid=-1, all=1, timeout=None):
+        return self.result3(msgid, all, timeout)[:2]
+
+    def result3(self, msgid=-1, all=1, timeout=None):
+        if msgid == -1:
+            msgid = min(self._results)
+
+        return ldap.RES_SEARCH_RESULT, self._results.pop(msgid), msgid, []
+
+    def compare_s(self, dn, attr, value):
+        self._connect()
+        self.directory.delay('search')
+
+        return self.directory.compare(dn, attr, value)
+
+    def unbind(self):
+        self._connected = False
+
+    unbind_s = unbind
+
+
+class FakeLDAPModule(object):
+    """Stands in for the ldap module: initialize() connects to the fake
+    directory, everything else is taken from python-ldap"""
+
+    def initialize(self, uri, *args, **kwargs):
+        return FakeLDAPObject(fake_directory(), uri)
+
+    def __getattr__(self, name):
+        return getattr(ldap, name)
+
+
+def fake_enabled():
+    return settings.LDAP_DIRECTORY.get('BACKEND') == 'fake'
+
+
+_directory = None
+_directory_config = None
+_directory_lock = threading.Lock()
+
+
+def fake_directory():
+    """The fake directory configured by settings.LDAP_DIRECTORY, loaded
+    once and reloaded when the settings change"""
+    global _directory, _directory_config
+
+    config = settings.LDAP_DIRECTORY
+    key = (config.get('FIXTURE'), json.dumps(config.get('LATENCY', {}), sort_keys=True))
+
+    with _directory_lock:
+        if _directory is None or _directory_config != key:
+            _directory = FakeDirectory.from_fixture(config['FIXTURE'], config.get('LATENCY'))
+            _directory_config = key
+
+        return _directory
+
+
+def initialize(uri, **kwargs):
+    """ldap.initialize, or a connection to the fake directory if
+    settings.LDAP_DIRECTORY selects it"""
+    if fake_enabled():
+        return FakeLDAPModule().initialize(uri, **kwargs)
+
+    return ldap.initialize(uri, **kwargs)
+
+
+def normalize_dn(dn):
+    return ",".join(part.strip() for part in (dn or "").lower().split(","))
+
+
+def in_scope(dn, base, scope):
+    if scope == ldap.SCOPE_BASE:
+        return dn == base
+
+    if scope == ldap.SCOPE_ONELEVEL:
+        return dn.split(",", 1)[-1] == base and dn != base
+
+    return dn == base or dn.endswith("," + base)
+
+
+def lookup(attributes, name):
+    name = name.lower()
+
+    for key, values in attributes.items():
+        if key.lower() == name:
+            return values
+
+    return None
+
+
+def select(attributes, attrlist):
+    if attrlist and '1.1' in attrlist:
+        return {}
+
+    wanted = None if not attrlist or '*' in attrlist else {a.lower() for a in attrlist}
+
+    return {name: list(values) for name, values in attributes.items()
+            if name != 'userPassword' and (wanted is None or name.lower() in wanted)}
+
+
+ITEM = re.compile(r"^([\w.;-]+)(~=|>=|<=|=)(.*)$", re.DOTALL)
+
+
+def parse_filter(filterstr):
+    """Predicate on the attributes of an entry for an RFC 4515 search
+    filter. Supports and, or, not, presence, equality, substring and
+    ordering items, matching is case insensitive."""
+    text = filterstr.strip()
+
+    if not text.startswith("("):
+        text = "(" + text + ")"
+
+    try:
+        predicate, end = _parse(text, 0)
+    except (IndexError, ValueError):
+        raise ldap.FILTER_ERROR({'desc': 'Bad search filter', 'info': filterstr})
+
+    if end != len(text):
+        raise ldap.FILTER_ERROR({'desc': 'Bad search filter', 'info': filterstr})
+
+    return predicate
+
+
+def _parse(text, pos):
+    if text[pos] != "(":
+        raise ValueError(pos)
+
+    pos += 1
+    operator = text[pos]
+
+    if operator in "&|":
+        pos += 1
+        children = []
+
+        while text[pos] == "(":
+            child, pos = _parse(text, pos)
+            children.append(child)
+
+        combine = all if operator == "&" else any
+
+        def predicate(attributes):
+            return combine(child(attributes) for child in children)
+
+    elif operator == "!":
+        child, pos = _parse(text, pos + 1)
+
+        def predicate(attributes):
+            return not child(attributes)
+
+    else:
+        end = text.index(")", pos)
+        predicate = _item(text[pos:end])
+        pos = end
+
+    if text[pos] != ")":
+        raise ValueError(pos)
+
+    return predicate, pos + 1
+
+
+def _item(item):
+    match = ITEM.match(item)
+
+    if not match:
+        raise ValueError(item)
+
+    name, operator, value = match.groups()
+
+    if operator == "=" and value == "*":
+        if name.lower() == "objectclass":
+            # every entry of a real directory has an objectClass
+            return lambda attributes: True
+
+        return lambda attributes: lookup(attributes, name) is not None
+
+    if operator == "=" and "*" in value:
+        pattern = ".*".join(re.escape(_unescape(part)) for part in value.split("*"))
+        regex = re.compile("^" + pattern + "$", re.IGNORECASE | re.DOTALL)
+        test = regex.match
+    elif operator in ("=", "~="):
+        expected = _unescape(value).lower()
+        test = lambda v: v.lower() == expected
+    else:
+        expected = _unescape(value)
+        test = lambda v: _ordered(v, expected, operator)
+
+    def predicate(attributes):
+        values = lookup(attributes, name) or []
+        return any(test(v.decode("utf-8", "replace")) for v in values)
+
+    return predicate
+
+
+def _ordered(value, expected, operator):
+    if value.lstrip("-").isdigit() and expected.lstrip("-").isdigit():
+        value, expected = int(value), int(expected)
+    else:
+        value, expected = value.lower(), expected.lower()
+
+    return value >= expected if operator == ">=" else value <= expected
+
+
+def _unescape(value):
+    return re.sub(rb"\\([0-9a-fA-F]{2})", lambda m: bytes([int(m.group(1), 16)]),
+                  value.encode()).decode("utf-8", "replace")
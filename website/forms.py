@@ -1,16 +1,23 @@
 from django import forms
+from django.db import transaction
 from django.forms import ModelForm
 from django.utils import timezone
 
 from datetime import timedelta
+import re
 
 from website.models import *
+from website.directory import supervisor_directory
 
 from website.util import dateutil
 
 # List of years for SelectDateWidget to allow years in the past
 YEARS = [x for x in range(datetime.now().year - 2, datetime.now().year + 2)]
 
+# shown when a transition of the thesis failed, because it was changed since
+# the form was loaded
+CONFLICT_MESSAGE = "Die Arbeit wurde inzwischen geändert, bitte die Seite neu laden."
+
 
 class ThesisForm(ModelForm):
     class Meta:
@@ -119,13 +126,17 @@ class GradeForm(forms.Form):
 
         return cls(initial=initials)
 
+    @transaction.atomic
     def persist(self, thesis):
+        """Hand in and grade the thesis together, ThesisChanged from either
+        step rolls back both"""
         grade = self.cleaned_data["grade"]
         assessor_grade = self.cleaned_data["assessor_grade"]
         examination_date = self.cleaned_data["examination_date"]
         restriction_note = self.cleaned_data["restriction_note"]
         handed_in_date = self.cleaned_data["handed_in_date"]
 
+        # False if it is handed in already, the date is left as it is then
         thesis.hand_in(handed_in_date, restriction_note)
         thesis.assign_grade(grade, assessor_grade, examination_date, restriction_note)
 
@@ -139,12 +150,46 @@ class CheckStudentIdForm(forms.Form):
         super(CheckStudentIdForm, self).clean()
 
         matnr = int(self.cleaned_data['student_id'])
+        student = Student.objects.find(matnr)
 
-        if not Student.objects.find(matnr):
+        if not student:
             raise forms.ValidationError(
                 {'student_id': 'Matrikelnummer existiert nicht'})
 
-        self.cleaned_data['student'] = Student.objects.find(matnr)
+        self.cleaned_data['student'] = student
+
+
+class BulkStudentLookupForm(forms.Form):
+    MAX_STUDENTS = 500
+
+    student_ids = forms.CharField(
+        label="Matrikelnummern",
+        widget=forms.Textarea(attrs={'cols': 20,
+                                     'rows': 6,
+                                     'placeholder': 'eine Matrikelnummer pro Zeile'}))
+
+    def clean_student_ids(self):
+        values = re.split(r"[\s,;]+", self.cleaned_data['student_ids'].strip())
+
+        if not all(value.isdigit() for value in values):
+            raise forms.ValidationError('Nur Matrikelnummern erlaubt')
+
+        if len(values) > self.MAX_STUDENTS:
+            raise forms.ValidationError(
+                'Höchstens {0} Matrikelnummern erlaubt'.format(self.MAX_STUDENTS))
+
+        return list(dict.fromkeys(int(value) for value in values))
+
+    def lookup(self):
+        """Pairs of matriculation number and student (None if unknown)
+        in the order of input"""
+        if not self.is_valid():
+            return []
+
+        matnrs = self.cleaned_data['student_ids']
+        students = Student.objects.find_many(matnrs)
+
+        return [(matnr, students[matnr]) for matnr in matnrs]
 
 
 class AssessorForm(forms.Form):
@@ -235,6 +280,7 @@ class StudentForm(forms.Form):
                           program=self.cleaned_data["program"])
 
         student.save()
+        Student.objects.invalidate(student.id)
 
         return student
 
@@ -322,17 +368,14 @@ class ThesisApplicationForm(forms.Form):
         if assessor:
             assessor.save()
 
-        thesis.title = self.cleaned_data['title']
-        thesis.begin_date = self.cleaned_data['begin_date']
-        thesis.due_date = self.cleaned_data['due_date']
-        thesis.assessor = assessor
-        thesis.external = self.cleaned_data['external']
-        thesis.external_where = self.cleaned_data['external_where']
-        thesis.student_contact = self.cleaned_data[
-                                     "student_email"] or thesis.student.email
-
-        thesis.full_clean()
-        thesis.save()
+        thesis.change_application(title=self.cleaned_data['title'],
+                                  begin_date=self.cleaned_data['begin_date'],
+                                  due_date=self.cleaned_data['due_date'],
+                                  assessor=assessor,
+                                  external=self.cleaned_data['external'],
+                                  external_where=self.cleaned_data['external_where'],
+                                  student_contact=self.cleaned_data[
+                                      "student_email"] or thesis.student.email)
 
         return thesis
 
@@ -352,8 +395,6 @@ class SupervisorsForm(forms.Form):
     def __init__(self, *args, **kwargs):
         super(SupervisorsForm, self).__init__(*args, **kwargs)
 
-        supervisors = Supervisor.objects.fetch_supervisors_from_ldap()
-        supervisors = sorted(supervisors, key=lambda s: s.last_name.lower())
-        supervisors = [(s.id, str(s)) for s in supervisors]
+        supervisors = [(s.id, str(s)) for s in supervisor_directory.supervisors()]
 
         self.fields['supervisors'] = forms.ChoiceField(choices=supervisors)
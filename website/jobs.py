@@ -0,0 +1,71 @@
+import logging
+import os
+import shutil
+
+from django.conf import settings
+from django.http import QueryDict
+
+from thesispool.export import PDFExport
+from thesispool.pdf import DossierPDF
+from website.models import RenderJob, Thesis
+
+logger = logging.getLogger(__name__)
+
+
+def output_path(job, extension):
+    directory = settings.RENDER_JOBS['DIR']
+    os.makedirs(directory, exist_ok=True)
+
+    return os.path.join(directory, "{0}.{1}".format(job.key, extension))
+
+
+def export(job):
+    """ZIP of the forms of all theses matching the stored Overview
+    filters"""
+    # avoid a circular import, the views create jobs
+    from website.views import ExportView
+
+    view = ExportView()
+    params = QueryDict(job.params["query"])
+    theses = view.theses(job.user, params)
+    archive = PDFExport(theses, view.pdf_types(params), progress=job.progress)
+
+    job.progress(0, archive.count())
+
+    path = output_path(job, "zip")
+    with open(path, "wb") as f:
+        for chunk in archive:
+            f.write(chunk)
+
+    return path, view.filename()
+
+
+def dossier(job):
+    thesis = Thesis.objects.with_relations().get(surrogate_key=job.params["key"])
+
+    job.progress(0, 1)
+    pdf = DossierPDF(thesis).get()
+
+    # a copy, the cached dossier may be evicted before the job expires
+    path = output_path(job, "pdf")
+    shutil.copyfile(pdf.path, path)
+    job.progress(1)
+
+    return path, pdf.filename
+
+
+RUNNERS = {
+    RenderJob.EXPORT: export,
+    RenderJob.DOSSIER: dossier,
+}
+
+
+def run(job):
+    """Run a claimed job and store its result or error"""
+    try:
+        path, filename = RUNNERS[job.kind](job)
+    except Exception as e:
+        logger.exception("Render job %s failed", job.key)
+        job.fail(str(e) or e.__class__.__name__)
+    else:
+        job.finish(path, filename)
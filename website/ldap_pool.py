@@ -0,0 +1,165 @@
+import threading
+import time
+
+from contextlib import contextmanager
+
+import ldap
+
+from django.conf import settings
+
+from website import fake_ldap
+
+
+class PoolTimeout(Exception):
+    """No LDAP connection became available in time"""
+    pass
+
+
+class LDAPConnectionPool(object):
+    """Thread safe pool of persistent LDAP connections.
+
+    Connections are opened on demand (StartTLS is negotiated once per
+    connection) up to size. Borrowers wait up to timeout seconds for a free
+    connection. Connections idle for longer than check_after seconds are
+    checked with a rootDSE search before they are handed out, connections
+    failing with SERVER_DOWN are dropped.
+    """
+
+    def __init__(self, uri, size=4, timeout=5, check_after=60, connect=None):
+        self.uri = uri
+        self.size = size
+        self.timeout = timeout
+        self.check_after = check_after
+        self._connect = connect or self._initialize
+        self._idle = []
+        self._open = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection, it is returned to the pool afterwards"""
+        con = self._acquire()
+
+        try:
+            yield con
+        except ldap.SERVER_DOWN:
+            self._discard(con)
+            self.clear()
+            con = None
+            raise
+        finally:
+            if con is not None:
+                self._release(con)
+
+    def run(self, function):
+        """Call function with a borrowed connection, retry once with a new
+        connection if the server went away in the meantime"""
+        try:
+            with self.connection() as con:
+                return function(con)
+        except ldap.SERVER_DOWN:
+            with self.connection() as con:
+                return function(con)
+
+    def clear(self):
+        """Close all idle connections"""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._condition.notify_all()
+
+        for con, _ in idle:
+            self._unbind(con)
+
+    def stats(self):
+        with self._condition:
+            return {'open': self._open, 'idle': len(self._idle), 'size': self.size}
+
+    def _acquire(self):
+        deadline = time.monotonic() + self.timeout
+
+        with self._condition:
+            while not self._idle and self._open >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    if not self._idle and self._open >= self.size:
+                        raise PoolTimeout("no LDAP connection available "
+                                          "after {0}s".format(self.timeout))
+
+            if self._idle:
+                con, last_used = self._idle.pop()
+            else:
+                con, last_used = None, None
+                # reserve the slot, connecting happens outside of the lock
+                self._open += 1
+
+        if con is not None:
+            if time.monotonic() - last_used < self.check_after or self._is_alive(con):
+                return con
+
+            # keep the slot of the dead connection for the new one
+            self._unbind(con)
+
+        try:
+            return self._connect(self.uri)
+        except Exception:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, con):
+        with self._condition:
+            self._idle.append((con, time.monotonic()))
+            self._condition.notify()
+
+    def _discard(self, con):
+        with self._condition:
+            self._open -= 1
+            self._condition.notify()
+
+        self._unbind(con)
+
+    def _is_alive(self, con):
+        try:
+            con.search_s("", ldap.SCOPE_BASE, "(objectClass=*)", ["1.1"])
+            return True
+        except ldap.LDAPError:
+            return False
+
+    def _unbind(self, con):
+        try:
+            con.unbind()
+        except ldap.LDAPError:
+            pass
+
+    def _initialize(self, uri):
+        con = fake_ldap.initialize(uri, trace_level=0)
+        # start_tls_s() throws: "connection already established"
+        # tests work without start_tls_s()
+        try:
+            con.start_tls_s()
+        except:
+            pass
+
+        return con
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def ldap_pool():
+    """The LDAP connection pool of this process, configured by
+    settings.LDAP_POOL"""
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            config = settings.LDAP_POOL
+            _pool = LDAPConnectionPool(settings.AUTH_LDAP_SERVER_URI,
+                                       size=config.get('SIZE', 4),
+                                       timeout=config.get('TIMEOUT', 5),
+                                       check_after=config.get('CHECK_AFTER', 60))
+
+        return _pool
@@ -0,0 +1,147 @@
+import json
+import math
+import platform
+import resource
+import tempfile
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from thesispool.pdf import PDF_TYPES
+from thesispool.pdf_engine import pdf_engine
+from website.models import Assessor, Student, Supervisor, Thesis
+
+
+def percentile(latencies, p):
+    """Nearest-rank percentile of sorted latencies"""
+    if not latencies:
+        return None
+
+    return latencies[max(math.ceil(p / 100 * len(latencies)) - 1, 0)]
+
+
+def peak_rss(who=resource.RUSAGE_SELF):
+    """Peak resident set size in KiB, of this process or (RUSAGE_CHILDREN)
+    of the largest waited-for child, e.g. pdftk and its JVM"""
+    return resource.getrusage(who).ru_maxrss
+
+
+class Command(BaseCommand):
+    help = "Measure PDF generation: latency, throughput and memory per form type"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=20,
+                            help="documents rendered per form type and run")
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4],
+                            help="number of concurrent downloads, one run per value")
+        parser.add_argument('--forms', nargs='+', choices=sorted(PDF_TYPES), default=list(PDF_TYPES),
+                            help="form types to render")
+        parser.add_argument('--output', default=None,
+                            help="write the results as JSON to this file")
+
+    def handle(self, *args, **options):
+        if options['count'] < 1 or min(options['concurrency']) < 1:
+            raise CommandError("--count and --concurrency have to be positive")
+
+        theses = self.theses(options['count'])
+        results = []
+
+        for concurrency in options['concurrency']:
+            for form in options['forms']:
+                # a cache of its own, the first pass renders every document
+                with tempfile.TemporaryDirectory() as directory, \
+                        override_settings(SENDFILE_ROOT=directory,
+                                          PDF_CACHE=dict(settings.PDF_CACHE, DIR=directory + "/cache")):
+                    for cache in ["cold", "warm"]:
+                        result = self.run(PDF_TYPES[form], theses, concurrency)
+                        result.update(form=form, cache=cache, concurrency=concurrency)
+                        results.append(result)
+                        self.report(result)
+
+        report = {'created': timezone.now().isoformat(),
+                  'python': platform.python_version(),
+                  'engine': pdf_engine().name,
+                  'pdftk_pipe': settings.PDFTK_PIPE,
+                  'cache': settings.PDF_CACHE.get('ENABLED', True),
+                  'workers': settings.PDF_RENDER.get('WORKERS', 4),
+                  'count': options['count'],
+                  'peak_rss_kib': peak_rss(),
+                  'peak_rss_children_kib': peak_rss(resource.RUSAGE_CHILDREN),
+                  'results': results}
+
+        if options['output']:
+            with open(options['output'], "w") as f:
+                json.dump(report, f, indent=2)
+
+        self.stdout.write("peak RSS: {0} KiB, children: {1} KiB".format(
+            report['peak_rss_kib'], report['peak_rss_children_kib']))
+
+    def theses(self, count):
+        """Unsaved theses with distinct values, all forms have content"""
+        supervisor = Supervisor(id="bench", first_name="Bernd", last_name="Benchmark", initials="BBM")
+        theses = []
+
+        for i in range(count):
+            student = Student(id=9000000 + i, first_name="Student", last_name="Nr. {0}".format(i),
+                              program="IB" if i % 2 else "IM")
+            assessor = Assessor(first_name="Anna", last_name="Assessor", academic_title="Dr.")
+            due_date = date(2018, 1, 31) + timedelta(days=i)
+
+            theses.append(Thesis(student=student, supervisor=supervisor, assessor=assessor,
+                                 title="Benchmark-Thesis {0}".format(i),
+                                 thesis_program=student.program,
+                                 begin_date=due_date - timedelta(days=90),
+                                 due_date=due_date,
+                                 external=bool(i % 2), external_where="Firma {0}".format(i),
+                                 prolongation_date=due_date + timedelta(weeks=4),
+                                 prolongation_reason="Krankheit", prolongation_weeks=4,
+                                 handed_in_date=due_date + timedelta(weeks=3),
+                                 examination_date=due_date + timedelta(weeks=6),
+                                 grade=Decimal("1.7"), assessor_grade=Decimal("2.0"),
+                                 status=Thesis.GRADED))
+
+        return theses
+
+    def run(self, pdf_type, theses, concurrency):
+        """Download every thesis once with concurrency clients"""
+        def download(thesis):
+            started = time.perf_counter()
+            try:
+                pdf_type(thesis).get()
+            except Exception:
+                # RenderUnavailable, RenderError or a broken engine: a failed
+                # sample, the run goes on
+                return None
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            measured = list(clients.map(download, theses))
+        seconds = time.perf_counter() - started
+
+        latencies = sorted(latency for latency in measured if latency is not None)
+
+        def ms(value):
+            return None if value is None else round(value * 1000, 3)
+
+        return {'renders': len(latencies),
+                'errors': len(measured) - len(latencies),
+                'seconds': round(seconds, 6),
+                'throughput': round(len(latencies) / seconds, 3) if seconds else None,
+                'p50_ms': ms(percentile(latencies, 50)),
+                'p95_ms': ms(percentile(latencies, 95)),
+                'p99_ms': ms(percentile(latencies, 99)),
+                'max_ms': ms(latencies[-1] if latencies else None),
+                'peak_rss_kib': peak_rss(),
+                'peak_rss_children_kib': peak_rss(resource.RUSAGE_CHILDREN)}
+
+    def report(self, result):
+        self.stdout.write("{form:<16} {cache:<5} x{concurrency:<3} {renders:>5} ok {errors:>3} failed  "
+                          "{throughput:>9}/s  p50 {p50_ms} ms  p95 {p95_ms} ms  p99 {p99_ms} ms".format(**result))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from website.directory import supervisor_directory
+
+
+class Command(BaseCommand):
+    help = "Reload the cached list of supervisors from LDAP"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clear', action='store_true',
+                            help="only drop the cached list, it is reloaded on next use")
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            supervisor_directory.invalidate()
+            self.stdout.write("Supervisor directory cleared")
+            return
+
+        data = supervisor_directory.refresh()
+
+        self.stdout.write("{0} supervisors loaded".format(len(data['supervisors'])))
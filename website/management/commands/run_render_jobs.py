@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from website import jobs
+from website.models import RenderJob
+
+
+class Command(BaseCommand):
+    help = "Run queued PDF render jobs and remove expired ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="exit when no job is queued")
+        parser.add_argument('--interval', type=float, default=None,
+                            help="seconds to wait for new jobs (RENDER_JOBS['POLL_INTERVAL'])")
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        if interval is None:
+            interval = settings.RENDER_JOBS.get('POLL_INTERVAL', 2)
+
+        # a single local worker is expected, running jobs were interrupted
+        requeued = RenderJob.objects.requeue()
+        if requeued:
+            self.stdout.write("{0} interrupted jobs queued again".format(requeued))
+
+        while True:
+            expired = RenderJob.objects.expire()
+            if expired:
+                self.stdout.write("{0} expired jobs removed".format(expired))
+
+            job = RenderJob.objects.claim()
+
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(interval)
+                continue
+
+            jobs.run(job)
+            self.stdout.write("{0}: {1}".format(job, job.error or job.filename))
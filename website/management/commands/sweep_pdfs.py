@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from thesispool.scratch import scratch_space
+
+
+class Command(BaseCommand):
+    help = "Remove generated PDF files that are no longer needed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, default=None,
+                            help="remove generated files older than this (seconds)")
+        parser.add_argument('--max-size', type=int, default=None,
+                            help="shrink generated files and cache to this size (bytes)")
+        parser.add_argument('--stats', action='store_true',
+                            help="only report the disk use")
+
+    def handle(self, *args, **options):
+        if not options['stats']:
+            files, size = scratch_space.sweep(options['max_age'], options['max_size'])
+            self.stdout.write("{0} files removed ({1} bytes)".format(files, size))
+
+        usage = scratch_space.usage()
+
+        self.stdout.write("scratch: {scratch_files} files ({scratch_bytes} bytes), "
+                          "cache: {cache_files} files ({cache_bytes} bytes)".format(**usage))
@@ -0,0 +1,109 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from website.models import FacultyStudent
+
+
+class Command(BaseCommand):
+    help = "Mirror the student table of the faculty DB into the local database"
+
+    FIELDS = ['first_name', 'last_name', 'program', 'checksum', 'synced_at']
+
+    # share of the mirror a sync may delete without --force
+    MAX_PRUNE = 0.5
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="number of students read and written at once")
+        parser.add_argument('--no-prune', action='store_true',
+                            help="keep students that were removed from the faculty DB")
+        parser.add_argument('--force', action='store_true',
+                            help="prune even if the faculty DB returned no or far fewer students")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        created, updated, seen = 0, 0, set()
+
+        for batch in self.read_faculty(batch_size):
+            c, u = self.sync_batch(batch)
+            created += c
+            updated += u
+            seen.update(record[0] for record in batch)
+
+        deleted = 0 if options['no_prune'] else self.prune(seen, batch_size, options['force'])
+
+        self.stdout.write("{0} students: {1} created, {2} updated, {3} deleted".format(
+            len(seen), created, updated, deleted))
+
+    def read_faculty(self, batch_size):
+        """Read the faculty DB in batches ordered by id, every batch is
+        a separate query starting after the last id of the previous one"""
+        sql = """select id,
+                        firstname,
+                        lastname,
+                        program
+                from student where id > %s order by id limit %s"""
+
+        last_id = -1
+
+        while True:
+            with connections['faculty'].cursor() as cursor:
+                cursor.execute(sql, [last_id, batch_size])
+                batch = cursor.fetchall()
+
+            if not batch:
+                return
+
+            yield batch
+
+            last_id = batch[-1][0]
+
+    @transaction.atomic
+    def sync_batch(self, batch):
+        """Insert new and update changed students of a batch, returns the
+        number of created and updated records"""
+        now = timezone.now()
+        checksums = dict(FacultyStudent.objects.filter(
+            id__in=[record[0] for record in batch]).values_list('id', 'checksum'))
+
+        new, changed = [], []
+
+        for record in batch:
+            checksum = FacultyStudent.checksum_of(record)
+
+            if checksums.get(record[0]) == checksum:
+                continue
+
+            student = FacultyStudent(id=record[0],
+                                     first_name=record[1],
+                                     last_name=record[2],
+                                     program=record[3],
+                                     checksum=checksum,
+                                     synced_at=now)
+
+            if record[0] in checksums:
+                changed.append(student)
+            else:
+                new.append(student)
+
+        FacultyStudent.objects.bulk_create(new)
+        FacultyStudent.objects.bulk_update(changed, self.FIELDS)
+
+        return len(new), len(changed)
+
+    def prune(self, seen, batch_size, force=False):
+        """Delete all students that no longer exist in the faculty DB.
+        An empty read or one that would delete more than MAX_PRUNE of the
+        mirror rather means a broken faculty DB, it is refused unless forced"""
+        mirrored = list(FacultyStudent.objects.values_list('id', flat=True).iterator())
+        removed = [id for id in mirrored if id not in seen]
+
+        if removed and not force and (not seen or len(removed) > len(mirrored) * self.MAX_PRUNE):
+            raise CommandError("refusing to delete {0} of {1} students, the faculty DB returned {2}; "
+                               "use --force to prune anyway".format(len(removed), len(mirrored), len(seen)))
+
+        for i in range(0, len(removed), batch_size):
+            FacultyStudent.objects.filter(id__in=removed[i:i + batch_size]).delete()
+
+        return len(removed)
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from website.search import install_fts, remove_fts
+
+
+def create_index(apps, schema_editor):
+    install_fts(schema_editor)
+
+
+def drop_index(apps, schema_editor):
+    remove_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0020_rename_a_title_assessor_academic_title_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
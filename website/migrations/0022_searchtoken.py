@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:27
+
+from django.db import migrations, models
+
+from website.search import name_tokens
+
+
+def index_names(apps, schema_editor):
+    """Build the search tokens of all existing students and assessors"""
+    SearchToken = apps.get_model('website', 'SearchToken')
+    Student = apps.get_model('website', 'Student')
+    Assessor = apps.get_model('website', 'Assessor')
+    using = schema_editor.connection.alias
+
+    tokens = []
+
+    for student in Student.objects.using(using).iterator():
+        tokens += [SearchToken(kind='s', object_id=student.id, token=token)
+                   for token in name_tokens(student.id, student.first_name, student.last_name)]
+
+    for assessor in Assessor.objects.using(using).iterator():
+        tokens += [SearchToken(kind='a', object_id=assessor.id, token=token)
+                   for token in name_tokens(assessor.first_name, assessor.last_name)]
+
+    SearchToken.objects.using(using).bulk_create(tokens, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0021_thesis_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('s', 'Student'), ('a', 'Zweitkorrektor')], max_length=1)),
+                ('object_id', models.BigIntegerField()),
+                ('token', models.CharField(max_length=60)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'token'], name='website_sea_kind_dd5f64_idx'), models.Index(fields=['kind', 'object_id'], name='website_sea_kind_bf97c6_idx')],
+            },
+        ),
+        migrations.RunPython(index_names, migrations.RunPython.noop),
+    ]
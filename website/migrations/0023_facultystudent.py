@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0022_searchtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacultyStudent',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('first_name', models.CharField(max_length=30)),
+                ('last_name', models.CharField(max_length=30)),
+                ('program', models.CharField(max_length=10)),
+                ('checksum', models.CharField(max_length=32)),
+                ('synced_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'student_mirror',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:58
+
+from django.db import migrations, models
+
+from website.search import install_fts
+
+
+def reinstall_index(apps, schema_editor):
+    # SQLite rebuilds website_thesis for the new column, dropping the
+    # triggers of the full text index
+    install_fts(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0024_renderjob'),
+    ]
+
+    operations = [
+        # runs after the column is removed again when migrating backwards
+        migrations.RunPython(migrations.RunPython.noop, reinstall_index),
+        migrations.AddField(
+            model_name='thesis',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(reinstall_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:25
+
+import django.db.models.deletion
+import website.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0025_thesis_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThesisSearchIndex',
+            fields=[
+                ('thesis', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='website.thesis')),
+                ('document', website.search.FTSDocumentField(db_column='website_thesis_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'website_thesis_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1,14 +1,25 @@
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models, connections, transaction
+from django.db.models import F, Q, Value
+from django.utils import timezone
 
 from thesispool.settings import AUTH_LDAP_USER_DN_TEMPLATE
-from thesispool.settings import AUTH_LDAP_SERVER_URI
 from thesispool.settings import AUTH_LDAP_PROF_DN
-
-from datetime import datetime
+from website.search import FTS_TABLE, FTS_COLUMNS, FTSDocumentField, fts_available, fts_query
+from website.search import name_tokens, search_terms
+from website.cache import student_cache
+from website.ldap_pool import ldap_pool
+from thesispool.pdf import GradingPDF, ProlongationPDF
+from thesispool.prerender import prerender
+
+from datetime import datetime, timedelta
+import hashlib
+import os
 import ldap
+import ldap.filter
 import uuid
 
 
@@ -20,7 +31,7 @@ class User(AbstractUser):
     is_head = models.BooleanField(default=False)
 
 
-class ThesisManager(models.Manager):
+class ThesisQuerySet(models.QuerySet):
 
     def for_supervisor(self, supervisor_id):
         theses = self.filter(
@@ -28,63 +39,236 @@ class ThesisManager(models.Manager):
 
         return theses
 
+    def with_relations(self):
+        """Join all relations rendered in thesis lists, so that a list of
+        theses can be displayed with a single query"""
+        return self.select_related('student',
+                                   'supervisor',
+                                   'assessor',
+                                   'excom_chairman')
+
+    def search(self, text, column=None):
+        """Search all words of text as prefixes in the full text index,
+        optionally restricted to a single column. The relevance is annotated
+        as search_rank (lower is better). Falls back to a substring match on
+        backends without full text index."""
+        query = fts_query(text, column)
+
+        if query is None or not fts_available(self.db):
+            columns = [column] if column else FTS_COLUMNS
+            condition = Q()
+            for name in columns:
+                condition |= Q(**{name + '__contains': text})
+
+            return self.filter(condition).annotate(
+                search_rank=Value(0.0, output_field=models.FloatField()))
+
+        # joined, so that MATCH runs once per query and not once per row
+        return self.filter(search_index__document__match=query).annotate(
+            search_rank=F('search_index__rank'))
+
+    def approve(self, user):
+        """Approve all theses that are not approved yet, with one update.
+        Returns the approved and the skipped theses."""
+        return self._decide(user, ~Q(excom_status=Thesis.EXCOM_APPROVED),
+                            excom_status=Thesis.EXCOM_APPROVED,
+                            excom_approval_date=datetime.now().date())
+
+    def reject(self, user, reason):
+        """Reject all theses that are neither approved nor rejected yet,
+        with one update. Returns the rejected and the skipped theses."""
+        return self._decide(user, Q(excom_status__lte=Thesis.APPLIED),
+                            excom_status=Thesis.EXCOM_REJECTED,
+                            excom_reject_reason=reason)
+
+    @transaction.atomic
+    def _decide(self, user, condition, **changes):
+        """Write changes to all theses matching condition with a single
+        UPDATE. The UPDATE repeats condition and the version each thesis was
+        read with, theses decided by someone else in between are skipped."""
+        theses = list(self.with_relations().annotate(
+            undecided=models.ExpressionWrapper(condition, output_field=models.BooleanField())
+        ).order_by('id'))
+        candidates = [thesis for thesis in theses if thesis.undecided]
+
+        if not candidates:
+            return [], theses
+
+        excom_chairman = ExcomChairman.from_user(user)
+        excom_chairman.save()
+        changes['excom_chairman'] = excom_chairman
+
+        as_read = Q()
+        for thesis in candidates:
+            as_read |= Q(id=thesis.id, version=thesis.version)
+
+        updated = Thesis.objects.filter(as_read).filter(condition).update(
+            version=models.F('version') + 1, **changes)
+
+        changed = candidates
+        if updated < len(candidates):
+            # some theses were decided by someone else since they were read.
+            # The UPDATE holds the rows until the transaction ends, those it
+            # matched are at the next version with this chairman.
+            versions = dict(Thesis.objects.filter(id__in=[thesis.id for thesis in candidates],
+                                                  excom_chairman=excom_chairman)
+                            .values_list('id', 'version'))
+            changed = [thesis for thesis in candidates
+                       if versions.get(thesis.id) == thesis.version + 1]
+
+        for thesis in changed:
+            for name, value in changes.items():
+                setattr(thesis, name, value)
+            thesis.version += 1
+
+        return changed, [thesis for thesis in theses if thesis not in changed]
+
+
+ThesisManager = models.Manager.from_queryset(ThesisQuerySet, 'ThesisManager')
+
 
 class SupervisorManager(models.Manager):
+    # LDAP attributes needed to create a supervisor
+    ATTRIBUTES = ['givenName', 'sn', 'initials', 'uid']
+    # maximum number of uids in a single search filter
+    CHUNK_SIZE = 100
 
     def fetch_supervisor(self, uid, con=None):
-        need_unbind = False
-
         if not con:
-            con = ldap.initialize(AUTH_LDAP_SERVER_URI, trace_level=0)
-            # start_tls_s() throws: "connection already established"
-            # tests work without start_tls_s()
-            try:
-                con.start_tls_s()
-            except:
-                pass
-            need_unbind = True
+            return ldap_pool().run(lambda con: self.fetch_supervisor(uid, con))
 
         dn = AUTH_LDAP_USER_DN_TEMPLATE % {'user': uid}
 
-        results = con.search_s(dn, ldap.SCOPE_SUBTREE, "(objectClass=*)")
+        results = con.search_s(dn, ldap.SCOPE_SUBTREE, "(objectClass=*)",
+                               self.ATTRIBUTES)
+
+        return self.from_entry(results[0][1]) if results else None
+
+    def fetch_supervisors_from_ldap(self, con=None):
+        """Fetch all members of the professors group. Members are read
+        with one search per CHUNK_SIZE uids instead of one per member."""
+        if not con:
+            return ldap_pool().run(self.fetch_supervisors_from_ldap)
+
+        _, entry = con.search_s(AUTH_LDAP_PROF_DN, ldap.SCOPE_BASE,
+                                "(objectClass=*)", ['memberUid'])[0]
+
+        uids = [uid.decode() for uid in entry['memberUid']]
+
+        return self.fetch_supervisors(uids, con)
 
+    def fetch_supervisors(self, uids, con):
+        """Fetch the supervisors with the given uids, unknown or incomplete
+        entries are skipped. The order of uids is kept."""
+        # all users are stored below the same node, e.g. ou=Users,dc=...
+        base = AUTH_LDAP_USER_DN_TEMPLATE.split(",", 1)[1]
+        found = {}
+
+        for i in range(0, len(uids), self.CHUNK_SIZE):
+            conditions = ["(uid={0})".format(ldap.filter.escape_filter_chars(uid))
+                          for uid in uids[i:i + self.CHUNK_SIZE]]
+
+            results = con.search_s(base, ldap.SCOPE_SUBTREE,
+                                   "(|{0})".format("".join(conditions)),
+                                   self.ATTRIBUTES)
+
+            for dn, entity in results:
+                supervisor = self.from_entry(entity) if dn else None
+                if supervisor is not None:
+                    found[supervisor.id] = supervisor
+
+        return [found[uid] for uid in uids if uid in found]
+
+    def from_entry(self, entity):
+        """Create a supervisor from the attributes of an LDAP entry,
+        None if any attribute is missing"""
         try:
-            entity = results[0][1]
             return Supervisor(first_name=entity["givenName"][0].decode(),
                               last_name=entity["sn"][0].decode(),
                               initials=entity["initials"][0].decode(),
                               id=entity["uid"][0].decode())
-        except Exception:
+        except (KeyError, IndexError):
             return None
 
-        finally:
-            if need_unbind:
-                con.unbind()
 
-    def fetch_supervisors_from_ldap(self):
-        con = ldap.initialize(AUTH_LDAP_SERVER_URI, trace_level=0)
+class StudentManager(models.Manager):
+    """Custom manager that allows for reading from an external DB"""
 
-        try:
-            con.start_tls_s()
-        finally:
-            _, entry = con.search_s(AUTH_LDAP_PROF_DN, ldap.SCOPE_BASE)[0]
+    def find(self, matnr):
+        """
+        Fetch student from external database, return None if matnr is invalid.
+        Results (also unknown numbers) are cached, see website.cache.
+        """
+        cached, record = student_cache.get(matnr)
 
-            uids = [uid.decode() for uid in entry['memberUid']]
+        if cached:
+            return Student.from_raw(record) if record else None
 
-            supervisors = [self.fetch_supervisor(uid, con) for uid in uids]
+        student = self.find_uncached(matnr)
+        student_cache.set(matnr, student.to_raw() if student else None)
 
-            con.unbind()
+        return student
 
-            return [s for s in supervisors if s is not None]
+    def invalidate(self, matnr):
+        """Remove a student from the cache, e.g. after it was created"""
+        student_cache.invalidate(matnr)
 
+    def find_uncached(self, matnr):
+        row_faculty = self.fetch_faculty_row(matnr)
 
-class StudentManager(models.Manager):
-    """Custom manager that allows for reading from an external DB"""
+        return self.reconcile(Student.objects.filter(id=matnr).first(),
+                              row_faculty)
 
-    def find(self, matnr):
+    def find_many(self, matnrs):
         """
-        Fetch student from external database, return None if matnr is invalid.
+        Fetch many students at once with one (chunked) query against the
+        faculty DB and one against the local DB. Returns a dict mapping each
+        matriculation number to its student (None if it is invalid).
         """
+        matnrs = list(dict.fromkeys(int(matnr) for matnr in matnrs))
+        students, missing = {}, []
+
+        for matnr in matnrs:
+            cached, record = student_cache.get(matnr)
+
+            if cached:
+                students[matnr] = Student.from_raw(record) if record else None
+            else:
+                missing.append(matnr)
+
+        if missing:
+            rows_faculty = self.fetch_faculty_rows(missing)
+            local = Student.objects.in_bulk(missing)
+
+            for matnr in missing:
+                student = self.reconcile(local.get(matnr), rows_faculty.get(matnr))
+                student_cache.set(matnr, student.to_raw() if student else None)
+                students[matnr] = student
+
+        return students
+
+    def reconcile(self, student, row_faculty):
+        """The faculty DB is leading: students unknown there are invalid,
+        local students get the current name and program from it"""
+        if not row_faculty:
+            return None
+
+        if student is None:
+            return Student.from_raw(row_faculty)
+
+        student.first_name = row_faculty[1]
+        student.last_name = row_faculty[2]
+        student.program = row_faculty[3]
+
+        return student
+
+    def fetch_faculty_row(self, matnr):
+        """Read the raw record of a student from the faculty DB or, if
+        settings.STUDENT_SOURCE is 'mirror', from its local copy"""
+        if settings.STUDENT_SOURCE == 'mirror':
+            return FacultyStudent.objects.filter(id=matnr).values_list(
+                'id', 'first_name', 'last_name', 'program').first()
+
         sql = """select id,
                         firstname,
                         lastname,
@@ -93,19 +277,34 @@ class StudentManager(models.Manager):
 
         cursor = connections['faculty'].cursor()
         cursor.execute(sql, [matnr], )
-        row_faculty = cursor.fetchone()
+        return cursor.fetchone()
 
-        try:
-            student = Student.objects.get(id=matnr)
-            if getattr(student, 'firstname') == row_faculty[1] and getattr(student, 'lastname') == row_faculty[2] and getattr(student, 'program') == row_faculty[3]:
-                return student
+    def fetch_faculty_rows(self, matnrs, chunk_size=500):
+        """Same as fetch_faculty_row for many students, returns a dict
+        mapping matriculation numbers to raw records"""
+        rows = {}
+
+        for i in range(0, len(matnrs), chunk_size):
+            chunk = matnrs[i:i + chunk_size]
+
+            if settings.STUDENT_SOURCE == 'mirror':
+                records = FacultyStudent.objects.filter(id__in=chunk).values_list(
+                    'id', 'first_name', 'last_name', 'program')
             else:
-                setattr(student, 'firstname', row_faculty[1])
-                setattr(student, 'lastname', row_faculty[2])
-                setattr(student, 'program', row_faculty[3])
-                return student
-        except:
-            return None if not row_faculty else Student.from_raw(row_faculty)
+                sql = """select id,
+                                firstname,
+                                lastname,
+                                program
+                        from student where id in ({0})""".format(
+                    ", ".join(["%s"] * len(chunk)))
+
+                with connections['faculty'].cursor() as cursor:
+                    cursor.execute(sql, chunk)
+                    records = cursor.fetchall()
+
+            rows.update((record[0], record) for record in records)
+
+        return rows
 
 
 class Student(models.Model):
@@ -149,12 +348,49 @@ class Student(models.Model):
                    last_name=record[2],
                    program=record[3])
 
+    def to_raw(self):
+        """Inverse of from_raw"""
+        return (self.id, self.first_name, self.last_name, self.program)
+
     def __str__(self):
         return "{0} {1} ({2})".format(self.first_name,
                                       self.last_name,
                                       self.program)
 
 
+class FacultyStudent(models.Model):
+    """Local copy of the student table of the faculty DB, kept up to date
+    by the sync_students command. The checksum over all columns is used to
+    detect changed records."""
+
+    class Meta:
+        db_table = 'student_mirror'
+
+    id = models.IntegerField(primary_key=True)
+    first_name = models.CharField(max_length=30)
+    last_name = models.CharField(max_length=30)
+    program = models.CharField(max_length=10)
+    checksum = models.CharField(max_length=32)
+    synced_at = models.DateTimeField()
+
+    @staticmethod
+    def checksum_of(record):
+        """Checksum of a raw record (id, firstname, lastname, program)"""
+        data = "\x1f".join(str(value) for value in record)
+        return hashlib.md5(data.encode()).hexdigest()
+
+    def __str__(self):
+        return "{0} {1} ({2})".format(self.first_name,
+                                      self.last_name,
+                                      self.program)
+
+
+class ThesisChanged(Exception):
+    """A thesis was changed by another request since it was read, its
+    state transition was not written"""
+    pass
+
+
 class Thesis(models.Model):
     class Meta:
         verbose_name_plural = "theses"
@@ -231,6 +467,8 @@ class Thesis(models.Model):
     examination_date = models.DateField(blank=True, null=True)
     handed_in_date = models.DateField(blank=True, null=True)
     restriction_note = models.BooleanField(blank=True, null=True)
+    # incremented by every state transition, see _transition
+    version = models.PositiveIntegerField(default=0, editable=False)
 
     objects = ThesisManager()
 
@@ -242,15 +480,12 @@ class Thesis(models.Model):
         excom_chairman = ExcomChairman.from_user(user)
         excom_chairman.save()
 
-        self.excom_chairman = excom_chairman
-        self.excom_approval_date = datetime.now().date()
-        self.excom_status = Thesis.EXCOM_APPROVED
-
-        self.clean_fields()
-        self.save()
-
-        return True
+        return self._transition(Q(excom_status=self.excom_status),
+                                excom_chairman=excom_chairman,
+                                excom_approval_date=datetime.now().date(),
+                                excom_status=Thesis.EXCOM_APPROVED)
 
+    @transaction.atomic
     def reject(self, user, reason):
         if self.excom_status > Thesis.APPLIED:
             return False
@@ -258,24 +493,26 @@ class Thesis(models.Model):
         excom_chairman = ExcomChairman.from_user(user)
         excom_chairman.save()
 
-        self.excom_chairman = excom_chairman
+        return self._transition(Q(excom_status=self.excom_status),
+                                excom_chairman=excom_chairman,
+                                excom_status=Thesis.EXCOM_REJECTED,
+                                excom_reject_reason=reason)
 
-        self.excom_status = Thesis.EXCOM_REJECTED
-        self.excom_reject_reason = reason
-        self.clean_fields()
-        self.save()
-
-        return True
+    def change_application(self, **changes):
+        """Write the edited application data, e.g. title and dates, without
+        touching status, grades or the excom decision"""
+        return self._transition(Q(), **changes)
 
     def assign_grade(self, grade, assessor_grade, examination_date, restriction_note=False):
         """Assign grade and set status to GRADED, validation performed in GradeForm"""
-        self.grade = grade
-        self.assessor_grade = assessor_grade
-        self.examination_date = examination_date
-        self.restriction_note = restriction_note
-        self.clean_fields()
-        self.status = Thesis.GRADED
-        self.save()
+        self._transition(Q(status=self.status),
+                         grade=grade,
+                         assessor_grade=assessor_grade,
+                         examination_date=examination_date,
+                         restriction_note=restriction_note,
+                         status=Thesis.GRADED)
+
+        prerender(self, GradingPDF)
 
         return True
 
@@ -283,13 +520,13 @@ class Thesis(models.Model):
         if self.status >= Thesis.HANDED_IN:
             return False
 
-        self.prolongation_date = prolongation_date
-        self.prolongation_reason = reason
-        self.prolongation_weeks = weeks
+        self._transition(Q(status=self.status),
+                         prolongation_date=prolongation_date,
+                         prolongation_reason=reason,
+                         prolongation_weeks=weeks,
+                         status=Thesis.PROLONGED)
 
-        self.full_clean()
-        self.status = Thesis.PROLONGED
-        self.save()
+        prerender(self, ProlongationPDF)
 
         return True
 
@@ -300,15 +537,50 @@ class Thesis(models.Model):
         if self.status == Thesis.HANDED_IN:
             return False
 
-        self.handed_in_date = handed_in_date
-        self.restriction_note = restriction_note
-        self.full_clean()
-        if self.status < Thesis.HANDED_IN:
-            self.status = Thesis.HANDED_IN
-        self.save()
+        return self._transition(Q(status=self.status),
+                                handed_in_date=handed_in_date,
+                                restriction_note=restriction_note,
+                                status=max(self.status, Thesis.HANDED_IN))
+
+    def _transition(self, condition, **changes):
+        """Validate the changed fields and write only them with a single
+        UPDATE, if the row still matches condition and the version this
+        instance was read with. Raises ThesisChanged and leaves the instance
+        as it was if another request changed the thesis in between."""
+        previous = {name: getattr(self, name) for name in changes}
+
+        for name, value in changes.items():
+            setattr(self, name, value)
+
+        try:
+            self.clean_fields(exclude=[field.name for field in self._meta.fields
+                                       if field.name not in changes])
+            self.clean_prolongation()
+        except ValidationError:
+            self._restore(previous)
+            raise
+
+        if self.pk is None:
+            # a new thesis has no row another request could have changed
+            self.save()
+            return True
+
+        updated = Thesis.objects.filter(condition, pk=self.pk, version=self.version).update(
+            version=models.F('version') + 1,
+            **{name: getattr(self, name) for name in changes})
+
+        if not updated:
+            self._restore(previous)
+            raise ThesisChanged("thesis {0} was changed since version {1}".format(self.pk, self.version))
+
+        self.version += 1
 
         return True
 
+    def _restore(self, values):
+        for name, value in values.items():
+            setattr(self, name, value)
+
     @property
     def deadline(self):
         return self.prolongation_date if self.is_prolonged() else self.due_date
@@ -348,7 +620,9 @@ class Thesis(models.Model):
 
     def clean(self):
         self.clean_fields()
+        self.clean_prolongation()
 
+    def clean_prolongation(self):
         if self.is_prolonged() and self.prolongation_date <= self.due_date:
             raise ValidationError(
                 {'prolongation_date': 'prolongation date must be later than due date'})
@@ -357,6 +631,23 @@ class Thesis(models.Model):
         return "'{0}' ({1})".format(self.title, self.student)
 
 
+class ThesisSearchIndex(models.Model):
+    """The full text index of Thesis (see website.search), only read by
+    joining it in ThesisQuerySet.search. The table only exists on SQLite."""
+    thesis = models.OneToOneField(Thesis,
+                                  on_delete=models.DO_NOTHING,
+                                  primary_key=True,
+                                  db_column='rowid',
+                                  db_constraint=False,
+                                  related_name='search_index')
+    document = FTSDocumentField(db_column=FTS_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABLE
+
+
 class ExcomChairman(models.Model):
     first_name = models.CharField(max_length=30, verbose_name="Vorname")
     last_name = models.CharField(max_length=30, verbose_name="Nachname")
@@ -436,3 +727,170 @@ class Assessor(models.Model):
                                 self.last_name)
 
     __repr__ = __str__
+
+
+class SearchTokenManager(models.Manager):
+
+    def matching(self, kind, text):
+        """Subquery of the ids of all objects of kind where every word of
+        text is the prefix of one of their tokens"""
+        ids = None
+
+        for term in search_terms(text):
+            tokens = self.filter(kind=kind,
+                                 token__gte=term,
+                                 token__lt=term + chr(0x10FFFF))
+            if ids is not None:
+                tokens = tokens.filter(object_id__in=ids)
+
+            ids = tokens.values('object_id')
+
+        return ids if ids is not None else self.none().values('object_id')
+
+    def index(self, kind, object_id, *values, using='default'):
+        """Replace the tokens of an object"""
+        tokens = self.db_manager(using)
+        tokens.filter(kind=kind, object_id=object_id).delete()
+        tokens.bulk_create([SearchToken(kind=kind, object_id=object_id, token=token)
+                            for token in name_tokens(*values)])
+
+    def remove(self, kind, object_id, using='default'):
+        self.db_manager(using).filter(kind=kind, object_id=object_id).delete()
+
+
+class SearchToken(models.Model):
+    """Normalized (case and umlaut folded) name tokens and matriculation
+    numbers of students and assessors. Prefix searches are range scans on
+    the (kind, token) index."""
+    STUDENT = 's'
+    ASSESSOR = 'a'
+    KIND_CHOICES = (
+        (STUDENT, 'Student'),
+        (ASSESSOR, 'Zweitkorrektor'),
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'token']),
+            models.Index(fields=['kind', 'object_id']),
+        ]
+
+    kind = models.CharField(max_length=1, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    token = models.CharField(max_length=60)
+
+    objects = SearchTokenManager()
+
+    def __str__(self):
+        return "{0}:{1} {2}".format(self.kind, self.object_id, self.token)
+
+
+class RenderJobManager(models.Manager):
+
+    def claim(self):
+        """Mark the oldest queued job as running and return it, None if no
+        job is queued. A job is claimed by a single worker only."""
+        for job in self.filter(status=RenderJob.QUEUED).order_by('created', 'id')[:10]:
+            claimed = self.filter(pk=job.pk, status=RenderJob.QUEUED).update(
+                status=RenderJob.RUNNING, started=timezone.now())
+            if claimed:
+                job.refresh_from_db()
+                return job
+
+        return None
+
+    def requeue(self):
+        """Queue jobs again that were interrupted while running"""
+        return self.filter(status=RenderJob.RUNNING).update(status=RenderJob.QUEUED,
+                                                            started=None, done=0)
+
+    def expire(self):
+        """Delete expired jobs and their files, return the number deleted"""
+        expired = self.filter(expires__lt=timezone.now()).exclude(status=RenderJob.RUNNING)
+
+        for job in expired:
+            job.remove_file()
+
+        return expired.delete()[0]
+
+
+class RenderJob(models.Model):
+    """PDFs rendered in the background by the run_render_jobs command. The
+    result is written below RENDER_JOBS['DIR'] and deleted with the job
+    RENDER_JOBS['EXPIRE_AFTER'] seconds after the job finished."""
+    EXPORT = 'export'
+    DOSSIER = 'dossier'
+    KIND_CHOICES = (
+        (EXPORT, 'Export'),
+        (DOSSIER, 'Dossier'),
+    )
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'Wartend'),
+        (RUNNING, 'Läuft'),
+        (DONE, 'Fertig'),
+        (FAILED, 'Fehlgeschlagen'),
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created']),
+        ]
+
+    key = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    params = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    done = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+    path = models.CharField(max_length=500, blank=True)
+    filename = models.CharField(max_length=200, blank=True)
+    error = models.CharField(max_length=2000, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(blank=True, null=True)
+    finished = models.DateTimeField(blank=True, null=True)
+    expires = models.DateTimeField(blank=True, null=True)
+
+    objects = RenderJobManager()
+
+    def progress(self, done, total=None):
+        self.done = done
+        fields = {'done': done}
+
+        if total is not None:
+            self.total = fields['total'] = total
+
+        RenderJob.objects.filter(pk=self.pk).update(**fields)
+
+    def finish(self, path, filename):
+        self.path = path
+        self.filename = filename
+        self.end(RenderJob.DONE)
+
+    def fail(self, error):
+        self.error = error[:2000]
+        self.end(RenderJob.FAILED)
+
+    def end(self, status):
+        self.status = status
+        self.finished = timezone.now()
+        self.expires = self.finished + timedelta(
+            seconds=settings.RENDER_JOBS.get('EXPIRE_AFTER', 24 * 3600))
+        self.save()
+
+    def remove_file(self):
+        if self.path:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def is_done(self):
+        return self.status == RenderJob.DONE
+
+    def __str__(self):
+        return "{0} {1} ({2})".format(self.kind, self.key, self.status)
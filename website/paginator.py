@@ -0,0 +1,188 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+
+
+class KeysetPage(object):
+    """A single page of objects with the cursors of its neighbours"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+
+class KeysetPaginator(object):
+    """Cursor based (keyset) pagination of a queryset.
+
+    Instead of an offset, a cursor stores the sort key values of the last
+    (or first) row of a page and the next page is fetched with a WHERE
+    clause on these values, so that deep pages are as cheap as the first.
+
+    The ordering is a list of (column, descending) pairs and has to end
+    with a unique column (e.g. id). NULL values are ordered last.
+    """
+    NEXT = "n"
+    PREVIOUS = "p"
+
+    def __init__(self, queryset, ordering, page_size):
+        self.queryset = queryset
+        self.ordering = ordering
+        self.page_size = page_size
+
+    def page(self, cursor=None):
+        """Return the page referenced by cursor, the first page if the
+        cursor is missing or invalid"""
+        direction, values = self._decode(cursor)
+
+        if values is None:
+            rows = list(self._ordered(reverse=False)[:self.page_size + 1])
+
+            return KeysetPage(rows[:self.page_size],
+                              next_cursor=self._next_cursor(rows))
+
+        if direction == self.NEXT:
+            rows = list(self._ordered(reverse=False).filter(
+                self._after(values))[:self.page_size + 1])
+
+            return KeysetPage(rows[:self.page_size],
+                              next_cursor=self._next_cursor(rows),
+                              previous_cursor=self._previous_cursor(rows))
+
+        rows = list(self._ordered(reverse=True).filter(
+            self._before(values))[:self.page_size + 1])
+        has_previous = len(rows) > self.page_size
+        rows = rows[:self.page_size][::-1]
+
+        return KeysetPage(rows,
+                          next_cursor=self._encode(self.NEXT, rows[-1]) if rows else None,
+                          previous_cursor=self._previous_cursor(rows) if has_previous else None)
+
+    def _ordered(self, reverse):
+        """Order by all key columns, reverse flips every column including
+        the position of NULL values"""
+        nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+        expressions = []
+
+        for column, descending in self.ordering:
+            if descending != reverse:
+                expressions.append(F(column).desc(**nulls))
+            else:
+                expressions.append(F(column).asc(**nulls))
+
+        return self.queryset.order_by(*expressions)
+
+    def _after(self, values):
+        """Rows ordered behind the row with the given sort key values"""
+        condition = Q(pk__in=[])
+        equal = Q()
+
+        for (column, descending), value in zip(self.ordering, values):
+            if value is not None:
+                lookup = "__lt" if descending else "__gt"
+                condition |= equal & (Q(**{column + lookup: value}) |
+                                      Q(**{column + "__isnull": True}))
+            equal &= self._equal(column, value)
+
+        return condition
+
+    def _before(self, values):
+        """Rows ordered in front of the row with the given sort key values"""
+        condition = Q(pk__in=[])
+        equal = Q()
+
+        for (column, descending), value in zip(self.ordering, values):
+            if value is None:
+                condition |= equal & Q(**{column + "__isnull": False})
+            else:
+                lookup = "__gt" if descending else "__lt"
+                condition |= equal & Q(**{column + lookup: value})
+            equal &= self._equal(column, value)
+
+        return condition
+
+    def _equal(self, column, value):
+        if value is None:
+            return Q(**{column + "__isnull": True})
+
+        return Q(**{column: value})
+
+    def _next_cursor(self, rows):
+        if len(rows) > self.page_size:
+            return self._encode(self.NEXT, rows[self.page_size - 1])
+
+        return None
+
+    def _previous_cursor(self, rows):
+        return self._encode(self.PREVIOUS, rows[0]) if rows else None
+
+    def _values(self, row):
+        """Read the sort key values from a row, following relations"""
+        values = []
+
+        for column, _ in self.ordering:
+            value = row
+            for attribute in column.split("__"):
+                value = getattr(value, attribute) if value is not None else None
+            values.append(value)
+
+        return values
+
+    def _encode(self, direction, row):
+        data = json.dumps([direction, self._values(row)], cls=DjangoJSONEncoder)
+
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def _decode(self, cursor):
+        if not cursor:
+            return None, None
+
+        try:
+            direction, values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (ValueError, TypeError, binascii.Error):
+            return None, None
+
+        if direction not in (self.NEXT, self.PREVIOUS) or \
+                not isinstance(values, list) or len(values) != len(self.ordering):
+            return None, None
+
+        try:
+            values = [self._field(column).to_python(value)
+                      for (column, _), value in zip(self.ordering, values)]
+        except (ValidationError, ValueError, TypeError):
+            return None, None
+
+        return direction, values
+
+    def _field(self, column):
+        """Model field of an ordering column, following relations, or the
+        output field of an annotation"""
+        annotations = self.queryset.query.annotations
+        if column in annotations:
+            return annotations[column].output_field
+
+        model = self.queryset.model
+        for name in column.split("__"):
+            field = model._meta.get_field(name)
+            model = field.related_model
+
+        return field
@@ -0,0 +1,55 @@
+import functools
+import logging
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode if a view issues more queries than allowed"""
+    pass
+
+
+class QueryCounter(object):
+    """Execute wrapper counting all queries sent to the database"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def query_budget(budget=None):
+    """Limit the number of queries a view may issue (including rendering).
+
+    The limit defaults to settings.QUERY_BUDGET. Exceeding it logs a warning,
+    with settings.QUERY_BUDGET_STRICT enabled (e.g. in tests) an exception
+    is raised instead.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            limit = budget if budget is not None else settings.QUERY_BUDGET
+            counter = QueryCounter()
+
+            with connection.execute_wrapper(counter):
+                response = view(*args, **kwargs)
+
+            if counter.count > limit:
+                message = "{0} issued {1} queries (budget: {2})".format(
+                    view.__qualname__, counter.count, limit)
+
+                if settings.QUERY_BUDGET_STRICT:
+                    raise QueryBudgetExceeded(message)
+
+                logger.warning(message)
+
+            return response
+
+        return wrapper
+
+    return decorator
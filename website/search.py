@@ -0,0 +1,160 @@
+import re
+import unicodedata
+
+from django.db import connections, models
+
+# Full text index over Thesis, an external content FTS5 table kept in sync
+# by triggers, so that queryset.update() and raw SQL are covered as well.
+FTS_TABLE = "website_thesis_fts"
+FTS_COLUMNS = ["title", "external_where", "prolongation_reason", "excom_reject_reason"]
+
+_fts_available = {}
+
+# Umlauts are indexed both as base vowel and as their transcription, so
+# "Müller" is found by "Muller" as well as by "Mueller"
+TRANSCRIPTIONS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+TOKEN_LENGTH = 60
+
+
+class Match(models.Lookup):
+    """FTS5 full text query, column MATCH query"""
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+
+        return "{0} MATCH {1}".format(lhs, rhs), lhs_params + rhs_params
+
+
+class FTSDocumentField(models.TextField):
+    """The hidden column of an FTS5 table that is named like the table,
+    MATCH on it searches all indexed columns"""
+    pass
+
+
+FTSDocumentField.register_lookup(Match)
+
+
+def install_fts(schema_editor):
+    """Create the FTS5 table with its triggers and index all theses.
+
+    SQLite drops triggers whenever Django rebuilds website_thesis (e.g. when
+    adding a NOT NULL column), migrations doing so have to call this again.
+    Does nothing on backends without FTS5.
+    """
+    connection = schema_editor.connection
+
+    if not _supports_fts5(connection):
+        return
+
+    columns = ", ".join(FTS_COLUMNS)
+    new_values = ", ".join("new." + column for column in FTS_COLUMNS)
+    old_values = ", ".join("old." + column for column in FTS_COLUMNS)
+
+    remove_fts(schema_editor)
+
+    statements = [
+        "CREATE VIRTUAL TABLE {table} USING fts5({columns}, "
+        "content='website_thesis', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+
+        "CREATE TRIGGER {table}_insert AFTER INSERT ON website_thesis BEGIN "
+        "INSERT INTO {table}(rowid, {columns}) VALUES (new.id, {new_values}); "
+        "END",
+
+        "CREATE TRIGGER {table}_delete AFTER DELETE ON website_thesis BEGIN "
+        "INSERT INTO {table}({table}, rowid, {columns}) "
+        "VALUES ('delete', old.id, {old_values}); "
+        "END",
+
+        "CREATE TRIGGER {table}_update AFTER UPDATE OF {columns} ON website_thesis BEGIN "
+        "INSERT INTO {table}({table}, rowid, {columns}) "
+        "VALUES ('delete', old.id, {old_values}); "
+        "INSERT INTO {table}(rowid, {columns}) VALUES (new.id, {new_values}); "
+        "END",
+
+        # index all existing rows
+        "INSERT INTO {table}({table}) VALUES ('rebuild')",
+    ]
+
+    for statement in statements:
+        schema_editor.execute(statement.format(table=FTS_TABLE,
+                                               columns=columns,
+                                               new_values=new_values,
+                                               old_values=old_values))
+
+    _fts_available.clear()
+
+
+def remove_fts(schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    for trigger in ["insert", "delete", "update"]:
+        schema_editor.execute("DROP TRIGGER IF EXISTS {0}_{1}".format(FTS_TABLE, trigger))
+
+    schema_editor.execute("DROP TABLE IF EXISTS {0}".format(FTS_TABLE))
+
+    _fts_available.clear()
+
+
+def fts_available(using):
+    """Check (once per database) whether the full text index exists"""
+    if using not in _fts_available:
+        connection = connections[using]
+        _fts_available[using] = connection.vendor == "sqlite" and \
+            FTS_TABLE in connection.introspection.table_names()
+
+    return _fts_available[using]
+
+
+def fts_query(text, column=None):
+    """Build an FTS5 query matching all words of text as prefixes,
+    optionally restricted to a single column. Returns None if text
+    contains no words."""
+    words = re.findall(r"\w+", text)
+
+    if not words:
+        return None
+
+    query = " ".join('"{0}"*'.format(word) for word in words)
+
+    if column:
+        return "{{{0}}} : ({1})".format(column, query)
+
+    return query
+
+
+def _supports_fts5(connection):
+    if connection.vendor != "sqlite":
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def fold(word):
+    """Lower case word and strip all accents (ß becomes ss)"""
+    word = unicodedata.normalize("NFKD", word.lower().replace("ß", "ss"))
+
+    return "".join(char for char in word if not unicodedata.combining(char))
+
+
+def name_tokens(*values):
+    """Normalized search tokens for names and numbers, names are split
+    into words (e.g. double names)"""
+    tokens = set()
+
+    for value in values:
+        for word in re.findall(r"\w+", str(value or "")):
+            tokens.add(fold(word)[:TOKEN_LENGTH])
+            tokens.add(fold(word.lower().translate(TRANSCRIPTIONS))[:TOKEN_LENGTH])
+
+    return tokens
+
+
+def search_terms(text):
+    """Normalized terms of a search input, each has to prefix match a token"""
+    return [fold(word)[:TOKEN_LENGTH] for word in re.findall(r"\w+", text)]
@@ -0,0 +1,41 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from website.models import Student, Assessor, SearchToken, Thesis
+from thesispool.pdf import ApplicationPDF
+from thesispool.prerender import prerender
+
+
+@receiver(post_save, sender=Student)
+def index_student(sender, instance, using, **kwargs):
+    SearchToken.objects.index(SearchToken.STUDENT,
+                              instance.id,
+                              instance.id,
+                              instance.first_name,
+                              instance.last_name,
+                              using=using)
+
+
+@receiver(post_save, sender=Assessor)
+def index_assessor(sender, instance, using, **kwargs):
+    SearchToken.objects.index(SearchToken.ASSESSOR,
+                              instance.id,
+                              instance.first_name,
+                              instance.last_name,
+                              using=using)
+
+
+@receiver(post_delete, sender=Student)
+def remove_student(sender, instance, using, **kwargs):
+    SearchToken.objects.remove(SearchToken.STUDENT, instance.id, using=using)
+
+
+@receiver(post_delete, sender=Assessor)
+def remove_assessor(sender, instance, using, **kwargs):
+    SearchToken.objects.remove(SearchToken.ASSESSOR, instance.id, using=using)
+
+
+@receiver(post_save, sender=Thesis)
+def prerender_application(sender, instance, created, **kwargs):
+    if created:
+        prerender(instance, ApplicationPDF)
@@ -1,9 +1,53 @@
-from django.test import TestCase, Client
+import os
+import subprocess
+import tempfile
+
+from django.test import TestCase, Client, override_settings
 from website.models import *
 
 from datetime import date, datetime
 
 
+def fake_pdftk(args, input=None, **kwargs):
+    """Returns the XFDF it was given as output PDF, joined PDFs one after
+    another"""
+    if "cat" in args:
+        joined = b""
+        for path in args[1:args.index("cat")]:
+            with open(path, "rb") as pdf:
+                joined += pdf.read()
+        return subprocess.CompletedProcess(args, 0, stdout=joined, stderr=b"")
+
+    if args[3] == "-":
+        return subprocess.CompletedProcess(args, 0, stdout=input, stderr=b"")
+
+    with open(args[3], "rb") as xfdf, open(args[5], "wb") as pdf:
+        pdf.write(xfdf.read())
+
+    return subprocess.CompletedProcess(args, 0)
+
+
+class TemporaryPDFMixin(object):
+    """Generated PDFs and the cache go to self.tmp, a directory removed
+    after each test. Patch subprocess.run with fake_pdftk to render without
+    pdftk"""
+
+    def pdf_settings(self, directory):
+        return {'PDF_ENGINE': 'pdftk',
+                'PDFTK_PIPE': True,
+                'SENDFILE_ROOT': directory,
+                'PDF_CACHE': {'DIR': os.path.join(directory, 'cache')}}
+
+    def setUp(self):
+        super(TemporaryPDFMixin, self).setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+        override = override_settings(**self.pdf_settings(self.tmp.name))
+        override.enable()
+        self.addCleanup(override.disable)
+
+
 class ThesisStub(object):
 
     @classmethod
@@ -0,0 +1,91 @@
+from django.test import TestCase, override_settings
+
+from website.cache import LRUCache, student_cache
+from website.forms import StudentForm
+from website.models import *
+
+LRU = {'BACKEND': 'lru', 'TIMEOUT': 300, 'NEGATIVE_TIMEOUT': 60, 'MAX_SIZE': 10}
+DJANGO = {'BACKEND': 'django', 'TIMEOUT': 300, 'NEGATIVE_TIMEOUT': 60, 'CACHE_ALIAS': 'default'}
+
+
+class LRUCacheTests(TestCase):
+
+    def test_least_recently_used_entries_are_dropped(self):
+        cache = LRUCache(2)
+        cache.set("a", 1, 10)
+        cache.set("b", 2, 10)
+        cache.get("a")
+        cache.set("c", 3, 10)
+
+        self.assertEqual(1, cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(3, cache.get("c"))
+
+    def test_expired_entries_are_not_returned(self):
+        cache = LRUCache(2)
+        cache.set("a", 1, -1)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(0, len(cache))
+
+
+class StudentCacheTests(TestCase):
+    databases = {'default', 'faculty'}
+
+    def setUp(self):
+        student_cache.clear()
+        self.student = Student(id=123456, first_name="Peter", last_name="Petermann", program="IB")
+
+    def tearDown(self):
+        student_cache.clear()
+
+    def assert_cached(self):
+        self.student.save(using='faculty')
+
+        self.assertEqual(self.student, Student.objects.find(123456))
+
+        Student.objects.using('faculty').filter(id=123456).update(last_name="Geändert")
+        found = Student.objects.find(123456)
+
+        self.assertEqual("Petermann", found.last_name)
+        self.assertEqual({'hits': 1, 'negative_hits': 0, 'misses': 1}, student_cache.stats())
+
+    @override_settings(STUDENT_CACHE=LRU)
+    def test_lru_cache(self):
+        self.assert_cached()
+
+    @override_settings(STUDENT_CACHE=DJANGO)
+    def test_django_cache(self):
+        self.assert_cached()
+
+    @override_settings(STUDENT_CACHE=LRU)
+    def test_unknown_numbers_are_cached(self):
+        self.assertIsNone(Student.objects.find(123456))
+
+        self.student.save(using='faculty')
+
+        self.assertIsNone(Student.objects.find(123456))
+        self.assertEqual(1, student_cache.stats()['negative_hits'])
+
+    @override_settings(STUDENT_CACHE=dict(LRU, NEGATIVE_TIMEOUT=-1))
+    def test_negative_entries_expire(self):
+        self.assertIsNone(Student.objects.find(123456))
+
+        self.student.save(using='faculty')
+
+        self.assertEqual(self.student, Student.objects.find(123456))
+
+    @override_settings(STUDENT_CACHE=LRU)
+    def test_creating_a_student_invalidates_cache(self):
+        self.assertIsNone(Student.objects.find(654321))
+
+        form = StudentForm({'id': 654321, 'first_name': "Linus",
+                            'last_name': "Kanstein", 'program': "IJB"})
+        form.create_student()
+
+        self.assertEqual(1, student_cache.stats()['negative_hits'])
+
+        Student.objects.find(654321)
+
+        self.assertEqual(1, student_cache.stats()['negative_hits'])
+        self.assertEqual(2, student_cache.stats()['misses'])
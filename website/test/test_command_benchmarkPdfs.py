@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from website.management.commands.benchmark_pdfs import percentile
+from website.test.test import TemporaryPDFMixin, fake_pdftk
+
+
+class BenchmarkPdfsCommandTests(TemporaryPDFMixin, SimpleTestCase):
+
+    def setUp(self):
+        super(BenchmarkPdfsCommandTests, self).setUp()
+        self.output = os.path.join(self.tmp.name, "benchmark.json")
+
+    @override_settings(PDF_ENGINE='pdftk', PDFTK_PIPE=True)
+    @mock.patch("thesispool.pdf_engine.subprocess.run", side_effect=fake_pdftk)
+    def test_cold_and_warm_runs_are_written_to_json(self, run):
+        out = StringIO()
+        call_command('benchmark_pdfs', '--count', '3', '--concurrency', '1', '2',
+                     '--forms', 'application', 'grading', '--output', self.output, stdout=out)
+
+        with open(self.output) as f:
+            report = json.load(f)
+
+        results = report['results']
+
+        self.assertEqual(8, len(results))
+        self.assertEqual({'application', 'grading'}, {r['form'] for r in results})
+        self.assertEqual([3] * 8, [r['renders'] for r in results])
+        self.assertTrue(all(r['p50_ms'] <= r['p95_ms'] <= r['p99_ms'] for r in results))
+        self.assertGreater(report['peak_rss_kib'], 0)
+        self.assertGreaterEqual(report['peak_rss_children_kib'], 0)
+        self.assertIn("peak RSS", out.getvalue())
+
+        # pdftk only runs for the cold cache
+        self.assertEqual(2 * 2 * 3, run.call_count)
+
+    @override_settings(PDF_ENGINE='pdftk', PDFTK_PIPE=False)
+    @mock.patch("thesispool.pdf_engine.subprocess.run", side_effect=fake_pdftk)
+    def test_files_are_written_to_the_scratch_directory(self, run):
+        call_command('benchmark_pdfs', '--count', '2', '--concurrency', '1',
+                     '--forms', 'application', '--output', self.output, stdout=StringIO())
+
+        # each run renders into a directory of its own, removed afterwards
+        self.assertEqual(["benchmark.json"], os.listdir(self.tmp.name))
+        self.assertFalse(os.path.exists(os.path.dirname(run.call_args[0][0][-2])))
+
+    @override_settings(PDF_ENGINE='pdftk', PDFTK_PIPE=True)
+    @mock.patch("thesispool.pdf_engine.subprocess.run",
+                side_effect=[subprocess.TimeoutExpired("pdftk", 1), OSError("no pdftk")] * 2)
+    def test_failed_samples_are_counted(self, run):
+        call_command('benchmark_pdfs', '--count', '2', '--concurrency', '1',
+                     '--forms', 'application', '--output', self.output, stdout=StringIO())
+
+        with open(self.output) as f:
+            cold, warm = json.load(f)['results']
+
+        self.assertEqual([(0, 2), (0, 2)], [(r['renders'], r['errors']) for r in (cold, warm)])
+
+    def test_invalid_count(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_pdfs', '--count', '0', stdout=StringIO())
+
+    def test_percentile(self):
+        latencies = list(range(1, 101))
+
+        self.assertEqual(50, percentile(latencies, 50))
+        self.assertEqual(95, percentile(latencies, 95))
+        self.assertEqual(99, percentile(latencies, 99))
+        self.assertEqual(7, percentile([7], 99))
+        self.assertIsNone(percentile([], 50))
@@ -0,0 +1,71 @@
+import os
+import tempfile
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from website.models import *
+
+
+class RunRenderJobsCommandTests(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.user = User(username="prof", password="pass")
+        self.user.save()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def job(self, **fields):
+        return RenderJob.objects.create(user=self.user, kind=RenderJob.EXPORT,
+                                        params={"query": "forms=application"}, **fields)
+
+    def test_claim_takes_the_oldest_queued_job_once(self):
+        first = self.job()
+        second = self.job()
+        self.job(status=RenderJob.DONE)
+
+        self.assertEqual(first, RenderJob.objects.claim())
+        self.assertEqual(second, RenderJob.objects.claim())
+        self.assertIsNone(RenderJob.objects.claim())
+        self.assertEqual(RenderJob.RUNNING, RenderJob.objects.get(pk=first.pk).status)
+
+    def test_expired_jobs_and_files_are_removed(self):
+        path = os.path.join(self.tmp.name, "result.zip")
+        open(path, "wb").close()
+
+        expired = self.job(status=RenderJob.DONE, path=path,
+                           expires=timezone.now() - timedelta(seconds=1))
+        kept = self.job(status=RenderJob.DONE, expires=timezone.now() + timedelta(hours=1))
+
+        out = StringIO()
+        call_command('run_render_jobs', '--once', stdout=out)
+
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(RenderJob.objects.filter(pk=expired.pk).exists())
+        self.assertTrue(RenderJob.objects.filter(pk=kept.pk).exists())
+        self.assertIn("1 expired jobs removed", out.getvalue())
+
+    def test_finished_jobs_expire_after_setting(self):
+        job = self.job()
+
+        with override_settings(RENDER_JOBS={'EXPIRE_AFTER': 60}):
+            job.finish("/tmp/x.zip", "x.zip")
+
+        self.assertEqual(timedelta(seconds=60), job.expires - job.finished)
+
+    def test_interrupted_jobs_are_queued_again(self):
+        job = self.job(status=RenderJob.RUNNING, done=3)
+
+        with override_settings(RENDER_JOBS={'DIR': self.tmp.name}):
+            out = StringIO()
+            call_command('run_render_jobs', '--once', stdout=out)
+
+        job.refresh_from_db()
+        self.assertIn("1 interrupted jobs queued again", out.getvalue())
+        self.assertEqual(RenderJob.DONE, job.status)
@@ -0,0 +1,102 @@
+import os
+import time
+
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+
+from thesispool.pdf import ApplicationPDF
+from thesispool.pdf_cache import pdf_cache
+from thesispool.scratch import scratch_space
+from website.models import *
+from website.test.test import TemporaryPDFMixin, ThesisStub, fake_pdftk
+
+
+class SweepPdfsCommandTests(TemporaryPDFMixin, TestCase):
+
+    def pdf_settings(self, directory):
+        return dict(super(SweepPdfsCommandTests, self).pdf_settings(directory),
+                    PDF_CACHE={'DIR': os.path.join(directory, 'cache'), 'MAX_SIZE': 1000},
+                    PDF_SCRATCH={'MAX_AGE': 3600, 'MIN_AGE': 60, 'MAX_SIZE': 1000, 'SWEEP_INTERVAL': 300})
+
+    def setUp(self):
+        super(SweepPdfsCommandTests, self).setUp()
+        scratch_space.reset_stats()
+
+    def generated(self, name, size, age):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        modified = time.time() - age
+        os.utime(path, (modified, modified))
+        return path
+
+    def sweep(self, *args):
+        out = StringIO()
+        call_command('sweep_pdfs', *args, stdout=out)
+        return out.getvalue()
+
+    def test_old_files_are_removed(self):
+        old = self.generated("gen_old.pdf", 10, 7200)
+        recent = self.generated("gen_recent.pdf", 10, 120)
+        other = self.generated("other.pdf", 10, 7200)
+
+        output = self.sweep()
+
+        self.assertIn("1 files removed (10 bytes)", output)
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(recent))
+        self.assertTrue(os.path.exists(other))
+
+    def test_oldest_files_are_removed_to_fit_size_budget(self):
+        oldest = self.generated("gen_a.pdf", 400, 600)
+        older = self.generated("gen_b.pdf", 400, 500)
+        fresh = self.generated("gen_c.pdf", 400, 10)
+
+        self.sweep()
+
+        self.assertFalse(os.path.exists(oldest))
+        self.assertTrue(os.path.exists(older))
+        self.assertTrue(os.path.exists(fresh))
+
+    def test_cache_is_shrunk_when_over_budget(self):
+        pdf_cache.put("a", self.generated("gen_a.pdf", 600, 0))
+        pdf_cache.put("b", self.generated("gen_b.pdf", 300, 0))
+        os.utime(pdf_cache.path("a"), (time.time() - 120, time.time() - 120))
+        self.generated("gen_c.pdf", 300, 10)
+
+        self.sweep()
+
+        self.assertLessEqual(sum(scratch_space.usage()[k] for k in ['scratch_bytes', 'cache_bytes']), 1000)
+        self.assertEqual(1, scratch_space.stats()['removed_files'])
+
+    def test_recently_used_cache_files_are_kept(self):
+        pdf_cache.put("a", self.generated("gen_a.pdf", 1200, 0))
+
+        self.sweep()
+
+        self.assertIsNotNone(pdf_cache.get("a"))
+
+    def test_stats_only(self):
+        old = self.generated("gen_old.pdf", 10, 7200)
+
+        output = self.sweep("--stats")
+
+        self.assertIn("scratch: 1 files (10 bytes), cache: 0 files (0 bytes)", output)
+        self.assertTrue(os.path.exists(old))
+
+    @mock.patch("thesispool.pdf_engine.subprocess.run", side_effect=fake_pdftk)
+    def test_xfdf_is_removed_after_merge(self, run):
+        supervisor = Supervisor(first_name="Max", last_name="Muster", id="mmuster", initials="MMU")
+        pdf = ApplicationPDF(ThesisStub.applied(supervisor))
+
+        with self.settings(PDFTK_PIPE=False,
+                           PDF_SCRATCH=dict(settings.PDF_SCRATCH, MAX_SIZE=1024 * 1024),
+                           PDF_CACHE=dict(settings.PDF_CACHE, MAX_SIZE=1024 * 1024)):
+            pdf.get()
+
+        self.assertEqual([], [f for f in os.listdir(self.tmp.name) if f.endswith(".xfdf")])
+        self.assertEqual(1, scratch_space.usage()['cache_files'])
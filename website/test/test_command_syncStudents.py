@@ -0,0 +1,75 @@
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from io import StringIO
+
+from website.models import *
+
+
+class SyncStudentsCommandTests(TestCase):
+    databases = {'default', 'faculty'}
+
+    def setUp(self):
+        for id, last_name in [(100001, "Adam"), (100002, "Berg"), (100003, "Christ")]:
+            Student(id=id, first_name="Eva", last_name=last_name, program="IB").save(using='faculty')
+
+    def sync(self, **options):
+        out = StringIO()
+        call_command('sync_students', batch_size=2, stdout=out, **options)
+        return out.getvalue()
+
+    def test_initial_load(self):
+        output = self.sync()
+
+        self.assertIn("3 students: 3 created, 0 updated, 0 deleted", output)
+        self.assertEqual(["Adam", "Berg", "Christ"],
+                         list(FacultyStudent.objects.order_by('id').values_list('last_name', flat=True)))
+
+    def test_incremental_sync_writes_only_changes(self):
+        self.sync()
+        synced_at = FacultyStudent.objects.get(id=100001).synced_at
+
+        Student.objects.using('faculty').filter(id=100002).update(program="IM")
+        Student.objects.using('faculty').filter(id=100003).delete()
+        Student(id=100004, first_name="Udo", last_name="Dorn", program="IB").save(using='faculty')
+
+        output = self.sync()
+
+        self.assertIn("3 students: 1 created, 1 updated, 1 deleted", output)
+        self.assertEqual("IM", FacultyStudent.objects.get(id=100002).program)
+        self.assertEqual(synced_at, FacultyStudent.objects.get(id=100001).synced_at)
+        self.assertFalse(FacultyStudent.objects.filter(id=100003).exists())
+
+    def test_empty_faculty_read_does_not_prune(self):
+        self.sync()
+        Student.objects.using('faculty').all().delete()
+
+        with self.assertRaises(CommandError):
+            self.sync()
+
+        self.assertEqual(3, FacultyStudent.objects.count())
+
+    def test_sharp_drop_does_not_prune_unless_forced(self):
+        self.sync()
+        Student.objects.using('faculty').exclude(id=100001).delete()
+
+        with self.assertRaises(CommandError):
+            self.sync()
+
+        self.assertEqual(3, FacultyStudent.objects.count())
+
+        output = self.sync(force=True)
+
+        self.assertIn("1 students: 0 created, 0 updated, 2 deleted", output)
+        self.assertEqual([100001], list(FacultyStudent.objects.values_list('id', flat=True)))
+
+    @override_settings(STUDENT_SOURCE='mirror')
+    def test_find_reads_from_mirror(self):
+        self.assertIsNone(Student.objects.find(100001))
+
+        self.sync()
+
+        student = Student.objects.find(100001)
+
+        self.assertEqual("Adam", student.last_name)
+        self.assertEqual("IB", student.program)
@@ -0,0 +1,77 @@
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from io import StringIO
+from unittest import mock
+import time
+
+from website.directory import supervisor_directory
+from website.forms import SupervisorsForm
+from website.models import *
+
+PROFESSORS = [Supervisor(id="b.berg", first_name="Bernd", last_name="Berg", initials="BBE"),
+              Supervisor(id="a.adam", first_name="Anna", last_name="Adam", initials="ADA")]
+
+
+@mock.patch.object(SupervisorManager, 'fetch_supervisors_from_ldap', return_value=PROFESSORS)
+class SupervisorDirectoryTests(TestCase):
+
+    def setUp(self):
+        supervisor_directory.invalidate()
+
+    def tearDown(self):
+        supervisor_directory.invalidate()
+
+    def test_supervisors_are_fetched_once_and_sorted(self, fetch):
+        self.assertEqual(["a.adam", "b.berg"], [s.id for s in supervisor_directory.supervisors()])
+        self.assertEqual(["a.adam", "b.berg"], [s.id for s in supervisor_directory.supervisors()])
+        self.assertEqual(1, fetch.call_count)
+
+    def test_find(self, fetch):
+        supervisor = supervisor_directory.find("b.berg")
+
+        self.assertEqual("Berg", supervisor.last_name)
+        self.assertEqual("BBE", supervisor.initials)
+        self.assertIsNone(supervisor_directory.find("n.iemand"))
+
+    def test_form_reads_from_directory(self, fetch):
+        SupervisorsForm()
+        form = SupervisorsForm({"supervisors": "a.adam"})
+
+        self.assertTrue(form.is_valid())
+        self.assertEqual(1, fetch.call_count)
+
+    @override_settings(SUPERVISOR_DIRECTORY={'TIMEOUT': 0, 'STALE_TIMEOUT': 60})
+    def test_stale_list_is_served_while_refreshing(self, fetch):
+        supervisor_directory.supervisors()
+
+        with mock.patch.object(supervisor_directory, 'refresh_in_background') as refresh:
+            time.sleep(0.01)
+            supervisors = supervisor_directory.supervisors()
+
+        self.assertEqual(2, len(supervisors))
+        self.assertEqual(1, refresh.call_count)
+        self.assertEqual(1, fetch.call_count)
+
+    def test_background_refresh_runs_once(self, fetch):
+        with mock.patch('threading.Thread') as thread:
+            supervisor_directory.refresh_in_background()
+            supervisor_directory.refresh_in_background()
+
+        self.assertEqual(1, thread.call_count)
+
+        supervisor_directory._refresh_and_unlock()
+
+        self.assertEqual(1, fetch.call_count)
+        self.assertIsNone(supervisor_directory.cache.get(supervisor_directory.LOCK_KEY))
+
+    def test_command(self, fetch):
+        out = StringIO()
+        call_command('refresh_supervisors', stdout=out)
+
+        self.assertIn("2 supervisors loaded", out.getvalue())
+
+        call_command('refresh_supervisors', clear=True, stdout=out)
+        supervisor_directory.supervisors()
+
+        self.assertEqual(2, fetch.call_count)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+
+import ldap
+
+from website.fake_ldap import FakeDirectory, FakeLDAPObject, fake_directory, parse_filter
+from website.models import Supervisor
+
+USERS = "ou=Users,dc=example,dc=de"
+
+
+def directory(**latency):
+    return FakeDirectory({
+        "uid=a.adam," + USERS: {"uid": "a.adam", "givenName": "Anna", "sn": "Adam",
+                                "uidNumber": "10", "userPassword": "secret"},
+        "uid=b.berg," + USERS: {"uid": "b.berg", "givenName": "Bernd", "sn": "Berg",
+                                "uidNumber": "20"},
+        "cn=prof,ou=groups,dc=example,dc=de": {"cn": "prof",
+                                               "memberUid": ["a.adam", "b.berg"]},
+    }, latency)
+
+
+class FilterTests(SimpleTestCase):
+
+    def matches(self, filterstr, **attributes):
+        attributes = {k: [v.encode()] for k, v in attributes.items()}
+        return parse_filter(filterstr)(attributes)
+
+    def test_equality_is_case_insensitive(self):
+        self.assertTrue(self.matches("(uid=A.Adam)", uid="a.adam"))
+        self.assertTrue(self.matches("(UID=a.adam)", uid="a.adam"))
+        self.assertFalse(self.matches("(uid=b.berg)", uid="a.adam"))
+
+    def test_presence_and_substring(self):
+        self.assertTrue(self.matches("(uid=*)", uid="a.adam"))
+        self.assertFalse(self.matches("(sn=*)", uid="a.adam"))
+        self.assertTrue(self.matches("(uid=a.*m)", uid="a.adam"))
+        self.assertFalse(self.matches("(uid=*berg)", uid="a.adam"))
+
+    def test_boolean_operators(self):
+        self.assertTrue(self.matches("(&(uid=a.adam)(sn=Adam))", uid="a.adam", sn="Adam"))
+        self.assertTrue(self.matches("(|(uid=x)(uid=a.adam))", uid="a.adam"))
+        self.assertTrue(self.matches("(!(uid=x))", uid="a.adam"))
+        self.assertFalse(self.matches("(&(uid=a.adam)(!(sn=Adam)))", uid="a.adam", sn="Adam"))
+
+    def test_ordering_compares_numbers(self):
+        self.assertTrue(self.matches("(uidNumber>=9)", uidNumber="10"))
+        self.assertFalse(self.matches("(uidNumber<=9)", uidNumber="10"))
+
+    def test_escaped_values(self):
+        self.assertTrue(self.matches(r"(cn=a\2ab)", cn="a*b"))
+        self.assertFalse(self.matches(r"(cn=a\2ab)", cn="axb"))
+
+    def test_invalid_filter(self):
+        with self.assertRaises(ldap.FILTER_ERROR):
+            parse_filter("(&(uid=a)")
+
+
+class FakeDirectoryTests(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = directory()
+        self.con = FakeLDAPObject(self.directory, "ldap://fake")
+
+    def test_search_scopes(self):
+        self.assertEqual(2, len(self.con.search_s(USERS, ldap.SCOPE_SUBTREE, "(uid=*)")))
+        self.assertEqual(2, len(self.con.search_s(USERS, ldap.SCOPE_ONELEVEL)))
+        self.assertEqual(0, len(self.con.search_s(USERS, ldap.SCOPE_BASE, "(uid=*)")))
+
+        dn, entry = self.con.search_s("uid=a.adam," + USERS, ldap.SCOPE_BASE)[0]
+
+        self.assertEqual("uid=a.adam," + USERS, dn)
+        self.assertEqual([b"Anna"], entry["givenName"])
+
+    def test_search_selects_attributes_and_hides_passwords(self):
+        _, entry = self.con.search_s(USERS, ldap.SCOPE_SUBTREE, "(uid=a.adam)", ["sn"])[0]
+        self.assertEqual({"sn": [b"Adam"]}, entry)
+
+        _, entry = self.con.search_s(USERS, ldap.SCOPE_SUBTREE, "(uid=a.adam)")[0]
+        self.assertNotIn("userPassword", entry)
+
+    def test_unknown_base(self):
+        with self.assertRaises(ldap.NO_SUCH_OBJECT):
+            self.con.search_s("uid=nobody," + USERS, ldap.SCOPE_BASE)
+
+    def test_search_ext(self):
+        msgid = self.con.search_ext(USERS, ldap.SCOPE_SUBTREE, "(uid=b.berg)", ["uid"])
+        kind, results = self.con.result(msgid)
+
+        self.assertEqual(ldap.RES_SEARCH_RESULT, kind)
+        self.assertEqual([("uid=b.berg," + USERS, {"uid": [b"b.berg"]})], results)
+
+    def test_bind(self):
+        self.con.simple_bind_s("uid=a.adam," + USERS, "secret")
+        self.con.simple_bind_s("", "")
+
+        with self.assertRaises(ldap.INVALID_CREDENTIALS):
+            self.con.simple_bind_s("uid=a.adam," + USERS, "wrong")
+
+        with self.assertRaises(ldap.INVALID_CREDENTIALS):
+            self.con.simple_bind_s("uid=b.berg," + USERS, "")
+
+    def test_compare(self):
+        group = "cn=prof,ou=groups,dc=example,dc=de"
+
+        self.assertTrue(self.con.compare_s(group, "memberUid", b"b.berg"))
+        self.assertFalse(self.con.compare_s(group, "memberUid", b"c.christ"))
+
+        with self.assertRaises(ldap.NO_SUCH_ATTRIBUTE):
+            self.con.compare_s(group, "gidNumber", b"1")
+
+    def test_calls_are_counted(self):
+        self.con.start_tls_s()
+        self.con.search_s(USERS, ldap.SCOPE_SUBTREE)
+        self.con.search_s(USERS, ldap.SCOPE_SUBTREE)
+
+        self.assertEqual({'connect': 1, 'search': 2}, self.directory.stats())
+
+
+class FakeSupervisorDirectoryTests(TestCase):
+
+    def test_supervisors_are_read_from_the_fixture(self):
+        supervisors = Supervisor.objects.fetch_supervisors_from_ldap()
+
+        self.assertIn("t.prof", [s.id for s in supervisors])
+        self.assertEqual("TPR", Supervisor.objects.fetch_supervisor("t.prof").initials)
+
+    def test_latency_is_configurable(self):
+        config = dict(settings.LDAP_DIRECTORY, LATENCY={'search': 0.01})
+
+        with override_settings(LDAP_DIRECTORY=config):
+            self.assertEqual(0.01, fake_directory().latency['search'])
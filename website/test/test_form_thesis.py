@@ -3,6 +3,7 @@
 from django.test import TestCase
 
 from datetime import date
+from decimal import Decimal
 
 from website.models import *
 from website.forms import ThesisApplicationForm
@@ -167,6 +168,46 @@ class FormThesisApplicationTests(TestCase):
         self.assertEqual(changed_thesis.external_where, data["external_where"])
         self.assertEqual(changed_thesis.student_contact, data["student_email"])
 
+    def test_change_thesis_writes_only_the_edited_fields(self):
+        supervisor = Supervisor(first_name="Max", last_name="Mustermann", id="mmuster")
+        supervisor.save()
+
+        thesis = ThesisStub.applied(supervisor)
+        thesis.save()
+
+        # graded by another request after the thesis was read
+        Thesis.objects.filter(pk=thesis.pk).update(grade=Decimal("1.3"), excom_status=Thesis.EXCOM_APPROVED)
+
+        form = ThesisApplicationForm({'begin_date': date(2021, 1, 1),
+                                      'due_date': date(2021, 3, 1),
+                                      'title': 'Neuer Titel'})
+        form.change_thesis(thesis, assessor=None)
+
+        changed = Thesis.objects.get(pk=thesis.pk)
+
+        self.assertEqual('Neuer Titel', changed.title)
+        self.assertEqual(Decimal("1.3"), changed.grade)
+        self.assertEqual(Thesis.EXCOM_APPROVED, changed.excom_status)
+        self.assertEqual(thesis.version, changed.version)
+
+    def test_change_thesis_refuses_a_changed_version(self):
+        supervisor = Supervisor(first_name="Max", last_name="Mustermann", id="mmuster")
+        supervisor.save()
+
+        thesis = ThesisStub.applied(supervisor)
+        thesis.save()
+
+        Thesis.objects.get(pk=thesis.pk).prolong(date(2018, 3, 1), "Krankheit", 4)
+
+        form = ThesisApplicationForm({'begin_date': date(2021, 1, 1),
+                                      'due_date': date(2021, 3, 1),
+                                      'title': 'Neuer Titel'})
+
+        with self.assertRaises(ThesisChanged):
+            form.change_thesis(thesis, assessor=None)
+
+        self.assertEqual("Eine einzelne Thesis", Thesis.objects.get(pk=thesis.pk).title)
+
     def test_new_due_date_cannot_be_later_than_prolongation_date(self):
         supervisor = Supervisor(
             first_name="Max",
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+
+from django.test import SimpleTestCase
+
+import ldap
+
+from website.ldap_pool import LDAPConnectionPool, PoolTimeout
+
+
+class StubConnection(object):
+
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.unbound = False
+
+    def search_s(self, base, scope, filterstr, attrlist):
+        if not self.alive:
+            raise ldap.SERVER_DOWN()
+        return []
+
+    def unbind(self):
+        self.unbound = True
+
+
+class LDAPConnectionPoolTests(SimpleTestCase):
+
+    def setUp(self):
+        self.connections = []
+
+        def connect(uri):
+            con = StubConnection()
+            self.connections.append(con)
+            return con
+
+        self.pool = LDAPConnectionPool("ldap://stub", size=2, timeout=0.1, connect=connect)
+
+    def test_connections_are_reused(self):
+        with self.pool.connection() as first:
+            pass
+
+        with self.pool.connection() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.assertEqual(1, len(self.connections))
+
+    def test_busy_connections_are_not_shared(self):
+        with self.pool.connection() as first:
+            with self.pool.connection() as second:
+                self.assertIsNot(first, second)
+
+        self.assertEqual({'open': 2, 'idle': 2, 'size': 2}, self.pool.stats())
+
+    def test_timeout_when_all_connections_are_busy(self):
+        with self.pool.connection(), self.pool.connection():
+            with self.assertRaises(PoolTimeout):
+                with self.pool.connection():
+                    pass
+
+    def test_waiting_borrower_gets_released_connection(self):
+        self.pool.timeout = 2
+        borrowed = []
+
+        with self.pool.connection(), self.pool.connection():
+            def borrow():
+                with self.pool.connection() as con:
+                    borrowed.append(con)
+
+            thread = threading.Thread(target=borrow)
+            thread.start()
+
+        thread.join()
+
+        self.assertEqual(2, len(self.connections))
+        self.assertIn(borrowed[0], self.connections)
+
+    def test_reconnect_on_server_down(self):
+        calls = []
+
+        def search(con):
+            calls.append(con)
+            if len(calls) == 1:
+                raise ldap.SERVER_DOWN()
+            return "result"
+
+        self.assertEqual("result", self.pool.run(search))
+        self.assertIsNot(calls[0], calls[1])
+        self.assertTrue(calls[0].unbound)
+        self.assertEqual(1, self.pool.stats()['open'])
+
+    def test_dead_idle_connection_is_replaced(self):
+        self.pool.check_after = 0
+
+        with self.pool.connection() as first:
+            pass
+
+        first.alive = False
+
+        with self.pool.connection() as second:
+            pass
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first.unbound)
+        self.assertEqual(1, self.pool.stats()['open'])
+
+    def test_failed_connect_frees_the_slot(self):
+        def connect(uri):
+            raise ldap.SERVER_DOWN()
+
+        pool = LDAPConnectionPool("ldap://stub", size=1, timeout=0.1, connect=connect)
+
+        for _ in range(2):
+            with self.assertRaises(ldap.SERVER_DOWN):
+                with pool.connection():
+                    pass
+
+        self.assertEqual(0, pool.stats()['open'])
+
+    def test_replacing_dead_connection_keeps_its_slot(self):
+        self.pool.check_after = 0
+        self.pool.size = 1
+        borrowed = []
+
+        with self.pool.connection() as first:
+            pass
+
+        def borrow():
+            try:
+                with self.pool.connection() as con:
+                    borrowed.append(con)
+            except PoolTimeout:
+                pass
+
+        def unbind():
+            # another thread asks for a connection while the dead one is closed
+            thread = threading.Thread(target=borrow)
+            thread.start()
+            thread.join()
+
+        first.alive = False
+        first.unbind = unbind
+
+        with self.pool.connection():
+            self.assertEqual([], borrowed)
+            self.assertEqual(1, self.pool.stats()['open'])
+
+        self.assertEqual(2, len(self.connections))
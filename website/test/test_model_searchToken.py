@@ -0,0 +1,47 @@
+from django.test import TestCase
+
+from website.models import *
+
+
+class SearchTokenTests(TestCase):
+
+    def setUp(self):
+        self.student = Student(id=987654, first_name="Jörg", last_name="Müller-Lüdenscheidt", program="IB")
+        self.other = Student(id=123456, first_name="Eva", last_name="Maier", program="IB")
+
+        self.student.save()
+        self.other.save()
+
+    def matching_students(self, text):
+        return list(Student.objects.filter(
+            id__in=SearchToken.objects.matching(SearchToken.STUDENT, text)))
+
+    def test_saving_indexes_names_and_number(self):
+        for text in ["jörg", "JOERG", "jorg", "Müller", "mueller", "Lüdenscheidt",
+                     "98", "987654", "Jö Mü", "j l 9"]:
+            self.assertEqual([self.student], self.matching_students(text))
+
+    def test_all_terms_have_to_match(self):
+        self.assertEqual([], self.matching_students("Eva Müller"))
+        self.assertEqual([], self.matching_students("9876543"))
+        self.assertEqual([], self.matching_students(""))
+
+    def test_changes_and_deletions_update_the_index(self):
+        self.other.last_name = "Schmidt"
+        self.other.save()
+
+        self.assertEqual([], self.matching_students("Maier"))
+        self.assertEqual([self.other], self.matching_students("Schmidt"))
+
+        self.other.delete()
+
+        self.assertEqual(0, SearchToken.objects.filter(object_id=123456).count())
+
+    def test_assessors_are_indexed_separately(self):
+        assessor = Assessor(first_name="Eva", last_name="Maier")
+        assessor.save()
+
+        assessors = SearchToken.objects.matching(SearchToken.ASSESSOR, "Eva")
+
+        self.assertEqual([assessor], list(Assessor.objects.filter(id__in=assessors)))
+        self.assertEqual([self.other], self.matching_students("Eva"))
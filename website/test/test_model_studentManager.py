@@ -35,3 +35,26 @@ class StudentManagerTests(TestCase):
         self.assertEqual(student_found.id, student_now_master.id)
         self.assertEqual(student_found.last_name, student_now_master.last_name)
         self.assertEqual(student_found.program, student_now_master.program)
+
+    def test_find_many(self):
+        self.student.save(using='faculty')
+        other = Student(id=654321, first_name="Eva", last_name="Maier", program="IM")
+        other.save(using='faculty')
+        other_local = Student(id=654321, first_name="Eva", last_name="Schmidt", program="IB")
+        other_local.save(using='default')
+
+        students = StudentManager().find_many([123456, "654321", 111111, 123456])
+
+        self.assertEqual([123456, 654321, 111111], list(students.keys()))
+        self.assertEqual(self.student, students[123456])
+        self.assertEqual("Maier", students[654321].last_name)
+        self.assertEqual("IM", students[654321].program)
+        self.assertIsNone(students[111111])
+
+    def test_find_many_uses_chunked_queries(self):
+        for id in range(100000, 100012):
+            Student(id=id, first_name="Eva", last_name="Maier", program="IB").save(using='faculty')
+
+        rows = StudentManager().fetch_faculty_rows(list(range(100000, 100020)), chunk_size=5)
+
+        self.assertEqual(list(range(100000, 100012)), sorted(rows.keys()))
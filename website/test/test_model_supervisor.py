@@ -14,6 +14,32 @@ class MockUser(object):
         self.last_name = "Maier"
 
 
+class RecordingConnection(object):
+    """Answers uid searches from a dict of entries and records all searches"""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.searches = []
+
+    def search_s(self, base, scope, filterstr, attrlist):
+        self.searches.append((base, filterstr, attrlist))
+
+        return [("uid={0},{1}".format(uid, base), entry)
+                for uid, entry in self.entries.items()
+                if "(uid={0})".format(uid) in filterstr]
+
+
+def ldap_entry(uid, first_name, last_name, initials=None):
+    entry = {"uid": [uid.encode()],
+             "givenName": [first_name.encode()],
+             "sn": [last_name.encode()]}
+
+    if initials:
+        entry["initials"] = [initials.encode()]
+
+    return entry
+
+
 class SupervisorModelTests(TestCase):
 
     def test_creation_from_user_without_initials(self):
@@ -48,3 +74,21 @@ class SupervisorModelTests(TestCase):
         self.assertTrue(len(sample.first_name) > 0)
         self.assertTrue(len(sample.last_name) > 0)
         self.assertEqual(3, len(sample.initials))
+
+    def test_fetch_supervisors_in_chunks(self):
+        con = RecordingConnection({
+            "a.adam": ldap_entry("a.adam", "Anna", "Adam", "ADA"),
+            "b.berg": ldap_entry("b.berg", "Bernd", "Berg", "BBE"),
+            "c.christ": ldap_entry("c.christ", "Clara", "Christ"),
+        })
+
+        manager = SupervisorManager()
+        manager.CHUNK_SIZE = 2
+
+        supervisors = manager.fetch_supervisors(["b.berg", "a.adam", "c.christ", "d.dorn"], con)
+
+        self.assertEqual(["b.berg", "a.adam"], [s.id for s in supervisors])
+        self.assertEqual("BBE", supervisors[0].initials)
+        self.assertEqual(2, len(con.searches))
+        self.assertEqual("(|(uid=b.berg)(uid=a.adam))", con.searches[0][1])
+        self.assertEqual(SupervisorManager.ATTRIBUTES, con.searches[0][2])
@@ -659,3 +659,74 @@ class ThesisModelTests(TestCase):
 
         self.assertEqual(self.student.program, "IM")
         self.assertEqual(thesis.thesis_program, "IB")
+
+
+class ThesisTransitionTests(TestCase):
+
+    def setUp(self):
+        student = Student(first_name="Eva", last_name="Maier", id=123456, program="IB")
+        supervisor = Supervisor(first_name="Thomas", last_name="Smits", id="t.smits")
+        student.save()
+        supervisor.save()
+
+        self.user = User(username="prof", initials="PPP", is_excom=True)
+        self.thesis = Thesis(student=student,
+                             supervisor=supervisor,
+                             title="Some title",
+                             thesis_program=student.program,
+                             begin_date=date(2018, 1, 30),
+                             due_date=date(2018, 6, 30))
+        self.thesis.save()
+
+    def test_transition_increments_version(self):
+        self.assertTrue(self.thesis.approve(self.user))
+
+        self.assertEqual(1, self.thesis.version)
+        self.assertEqual(1, Thesis.objects.get(id=self.thesis.id).version)
+
+    def test_transition_writes_only_changed_columns(self):
+        with self.assertNumQueries(1) as queries:
+            self.thesis.prolong(date(2018, 7, 30), "Krankheit", 4)
+
+        update = queries.captured_queries[0]["sql"]
+
+        self.assertTrue(update.startswith("UPDATE"))
+        self.assertIn('"prolongation_date"', update)
+        self.assertNotIn('"title"', update)
+        self.assertNotIn('"grade"', update)
+
+    def test_concurrent_approval_and_rejection(self):
+        first = Thesis.objects.get(id=self.thesis.id)
+        second = Thesis.objects.get(id=self.thesis.id)
+
+        self.assertTrue(first.approve(self.user))
+        with self.assertRaises(ThesisChanged):
+            second.reject(self.user, "Zu spät")
+
+        thesis = Thesis.objects.get(id=self.thesis.id)
+
+        self.assertTrue(thesis.is_approved())
+        self.assertIsNone(thesis.excom_reject_reason)
+        self.assertEqual(Thesis.APPLIED, second.excom_status)
+        self.assertIsNone(second.excom_reject_reason)
+
+    def test_stale_thesis_is_not_graded(self):
+        stale = Thesis.objects.get(id=self.thesis.id)
+
+        self.assertTrue(self.thesis.hand_in(date(2018, 6, 30)))
+        with self.assertRaises(ThesisChanged):
+            stale.assign_grade(Decimal("1.3"), Decimal("1.7"), date(2018, 7, 15))
+
+        thesis = Thesis.objects.get(id=self.thesis.id)
+
+        self.assertEqual(Thesis.HANDED_IN, thesis.status)
+        self.assertIsNone(thesis.grade)
+        self.assertIsNone(stale.grade)
+
+    def test_invalid_values_are_not_kept(self):
+        with self.assertRaises(ValidationError):
+            self.thesis.prolong(date(2018, 6, 1), "Krankheit", 4)
+
+        self.assertIsNone(self.thesis.prolongation_date)
+        self.assertEqual(Thesis.APPLIED, self.thesis.status)
+        self.assertEqual(0, self.thesis.version)
@@ -0,0 +1,102 @@
+from django.db.models import F
+from django.test import TestCase
+
+from datetime import date
+import base64
+import json
+
+from website.models import *
+from website.paginator import KeysetPaginator
+
+
+class KeysetPaginatorTests(TestCase):
+
+    def setUp(self):
+        supervisor = Supervisor(first_name="Max", last_name="Muster", id="mmuster")
+        student = Student(id=123456, first_name="Eva", last_name="Maier", program="IB")
+
+        supervisor.save()
+        student.save()
+
+        self.theses = []
+
+        for index, last_name in enumerate(["Berg", None, "Adam", "Berg", None, "Christ"]):
+            assessor = None
+
+            if last_name:
+                assessor = Assessor(first_name="Anna", last_name=last_name)
+                assessor.save()
+
+            thesis = Thesis(student=student,
+                            supervisor=supervisor,
+                            assessor=assessor,
+                            title="Thesis {0}".format(index),
+                            thesis_program=student.program,
+                            begin_date=date(2018, 1, 1),
+                            due_date=date(2018, 4, 1 + index))
+            thesis.save()
+
+            self.theses.append(thesis)
+
+    def walk(self, ordering, page_size):
+        """Follow all next cursors, then all previous cursors"""
+        paginator = KeysetPaginator(Thesis.objects.with_relations(), ordering, page_size)
+
+        forward = []
+        page = paginator.page()
+        pages = [list(page)]
+
+        while page.has_next():
+            forward.extend(page)
+            page = paginator.page(page.next_cursor)
+            pages.append(list(page))
+        forward.extend(page)
+
+        backward = [list(page)]
+        while page.has_previous():
+            page = paginator.page(page.previous_cursor)
+            backward.append(list(page))
+
+        return forward, pages, backward[::-1]
+
+    def test_all_rows_in_ascending_order_with_nulls_last(self):
+        ordering = [("assessor__last_name", False), ("id", False)]
+
+        for page_size in [1, 2, 4, 10]:
+            forward, pages, backward = self.walk(ordering, page_size)
+
+            expected = list(Thesis.objects.order_by(
+                F("assessor__last_name").asc(nulls_last=True), "id"))
+
+            self.assertEqual(expected, forward)
+            self.assertEqual(pages, backward)
+
+    def test_all_rows_in_descending_order_with_nulls_last(self):
+        ordering = [("assessor__last_name", True), ("id", True)]
+
+        for page_size in [1, 2, 4, 10]:
+            forward, pages, backward = self.walk(ordering, page_size)
+
+            expected = list(Thesis.objects.order_by(
+                F("assessor__last_name").desc(nulls_last=True), "-id"))
+
+            self.assertEqual(expected, forward)
+            self.assertEqual(pages, backward)
+
+    def test_dates_survive_the_cursor(self):
+        ordering = [("due_date", False), ("id", False)]
+
+        forward, _, _ = self.walk(ordering, 4)
+
+        self.assertEqual(self.theses, forward)
+
+    def test_cursor_with_invalid_value_returns_first_page(self):
+        ordering = [("due_date", False), ("id", False)]
+        paginator = KeysetPaginator(Thesis.objects.all(), ordering, 2)
+
+        for values in [["kein-datum", 1], ["2018-04-01", "x"], [{}, 1]]:
+            data = json.dumps([KeysetPaginator.NEXT, values]).encode()
+            page = paginator.page(base64.urlsafe_b64encode(data).decode())
+
+            self.assertEqual(self.theses[:2], list(page))
+            self.assertFalse(page.has_previous())
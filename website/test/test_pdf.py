@@ -3,7 +3,7 @@ from django.test import TestCase
 from datetime import date, timedelta
 from decimal import Decimal
 
-from thesispool.pdf import AbstractPDF
+from thesispool.pdf import XFDF, AbstractPDF
 from website.models import *
 from website.test.test import ThesisStub
 
@@ -209,6 +209,12 @@ class TestPDF(TestCase):
 
         self.assertEqual(xfdf.fields["Thema_der_Arbeit"], "&lt;&amp;&quot;&apos;&gt;Test")
 
+    def test_field_names_are_escaped(self):
+        xfdf = XFDF("On")
+        xfdf.add_field('Name "<&>"', "Wert")
+
+        self.assertIn('<field name="Name &quot;&lt;&amp;&gt;&quot;">\n<value>Wert</value>', xfdf.generate())
+
     def test_old_thesis_master_student(self):
         supervisor = Supervisor(
             first_name="Max", last_name="Muster", initials="MMU")
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import time
+
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from thesispool.pdf import ApplicationPDF, GradingPDF
+from thesispool.pdf_cache import pdf_cache
+from website.models import *
+from website.test.test import TemporaryPDFMixin, ThesisStub, fake_pdftk
+
+
+class PDFCacheTests(TemporaryPDFMixin, TestCase):
+
+    def pdf_settings(self, directory):
+        return {'PDF_CACHE': {'DIR': directory, 'MAX_SIZE': 100}}
+
+    def generated(self, content):
+        fd, path = tempfile.mkstemp(dir=self.tmp.name, suffix=".tmp")
+        os.write(fd, content)
+        os.close(fd)
+        return path
+
+    def test_key_depends_on_form_base_pdf_and_xfdf(self):
+        base = self.generated(b"base")
+        other_base = self.generated(b"other")
+
+        key = pdf_cache.key("ausgabe", base, "<xfdf/>")
+
+        self.assertEqual(key, pdf_cache.key("ausgabe", base, "<xfdf/>"))
+        self.assertNotEqual(key, pdf_cache.key("bewertung", base, "<xfdf/>"))
+        self.assertNotEqual(key, pdf_cache.key("ausgabe", other_base, "<xfdf/>"))
+        self.assertNotEqual(key, pdf_cache.key("ausgabe", base, "<xfdf></xfdf>"))
+
+    def test_put_and_get(self):
+        self.assertIsNone(pdf_cache.get("abc"))
+
+        path = pdf_cache.put("abc", self.generated(b"pdf"))
+
+        self.assertEqual(path, pdf_cache.get("abc"))
+
+        with open(path, "rb") as f:
+            self.assertEqual(b"pdf", f.read())
+
+    def test_least_recently_used_files_are_evicted(self):
+        pdf_cache.put("a", self.generated(b"a" * 40))
+        pdf_cache.put("b", self.generated(b"b" * 40))
+
+        # make "a" the most recently used file
+        past = time.time() - 120
+        os.utime(pdf_cache.path("b"), (past, past))
+        os.utime(pdf_cache.path("a"), (past - 60, past - 60))
+        pdf_cache.get("a")
+
+        pdf_cache.put("c", self.generated(b"c" * 40))
+
+        self.assertIsNotNone(pdf_cache.get("a"))
+        self.assertIsNone(pdf_cache.get("b"))
+        self.assertIsNotNone(pdf_cache.get("c"))
+        self.assertLessEqual(pdf_cache.size(), 100)
+
+    def test_recently_used_and_unfinished_files_are_kept(self):
+        unfinished = self.generated(b"x" * 200)
+        pdf_cache.put("a", self.generated(b"a" * 80))
+        pdf_cache.put("b", self.generated(b"b" * 80))
+
+        self.assertEqual(0, pdf_cache.evict())
+        self.assertIsNotNone(pdf_cache.get("a"))
+        self.assertIsNotNone(pdf_cache.get("b"))
+        self.assertTrue(os.path.exists(unfinished))
+        self.assertEqual(160, pdf_cache.size())
+
+    def test_disabled_cache(self):
+        with override_settings(PDF_CACHE={'DIR': self.tmp.name, 'ENABLED': False}):
+            path = self.generated(b"pdf")
+
+            self.assertEqual(path, pdf_cache.put("abc", path))
+            self.assertIsNone(pdf_cache.get("abc"))
+
+    @mock.patch("thesispool.pdf_engine.subprocess.run", side_effect=fake_pdftk)
+    def test_repeated_download_skips_pdftk(self, run):
+        supervisor = Supervisor(first_name="Max", last_name="Muster", id="mmuster", initials="MMU")
+        thesis = ThesisStub.applied(supervisor)
+
+        with override_settings(PDF_CACHE={'DIR': self.tmp.name, 'MAX_SIZE': 1024 * 1024}):
+            first = ApplicationPDF(thesis).get()
+            second = ApplicationPDF(thesis).get()
+            grading = GradingPDF(thesis).get()
+
+            thesis.title = "Ein anderer Titel"
+            changed = ApplicationPDF(thesis).get()
+
+        self.assertEqual(first.path, second.path)
+        self.assertNotEqual(first.path, grading.path)
+        self.assertNotEqual(first.path, changed.path)
+        self.assertEqual(3, run.call_count)
+        self.assertTrue(first.path.startswith(self.tmp.name))
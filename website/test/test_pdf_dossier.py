@@ -0,0 +1,78 @@
+import os
+import tempfile
+
+from unittest import mock
+
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from thesispool.pdf import ApplicationPDF, DossierPDF, GradingPDF, ProlongationPDF, ProlongIllnessPDF
+from website.models import *
+from website.test.test import LoggedInTestCase, TemporaryPDFMixin, ThesisStub, fake_pdftk
+
+
+@mock.patch("thesispool.pdf_engine.subprocess.run", side_effect=fake_pdftk)
+class DossierPDFTests(TemporaryPDFMixin, TestCase):
+
+    def setUp(self):
+        super(DossierPDFTests, self).setUp()
+        supervisor = Supervisor(first_name="Max", last_name="Muster", id="mmuster", initials="MMU")
+        self.thesis = ThesisStub.applied(supervisor)
+
+    def read(self, pdf):
+        with open(pdf.get().path, "rb") as f:
+            return f.read()
+
+    def test_applied_thesis_only_has_the_application(self, run):
+        self.assertEqual([ApplicationPDF], DossierPDF.pdf_types(self.thesis))
+        self.assertEqual(self.read(ApplicationPDF(self.thesis)), self.read(DossierPDF(self.thesis)))
+
+    def test_prolonged_and_graded_thesis_has_all_forms(self, run):
+        self.thesis.prolongation_date = date(2018, 3, 1)
+        self.thesis.prolongation_reason = "Krankheit"
+        self.thesis.prolongation_weeks = 4
+        self.thesis.handed_in_date = date(2018, 3, 1)
+        self.thesis.grade = Decimal("1.3")
+        self.thesis.status = Thesis.GRADED
+
+        pdf_types = [ApplicationPDF, ProlongationPDF, ProlongIllnessPDF, GradingPDF]
+        dossier = self.read(DossierPDF(self.thesis))
+
+        self.assertEqual(pdf_types, DossierPDF.pdf_types(self.thesis))
+        self.assertEqual(b"".join(self.read(pdf_type(self.thesis)) for pdf_type in pdf_types),
+                         dossier)
+
+    def test_dossier_is_cached(self, run):
+        first = DossierPDF(self.thesis).get()
+        calls = run.call_count
+
+        second = DossierPDF(self.thesis).get()
+
+        self.assertEqual(first.path, second.path)
+        self.assertEqual(calls, run.call_count)
+        self.assertTrue(first.path.startswith(self.tmp.name + "/cache/"))
+
+        self.thesis.title = "Ein anderer Titel"
+
+        self.assertNotEqual(first.path, DossierPDF(self.thesis).get().path)
+
+
+class ViewDossierTests(LoggedInTestCase):
+
+    def test_download_dossier(self):
+        thesis = ThesisStub.applied(self.supervisor)
+        thesis.save()
+
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as pdf, \
+                override_settings(SENDFILE_ROOT=os.path.dirname(pdf.name)), \
+                mock.patch.object(DossierPDF, "get") as get:
+            get.return_value.path = pdf.name
+            get.return_value.filename = "dossier.pdf"
+
+            response = self.client.get(reverse('dossier_pdf', args=[thesis.surrogate_key]))
+
+        self.assertEqual(200, response.status_code)
+        self.assertIn("dossier.pdf", response.headers['content-disposition'])
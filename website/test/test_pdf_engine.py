@@ -0,0 +1,134 @@
+import os
+import shutil
+import subprocess
+import unittest
+
+from unittest import mock
+
+from datetime import date
+from io import BytesIO
+from decimal import Decimal
+from xml.sax.saxutils import unescape
+
+from django.test import TestCase, override_settings
+
+from thesispool.pdf import ApplicationPDF, GradingPDF, ProlongationPDF, ProlongIllnessPDF
+from thesispool.pdf_engine import RenderError, pdf_engine
+from website.models import *
+from website.test.test import TemporaryPDFMixin, ThesisStub, fake_pdftk
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+TEXT_FIELDS = ["Name, Vorname", "Matrikelnr", "Matrikelnummer", "Thema_der_Arbeit",
+               "Kurztitel der Arbeit", "Adresse_der_Firma", "Begründung_Antrag"]
+
+
+@unittest.skipIf(pypdf is None, "pypdf is not installed")
+class PypdfEngineTests(TemporaryPDFMixin, TestCase):
+
+    def setUp(self):
+        super(PypdfEngineTests, self).setUp()
+
+        supervisor = Supervisor(first_name="Max", last_name="Muster", id="mmuster", initials="MMU")
+        self.thesis = ThesisStub.applied(supervisor)
+        self.thesis.title = "Über <Formulare> & Felder"
+        self.thesis.external = True
+        self.thesis.external_where = "Arbeitsamt"
+        self.thesis.student_contact = "student@example.com"
+        self.thesis.status = Thesis.PROLONGED
+        self.thesis.prolongation_reason = "Krankheit"
+        self.thesis.prolongation_weeks = 4
+        self.thesis.prolongation_date = date(2018, 3, 1)
+        self.thesis.handed_in_date = date(2018, 3, 1)
+        self.thesis.grade = Decimal("1.3")
+        self.thesis.examination_date = date(2018, 4, 1)
+
+    def fill(self, pdf_type, engine):
+        form = pdf_type(self.thesis)
+        xfdf = form._generate_xfdf()
+        path = pdf_engine(engine).fill(form.input_pdf_path, xfdf, self.tmp.name)
+
+        return xfdf, pypdf.PdfReader(path)
+
+    def test_fields_are_filled_and_flattened(self):
+        for pdf_type in [ApplicationPDF, GradingPDF, ProlongationPDF, ProlongIllnessPDF]:
+            xfdf, reader = self.fill(pdf_type, 'pypdf')
+            text = reader.pages[0].extract_text()
+            fields = pypdf.PdfReader(pdf_type(self.thesis).input_pdf_path).get_fields()
+
+            self.assertFalse(reader.get_fields())
+
+            for name in TEXT_FIELDS:
+                if name in fields and name in xfdf.fields:
+                    self.assertIn(unescape(xfdf.fields[name]), text)
+
+    def test_buttons_are_set_to_the_named_state(self):
+        engine = pdf_engine('pypdf')
+        xfdf = ApplicationPDF(self.thesis)._generate_xfdf()
+        _, fields = engine.template(ApplicationPDF(self.thesis).input_pdf_path)
+
+        values = engine.values(fields, xfdf)
+
+        self.assertEqual("/" + engine.pdf_name("außer_Hause"), values["Ort_der_Arbeit"])
+        self.assertEqual("/0", values["Auswahl_Arbeit"])
+        self.assertNotIn("Drucken", values)
+
+    def test_engine_is_selected_by_setting(self):
+        with override_settings(PDF_ENGINE='pypdf', PDF_CACHE={'DIR': self.tmp.name, 'ENABLED': False}):
+            info = ApplicationPDF(self.thesis).get()
+
+        self.assertEqual(1, len(pypdf.PdfReader(info.path).pages))
+
+    def test_concatenate(self):
+        paths = [pdf_type(self.thesis).input_pdf_path for pdf_type in [ApplicationPDF, GradingPDF]]
+
+        data = pdf_engine('pypdf').concatenate(paths)
+
+        self.assertEqual(sum(len(pypdf.PdfReader(path).pages) for path in paths),
+                         len(pypdf.PdfReader(BytesIO(data)).pages))
+
+    @unittest.skipIf(shutil.which("pdftk") is None, "pdftk is not installed")
+    def test_same_field_values_as_pdftk(self):
+        for pdf_type in [ApplicationPDF, GradingPDF, ProlongationPDF, ProlongIllnessPDF]:
+            xfdf, pypdf_reader = self.fill(pdf_type, 'pypdf')
+            _, pdftk_reader = self.fill(pdf_type, 'pdftk')
+
+            pypdf_text = pypdf_reader.pages[0].extract_text()
+            pdftk_text = pdftk_reader.pages[0].extract_text()
+
+            for name in TEXT_FIELDS:
+                value = unescape(xfdf.fields.get(name, ""))
+                self.assertEqual(value in pdftk_text, value in pypdf_text, name)
+
+
+class PdftkEngineTests(TemporaryPDFMixin, TestCase):
+
+    def setUp(self):
+        super(PdftkEngineTests, self).setUp()
+        supervisor = Supervisor(first_name="Max", last_name="Muster", id="mmuster", initials="MMU")
+        self.pdf = ApplicationPDF(ThesisStub.applied(supervisor))
+
+    @mock.patch("thesispool.pdf_engine.subprocess.run", side_effect=fake_pdftk)
+    def test_pipe_passes_xfdf_on_stdin(self, run):
+        xfdf = self.pdf._generate_xfdf()
+
+        data = pdf_engine('pdftk').render(self.pdf.input_pdf_path, xfdf)
+
+        self.assertEqual(xfdf.generate().encode(), data)
+        self.assertEqual(["fill_form", "-", "output", "-"], run.call_args[0][0][2:6])
+
+    @mock.patch("thesispool.pdf_engine.subprocess.run", side_effect=fake_pdftk)
+    def test_pipe_writes_no_temporary_files(self, run):
+        info = self.pdf.get()
+
+        self.assertEqual(["cache"], os.listdir(self.tmp.name))
+        self.assertTrue(info.path.startswith(self.tmp.name + "/cache/"))
+
+    @mock.patch("thesispool.pdf_engine.subprocess.run",
+                return_value=subprocess.CompletedProcess([], 1, stdout=b"", stderr=b"Error"))
+    def test_failed_pipe(self, run):
+        with self.assertRaises(RenderError):
+            pdf_engine('pdftk').render(self.pdf.input_pdf_path, self.pdf._generate_xfdf())
@@ -0,0 +1,67 @@
+from unittest import mock
+
+from datetime import date
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from thesispool.pdf import ApplicationPDF, GradingPDF, ProlongationPDF, ProlongIllnessPDF
+from thesispool.pdf_fields import BASE_PDF, FORM_FIELDS, FieldMaps, template_fields
+from website.models import *
+
+
+class FieldMapsTests(SimpleTestCase):
+
+    def thesis(self):
+        supervisor = Supervisor(first_name="Max", last_name="Muster", initials="MMU")
+        student = Student(id=987654, first_name="Larry", last_name="Langzeitstudent", program="IB")
+        assessor = Assessor(first_name="Hansi", last_name="Schmidt")
+
+        return Thesis(student=student, assessor=assessor, supervisor=supervisor,
+                      title="Eine Thesis", thesis_program="IB",
+                      begin_date=date(2018, 1, 1), due_date=date(2018, 6, 30),
+                      prolongation_date=date(2018, 7, 30), prolongation_reason="Krankheit",
+                      prolongation_weeks=4, handed_in_date=date(2018, 7, 20),
+                      external=True, external_where="Firma")
+
+    def test_base_pdfs_have_all_mapped_fields(self):
+        FieldMaps().validate()
+
+    def test_missing_field_fails(self):
+        forms = {'ausgabe': dict(FORM_FIELDS['ausgabe'], title="Gibt es nicht")}
+
+        with self.assertRaisesMessage(ImproperlyConfigured, "ausgabe.pdf: Gibt es nicht"):
+            FieldMaps(forms).validate()
+
+    def test_missing_base_pdf_fails(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "gibtsnich.pdf does not exist"):
+            FieldMaps({'gibtsnich': {'title': "Thema"}}).validate()
+
+    def test_validation_is_skipped_without_reader(self):
+        forms = {'ausgabe': {'title': "Gibt es nicht"}}
+
+        with mock.patch("thesispool.pdf_fields.template_fields", return_value=None), \
+                self.assertLogs("thesispool.pdf_fields", "WARNING"):
+            FieldMaps(forms).validate()
+
+    def test_only_fields_of_the_form_are_written(self):
+        thesis = self.thesis()
+
+        for pdf_type in [ApplicationPDF, GradingPDF, ProlongationPDF, ProlongIllnessPDF]:
+            pdf = pdf_type(thesis)
+            fields = template_fields(BASE_PDF.format(pdf.form_name))
+            xfdf = pdf._generate_xfdf()
+
+            self.assertTrue(xfdf.fields)
+            self.assertLessEqual(set(xfdf.fields), fields, pdf.form_name)
+            self.assertEqual(len(xfdf.fields), xfdf.generate().count("<field "))
+
+    def test_unknown_form_gets_every_field(self):
+        pdf = ApplicationPDF(self.thesis())
+        pdf.form_name = "gibtsnich"
+        fields = pdf._generate_xfdf().fields
+
+        self.assertEqual("Langzeitstudent, Larry", fields["Name, Vorname"])
+        self.assertEqual("987654", fields["Matrikelnr"])
+        self.assertEqual("987654", fields["Matrikelnummer"])
+        self.assertEqual("Krankheit", fields["Symtome / Auswirkung"])
@@ -0,0 +1,85 @@
+from unittest import mock
+
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from thesispool.pdf import ApplicationPDF, GradingPDF, ProlongationPDF
+from thesispool.render import RenderExecutor
+from website.models import *
+from website.test.test import TemporaryPDFMixin, ThesisStub, fake_pdftk
+
+
+@mock.patch("thesispool.pdf_engine.subprocess.run", side_effect=fake_pdftk)
+class PrerenderTests(TemporaryPDFMixin, TestCase):
+
+    def pdf_settings(self, directory):
+        return dict(super(PrerenderTests, self).pdf_settings(directory), PDF_PRERENDER=True)
+
+    def setUp(self):
+        super(PrerenderTests, self).setUp()
+
+        self.executor = RenderExecutor()
+        patcher = mock.patch("thesispool.prerender.render_executor", self.executor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.supervisor = Supervisor(first_name="Max", last_name="Muster", id="mmuster", initials="MMU")
+        self.supervisor.save()
+
+    def committed(self, transition):
+        """Run transition, its commit hooks and wait for the renders"""
+        with self.captureOnCommitCallbacks(execute=True):
+            transition()
+
+        self.executor.pool().shutdown(wait=True)
+
+    def assertCached(self, run, pdf):
+        calls = run.call_count
+        pdf.get()
+        self.assertEqual(calls, run.call_count)
+
+    def test_created_thesis_has_its_application_rendered(self, run):
+        thesis = ThesisStub.applied(self.supervisor)
+
+        self.committed(thesis.save)
+
+        self.assertEqual(1, run.call_count)
+        self.assertCached(run, ApplicationPDF(thesis))
+
+    def test_prolong_renders_prolongation(self, run):
+        thesis = ThesisStub.applied(self.supervisor)
+        thesis.save()
+
+        self.committed(lambda: thesis.prolong(date(2018, 3, 1), "Krankheit", 4))
+
+        self.assertCached(run, ProlongationPDF(thesis))
+
+    def test_assign_grade_renders_grading(self, run):
+        thesis = ThesisStub.applied(self.supervisor)
+        thesis.handed_in_date = date(2018, 1, 20)
+        thesis.save()
+
+        self.committed(lambda: thesis.assign_grade(Decimal("1.3"), None, date(2018, 2, 1)))
+
+        self.assertCached(run, GradingPDF(thesis))
+
+    def test_disabled(self, run):
+        thesis = ThesisStub.applied(self.supervisor)
+
+        with override_settings(PDF_PRERENDER=False), \
+                self.captureOnCommitCallbacks() as callbacks:
+            thesis.save()
+            thesis.prolong(date(2018, 3, 1), "Krankheit", 4)
+
+        self.assertEqual([], callbacks)
+        run.assert_not_called()
+
+    def test_busy_workers_are_left_alone(self, run):
+        thesis = ThesisStub.applied(self.supervisor)
+        self.executor.pending = 4
+
+        self.committed(thesis.save)
+
+        run.assert_not_called()
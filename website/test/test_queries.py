@@ -0,0 +1,44 @@
+from django.test import TestCase, RequestFactory, override_settings
+from django.http import HttpResponse
+
+from website.models import *
+from website.queries import query_budget, QueryBudgetExceeded
+
+
+@query_budget(budget=1)
+def two_queries(request):
+    Student.objects.count()
+    Assessor.objects.count()
+
+    return HttpResponse()
+
+
+@query_budget()
+def one_query(request):
+    Student.objects.count()
+
+    return HttpResponse()
+
+
+class QueryBudgetTests(TestCase):
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+
+    def test_view_within_budget(self):
+        response = one_query(self.request)
+
+        self.assertEqual(200, response.status_code)
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_exceeding_budget_fails_in_strict_mode(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            two_queries(self.request)
+
+    @override_settings(QUERY_BUDGET=0, QUERY_BUDGET_STRICT=False)
+    def test_exceeding_budget_logs_warning(self):
+        with self.assertLogs('website.queries', level='WARNING') as logs:
+            response = one_query(self.request)
+
+        self.assertEqual(200, response.status_code)
+        self.assertIn("one_query issued 1 queries (budget: 0)", logs.output[0])
@@ -0,0 +1,109 @@
+import threading
+
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from thesispool.pdf import ApplicationPDF
+from thesispool.render import RenderExecutor, RenderTimeout, Saturated
+from website.models import *
+from website.test.test import ThesisStub, LoggedInTestCase
+
+
+@override_settings(PDF_RENDER={'WORKERS': 1, 'QUEUE_SIZE': 1, 'TIMEOUT': 1, 'RETRY_AFTER': 7})
+class RenderExecutorTests(SimpleTestCase):
+
+    def setUp(self):
+        self.executor = RenderExecutor()
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def blocked(self):
+        self.release.wait(5)
+        return "done"
+
+    def test_run_returns_result_and_records_metrics(self):
+        self.assertEqual(4, self.executor.run(lambda x: x * 2, 2))
+
+        stats = self.executor.stats()
+
+        self.assertEqual(1, stats['submitted'])
+        self.assertEqual(0, stats['pending'])
+        self.assertEqual(1, stats['render_time']['count'])
+        self.assertEqual(1, stats['queue_wait']['count'])
+
+    def test_saturated_when_workers_and_queue_are_full(self):
+        running = self.executor.submit(self.blocked)
+        queued = self.executor.submit(self.blocked)
+
+        with self.assertRaises(Saturated) as raised:
+            self.executor.submit(self.blocked)
+
+        self.assertEqual(7, raised.exception.retry_after)
+        self.assertEqual(1, self.executor.stats()['rejected'])
+
+        self.release.set()
+
+        self.assertEqual("done", running.result(5))
+        self.assertEqual("done", queued.result(5))
+        self.assertEqual(2, self.executor.stats()['render_time']['count'])
+
+    def test_submit_when_free_waits_for_the_queue(self):
+        self.executor.submit(self.blocked)
+        self.executor.submit(self.blocked)
+
+        threading.Timer(0.05, self.release.set).start()
+        waiting = self.executor.submit_when_free(5, lambda: "free")
+
+        self.assertEqual("free", waiting.result(5))
+        self.assertEqual(0, self.executor.stats()['rejected'])
+
+    def test_submit_when_free_gives_up(self):
+        self.executor.submit(self.blocked)
+        self.executor.submit(self.blocked)
+
+        with self.assertRaises(Saturated):
+            self.executor.submit_when_free(0.05, self.blocked)
+
+    def test_timeout(self):
+        with override_settings(PDF_RENDER={'WORKERS': 1, 'QUEUE_SIZE': 1, 'TIMEOUT': 0.05}):
+            with self.assertRaises(RenderTimeout):
+                self.executor.run(self.blocked)
+
+        self.assertEqual(1, self.executor.stats()['timeouts'])
+
+    def test_nested_run_does_not_wait_for_the_pool(self):
+        def outer():
+            return self.executor.run(lambda: "inner")
+
+        self.assertEqual("inner", self.executor.run(outer))
+
+
+class RenderViewTests(LoggedInTestCase):
+
+    def test_saturated_download_returns_503(self):
+        supervisor = Supervisor(first_name="Max", last_name="Muster", id="mmuster")
+        thesis = ThesisStub.applied(supervisor)
+        supervisor.save()
+        thesis.save()
+
+        with mock.patch.object(ApplicationPDF, "get", side_effect=Saturated("busy", 9)):
+            response = self.client.get(reverse('application_pdf', args=[thesis.surrogate_key]))
+
+        self.assertEqual(503, response.status_code)
+        self.assertEqual("9", response['Retry-After'])
+
+    def test_metrics_for_staff_only(self):
+        self.assertEqual(403, self.client.get(reverse('pdf_metrics')).status_code)
+
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.get(reverse('pdf_metrics'))
+
+        self.assertEqual(200, response.status_code)
+        self.assertIn('queue_wait', response.json()['render'])
+        self.assertIn('cache_bytes', response.json()['files'])
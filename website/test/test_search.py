@@ -0,0 +1,95 @@
+from django.test import TestCase
+
+from datetime import date
+
+from website.models import *
+from website.search import fts_available
+
+
+class ThesisSearchTests(TestCase):
+
+    def setUp(self):
+        self.supervisor = Supervisor(first_name="Max", last_name="Muster", id="mmuster")
+        self.student = Student(id=123456, first_name="Eva", last_name="Maier", program="IB")
+
+        self.supervisor.save()
+        self.student.save()
+
+    def create(self, title, **kwargs):
+        thesis = Thesis(student=self.student,
+                        supervisor=self.supervisor,
+                        title=title,
+                        thesis_program=self.student.program,
+                        begin_date=date(2018, 1, 1),
+                        due_date=date(2018, 4, 1),
+                        **kwargs)
+        thesis.save()
+
+        return thesis
+
+    def test_index_is_available(self):
+        self.assertTrue(fts_available('default'))
+
+    def test_prefix_search_on_title(self):
+        thesis = self.create("Verteilte Datenbanken in der Cloud")
+        self.create("Maschinelles Lernen")
+
+        for text in ["Verteilte", "verteilt", "Datenb Cloud", "cloud verteilte"]:
+            self.assertEqual([thesis], list(Thesis.objects.search(text, column="title")))
+
+        self.assertEqual([], list(Thesis.objects.search("Datenbanken Lernen")))
+
+    def test_search_ignores_umlauts_and_case(self):
+        thesis = self.create("Prüfung von Übersetzern")
+
+        self.assertEqual([thesis], list(Thesis.objects.search("prufung ubersetzern", column="title")))
+        self.assertEqual([thesis], list(Thesis.objects.search("PRÜFUNG", column="title")))
+
+    def test_search_covers_company_and_reasons(self):
+        external = self.create("Eine Thesis", external=True, external_where="John Deere")
+        rejected = self.create("Noch eine Thesis", excom_reject_reason="Thema zu unkonkret")
+
+        self.assertEqual([external], list(Thesis.objects.search("deere")))
+        self.assertEqual([rejected], list(Thesis.objects.search("unkonkret")))
+        self.assertEqual([], list(Thesis.objects.search("deere", column="title")))
+
+    def test_index_follows_updates_and_deletes(self):
+        thesis = self.create("Alter Titel")
+
+        Thesis.objects.filter(id=thesis.id).update(prolongation_reason="Krankheit")
+
+        self.assertEqual([thesis], list(Thesis.objects.search("krankheit")))
+
+        thesis.title = "Neuer Titel"
+        thesis.save()
+
+        self.assertEqual([], list(Thesis.objects.search("alter")))
+        self.assertEqual([thesis], list(Thesis.objects.search("neuer")))
+
+        thesis.delete()
+
+        self.assertEqual([], list(Thesis.objects.search("neuer")))
+
+    def test_results_are_ranked(self):
+        once = self.create("Cloud Computing im Mittelstand")
+        twice = self.create("Cloud zu Cloud Migration")
+
+        results = Thesis.objects.search("cloud").order_by("search_rank")
+
+        self.assertEqual([twice, once], list(results))
+
+    def test_index_is_matched_once_per_query(self):
+        self.create("Cloud Computing im Mittelstand")
+
+        with self.assertNumQueries(1) as queries:
+            list(Thesis.objects.search("cloud").filter(search_rank__gt=-100).order_by("search_rank"))
+
+        self.assertEqual(1, queries.captured_queries[0]["sql"].count("MATCH"))
+
+    def test_search_in_subquery(self):
+        thesis = self.create("Cloud Computing im Mittelstand")
+        self.create("Maschinelles Lernen")
+
+        matches = Thesis.objects.search("cloud").values("id")
+
+        self.assertEqual([thesis], list(Thesis.objects.filter(id__in=matches)))
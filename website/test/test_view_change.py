@@ -1,9 +1,11 @@
 from django.urls import reverse
 
+from unittest import mock
+
 from datetime import date
 import uuid
 
-from website.models import Thesis
+from website.models import Thesis, ThesisChanged
 from website.test.test import LoggedInTestCase, ThesisStub
 
 
@@ -140,4 +142,22 @@ class ViewChangeTests(LoggedInTestCase):
             reverse('change', args=[thesis.surrogate_key]), new_values)
 
         self.assertEqual(200, response.status_code)
-        self.assertEqual("IB", thesis.thesis_program)
\ No newline at end of file
+        self.assertEqual("IB", thesis.thesis_program)
+
+    def test_conflict_if_thesis_was_changed(self):
+        thesis = ThesisStub.applied(self.supervisor)
+        thesis.save()
+
+        new_values = {
+            'title': 'Ein ganz anderer Titel',
+            'begin_date': date(2019, 1, 30),
+            'due_date': date(2019, 4, 30),
+        }
+
+        # changed by someone else after the page was loaded
+        with mock.patch.object(Thesis, '_transition', side_effect=ThesisChanged):
+            response = self.client.post(
+                reverse('change', args=[thesis.surrogate_key]), new_values)
+
+        self.assertEqual(409, response.status_code)
+        self.assertTrue(response.context["form"].non_field_errors())
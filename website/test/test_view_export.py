@@ -0,0 +1,89 @@
+import io
+import subprocess
+import zipfile
+
+from datetime import date
+from unittest import mock
+
+from django.urls import reverse
+
+from website.models import *
+from website.test.test import LoggedInTestCase, TemporaryPDFMixin, ThesisStub, fake_pdftk
+
+
+@mock.patch("thesispool.pdf_engine.subprocess.run", side_effect=fake_pdftk)
+class ViewExportTests(TemporaryPDFMixin, LoggedInTestCase):
+
+    def export(self, **params):
+        response = self.client.get(reverse('export_pdfs'), params)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("application/zip", response['Content-Type'])
+
+        return zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+
+    def test_export_contains_requested_forms_of_all_theses(self, run):
+        ThesisStub.small(self.supervisor)
+
+        archive = self.export(forms=["application", "grading"])
+        names = archive.namelist()
+
+        # only the graded thesis gets a grading form
+        self.assertEqual(4, len(names))
+        self.assertEqual(4, len(set(names)))
+        self.assertEqual(3, len([name for name in names if "_ausgabe_123456" in name]))
+        self.assertEqual(1, len([name for name in names if "_bewertung_123456" in name]))
+        self.assertIn(b"Eine weitere Thesis", b"".join(archive.read(name) for name in names))
+
+    def test_export_uses_overview_filters(self, run):
+        ThesisStub.small(self.supervisor)
+
+        other_supervisor = Supervisor(first_name="Peter", last_name="Müller", id="p.mueller")
+        other_supervisor.save()
+        ThesisStub.applied(other_supervisor).save()
+
+        archive = self.export(forms="grading", status=Thesis.GRADED)
+
+        self.assertEqual(1, len(archive.namelist()))
+        self.assertIn(b"Eine weitere Thesis", archive.read(archive.namelist()[0]))
+
+    def test_failed_renders_are_listed(self, run):
+        ThesisStub.small(self.supervisor)
+        run.side_effect = None
+        run.return_value = subprocess.CompletedProcess([], 1, stdout=b"", stderr=b"Error")
+
+        archive = self.export(forms="application")
+
+        self.assertEqual(["FEHLER.txt"], archive.namelist())
+        self.assertEqual(3, len(archive.read("FEHLER.txt").splitlines()))
+
+    def test_no_forms_selected(self, run):
+        response = self.client.get(reverse('export_pdfs'), {"forms": "unknown"})
+
+        self.assertEqual(400, response.status_code)
+        run.assert_not_called()
+
+    def test_prolonged_thesis_without_hand_in(self, run):
+        thesis = ThesisStub.applied(self.supervisor)
+        thesis.status = Thesis.PROLONGED
+        thesis.prolongation_date = date(2018, 3, 30)
+        thesis.prolongation_reason = "Krankheit"
+        thesis.prolongation_weeks = 8
+        thesis.save()
+
+        archive = self.export(forms=["application", "prolongation", "grading"])
+        names = archive.namelist()
+
+        self.assertEqual(2, len(names))
+        self.assertEqual(1, len([name for name in names if "_ausgabe_987654" in name]))
+        self.assertEqual(1, len([name for name in names if "_verlaengerung_987654" in name]))
+
+    def test_unexpected_errors_are_listed(self, run):
+        ThesisStub.small(self.supervisor)
+
+        with mock.patch("thesispool.pdf.AbstractPDF._values", side_effect=AttributeError("kaputt")):
+            archive = self.export(forms="application")
+
+        self.assertEqual(["FEHLER.txt"], archive.namelist())
+        self.assertEqual(3, len(archive.read("FEHLER.txt").splitlines()))
+        self.assertIn(b"kaputt", archive.read("FEHLER.txt"))
@@ -178,3 +178,19 @@ class ViewFindStudentTests(TestCase):
         self.assertEqual(200, response.status_code)
         self.assertFalse(response.context["s_form"].is_valid())
         self.assertEqual(1, Student.objects.count())
+
+    def test_bulk_lookup(self):
+        response = self.client.post(
+            reverse('find_student'), {'student_ids': '123456\n000999, 123456'})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([(123456, self.student), (999, None)], response.context['lookup'])
+        self.assertIn("Petermann", str(response.content))
+
+    def test_bulk_lookup_rejects_invalid_input(self):
+        response = self.client.post(
+            reverse('find_student'), {'student_ids': '123456 abc'})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([], response.context['lookup'])
+        self.assertFalse(response.context['b_form'].is_valid())
@@ -5,6 +5,7 @@ from django.urls import reverse
 from datetime import date
 from decimal import Decimal
 import uuid
+from unittest import mock
 
 from website.test.test import LoggedInTestCase, ThesisStub
 from website.models import *
@@ -229,3 +230,28 @@ class ViewGradeTests(LoggedInTestCase):
         thesis = Thesis.objects.get(surrogate_key=thesis.surrogate_key)
 
         self.assertEqual(Thesis.APPLIED, thesis.status)
+
+    def test_conflicting_grade_does_not_hand_in(self):
+        thesis = ThesisStub.applied(self.supervisor)
+
+        thesis.save()
+
+        post_data = {
+            'assessor': thesis.assessor,
+            'examination_date': date(2019, 3, 1),
+            'grade': Decimal("1.3"),
+            'assessor_grade': Decimal("1.7"),
+            'handed_in_date': date(2019, 2, 1)
+        }
+
+        # graded by someone else after the thesis was handed in
+        with mock.patch.object(Thesis, 'assign_grade', side_effect=ThesisChanged):
+            response = self.client.post(
+                reverse('grade', args=[thesis.surrogate_key]), post_data)
+
+        thesis = Thesis.objects.get(id=thesis.id)
+
+        self.assertEqual(409, response.status_code)
+        self.assertTrue(response.context["form"].non_field_errors())
+        self.assertIsNone(thesis.handed_in_date)
+        self.assertEqual(Thesis.APPLIED, thesis.status)
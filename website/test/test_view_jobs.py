@@ -0,0 +1,87 @@
+import io
+import os
+import zipfile
+
+from unittest import mock
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from website.models import *
+from website.test.test import LoggedInTestCase, TemporaryPDFMixin, ThesisStub, fake_pdftk
+
+
+@mock.patch("thesispool.pdf_engine.subprocess.run", side_effect=fake_pdftk)
+class ViewJobsTests(TemporaryPDFMixin, LoggedInTestCase):
+
+    def pdf_settings(self, directory):
+        return dict(super(ViewJobsTests, self).pdf_settings(directory),
+                    RENDER_JOBS={'DIR': os.path.join(directory, 'jobs'), 'EXPIRE_AFTER': 3600})
+
+    def work(self):
+        call_command('run_render_jobs', '--once', stdout=io.StringIO())
+
+    def test_export_job(self, run):
+        ThesisStub.small(self.supervisor)
+
+        response = self.client.post(reverse('create_job'), {"kind": "export", "forms": "application",
+                                                            "status": Thesis.GRADED})
+        self.assertEqual(202, response.status_code)
+        job = response.json()
+
+        self.assertEqual("queued", job['status'])
+        self.assertEqual(409, self.client.get(reverse('job_download', args=[job['id']])).status_code)
+
+        self.work()
+
+        status = self.client.get(job['status_url']).json()
+        self.assertEqual("done", status['status'])
+        self.assertEqual(1, status['done'])
+        self.assertEqual(1, status['total'])
+
+        response = self.client.get(status['download_url'])
+        self.assertEqual(200, response.status_code)
+
+        with open(RenderJob.objects.get(key=job['id']).path, "rb") as f:
+            archive = zipfile.ZipFile(f)
+            self.assertEqual(1, len(archive.namelist()))
+            self.assertIn(b"Eine weitere Thesis", archive.read(archive.namelist()[0]))
+
+    def test_dossier_job(self, run):
+        thesis = ThesisStub.applied(self.supervisor)
+        thesis.save()
+
+        job = self.client.post(reverse('create_job'), {"kind": "dossier",
+                                                       "key": thesis.surrogate_key}).json()
+        self.work()
+
+        status = self.client.get(job['status_url']).json()
+        self.assertEqual("done", status['status'])
+        self.assertTrue(RenderJob.objects.get(key=job['id']).path.startswith(
+            os.path.join(self.tmp.name, 'jobs')))
+
+    def test_failed_job(self, run):
+        job = self.client.post(reverse('create_job'), {"kind": "export", "forms": "grading"}).json()
+
+        with mock.patch("website.jobs.PDFExport", side_effect=OSError("disk full")):
+            self.work()
+
+        status = self.client.get(job['status_url']).json()
+        self.assertEqual("failed", status['status'])
+        self.assertEqual("disk full", status['error'])
+        self.assertNotIn('download_url', status)
+
+    def test_invalid_jobs(self, run):
+        self.assertEqual(400, self.client.post(reverse('create_job'), {"kind": "export"}).status_code)
+        self.assertEqual(400, self.client.post(reverse('create_job'), {"kind": "other"}).status_code)
+        self.assertEqual(404, self.client.post(reverse('create_job'), {"kind": "dossier",
+                                                                       "key": "nope"}).status_code)
+        self.assertEqual(405, self.client.get(reverse('create_job')).status_code)
+
+    def test_jobs_of_other_users_are_hidden(self, run):
+        other = User(username="other", password="pass")
+        other.save()
+        job = RenderJob.objects.create(user=other, kind=RenderJob.EXPORT, params={})
+
+        self.assertEqual(404, self.client.get(reverse('job_status', args=[job.key])).status_code)
+        self.assertEqual(404, self.client.get(reverse('job_download', args=[job.key])).status_code)
@@ -1,3 +1,6 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from datetime import date
@@ -156,3 +159,127 @@ class ViewOverviewTests(LoggedInTestCase):
 
             self.assertEqual(200, response.status_code)
             self.assertEqual(1, len(response.context["theses"]))
+
+    def test_number_of_queries_does_not_depend_on_number_of_theses(self):
+        self.user.is_secretary = True
+        self.user.save()
+
+        ThesisStub.applied(self.supervisor).save()
+
+        with CaptureQueriesContext(connection) as single:
+            self.client.get(reverse('overview'))
+
+        ThesisStub.small(self.supervisor)
+
+        with CaptureQueriesContext(connection) as multiple:
+            response = self.client.get(reverse('overview'))
+
+        self.assertEqual(4, len(response.context["theses"]))
+        self.assertEqual(len(single), len(multiple))
+
+    def test_sort_by_student(self):
+        theses = ThesisStub.small(self.supervisor)
+        other = ThesisStub.applied(self.supervisor)
+        other.save()
+
+        response = self.client.get(reverse('overview'), {"sort_by": "student"})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([other] + theses, list(response.context["theses"]))
+
+        response = self.client.get(reverse('overview'), {"sort_by": "r_student"})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(theses[::-1] + [other], list(response.context["theses"]))
+
+    def test_sort_by_assessor_puts_theses_without_assessor_last(self):
+        theses = ThesisStub.small(self.supervisor)
+        theses[1].assessor = None
+        theses[1].save()
+        other = ThesisStub.applied(self.supervisor)
+        other.save()
+
+        response = self.client.get(reverse('overview'), {"sort_by": "assessor"})
+
+        self.assertEqual([theses[0], theses[2], other, theses[1]],
+                         list(response.context["theses"]))
+
+        response = self.client.get(reverse('overview'), {"sort_by": "r_assessor"})
+
+        self.assertEqual([other, theses[2], theses[0], theses[1]],
+                         list(response.context["theses"]))
+
+    def test_sort_by_due_date(self):
+        theses = ThesisStub.small(self.supervisor)
+
+        response = self.client.get(reverse('overview'), {"sort_by": "due_date"})
+
+        self.assertEqual([theses[2], theses[0], theses[1]],
+                         list(response.context["theses"]))
+
+    def test_unknown_sort_parameter_is_ignored(self):
+        ThesisStub.small(self.supervisor)
+
+        response = self.client.get(reverse('overview'), {"sort_by": "student__password"})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, len(response.context["theses"]))
+
+    @override_settings(OVERVIEW_PAGE_SIZE=2)
+    def test_pages_keep_filter_and_sort_parameters(self):
+        theses = ThesisStub.small(self.supervisor)
+
+        response = self.client.get(reverse('overview'), {"title": "Thesis", "sort_by": "due_date"})
+
+        self.assertEqual([theses[2], theses[0]], list(response.context["theses"]))
+        self.assertIsNone(response.context["previous_url"])
+        self.assertIn("title=Thesis", response.context["next_url"])
+        self.assertIn("sort_by=due_date", response.context["next_url"])
+
+        response = self.client.get(reverse('overview') + response.context["next_url"])
+
+        self.assertEqual([theses[1]], list(response.context["theses"]))
+        self.assertIsNone(response.context["next_url"])
+
+        response = self.client.get(reverse('overview') + response.context["previous_url"])
+
+        self.assertEqual([theses[2], theses[0]], list(response.context["theses"]))
+        self.assertIsNone(response.context["previous_url"])
+
+    def test_invalid_cursor_shows_first_page(self):
+        ThesisStub.small(self.supervisor)
+
+        response = self.client.get(reverse('overview'), {"cursor": "kaputt"})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, len(response.context["theses"]))
+
+    @override_settings(OVERVIEW_PAGE_SIZE=1)
+    def test_title_search_results_are_paged_by_relevance(self):
+        theses = ThesisStub.small(self.supervisor)
+
+        seen = []
+        response = self.client.get(reverse('overview'), {"title": "thesis"})
+        seen.extend(response.context["theses"])
+
+        while response.context["next_url"]:
+            response = self.client.get(reverse('overview') + response.context["next_url"])
+            seen.extend(response.context["theses"])
+
+        self.assertEqual(sorted(theses, key=lambda t: t.id), sorted(seen, key=lambda t: t.id))
+
+    def test_search_student_and_assessor_ignore_umlauts(self):
+        thesis = ThesisStub.applied(self.supervisor)
+        thesis.student.last_name = "Längle"
+        thesis.student.save()
+        thesis.save()
+
+        for name in ["längle", "Laengle", "Langle", "Larry Lä"]:
+            response = self.client.get(reverse('overview'), {"student": name})
+
+            self.assertEqual(1, len(response.context["theses"]))
+
+        for name in ["Larry Schmidt", "Hansi Längle"]:
+            response = self.client.get(reverse('overview'), {"student": name})
+
+            self.assertEqual(0, len(response.context["theses"]))
@@ -2,11 +2,12 @@
 # -*- coding: utf-8 -*-
 from django.urls import reverse
 
-from website.models import Thesis
+from website.models import Thesis, ThesisChanged
 from website.test.test import LoggedInTestCase, ThesisStub
 
 import uuid
 from datetime import timedelta, date
+from unittest import mock
 
 
 class ViewProlongationTests(LoggedInTestCase):
@@ -172,3 +173,49 @@ class ViewProlongationTests(LoggedInTestCase):
         self.assertEqual(first_prolongation, initial_due_date)
         self.assertEqual(first_prolongation + timedelta(30),
                          initial_prolongation)
+
+    def test_conflicting_prolongation(self):
+        thesis = ThesisStub.applied(self.supervisor)
+
+        thesis.begin_date = date(2018, 1, 1)
+        thesis.due_date = date(2018, 3, 30)
+
+        thesis.save()
+
+        post_data = {
+            'prolongation_date': thesis.due_date + timedelta(30),
+            'due_date': thesis.due_date,
+            'reason': 'I was sick',
+            'weeks': 4
+        }
+
+        # changed by someone else after the page was loaded
+        with mock.patch.object(Thesis, '_transition', side_effect=ThesisChanged):
+            response = self.client.post(
+                reverse('prolong', args=[thesis.surrogate_key]), post_data)
+
+        self.assertEqual(409, response.status_code)
+        self.assertTrue(response.context["form"].non_field_errors())
+
+    def test_handed_in_thesis_is_not_prolonged(self):
+        thesis = ThesisStub.applied(self.supervisor)
+
+        thesis.begin_date = date(2018, 1, 1)
+        thesis.due_date = date(2018, 3, 30)
+        thesis.handed_in_date = date(2018, 3, 1)
+        thesis.status = Thesis.HANDED_IN
+
+        thesis.save()
+
+        post_data = {
+            'prolongation_date': thesis.due_date + timedelta(30),
+            'due_date': thesis.due_date,
+            'reason': 'I was sick',
+            'weeks': 4
+        }
+
+        response = self.client.post(
+            reverse('prolong', args=[thesis.surrogate_key]), post_data)
+
+        self.assertEqual(302, response.status_code)
+        self.assertIsNone(Thesis.objects.get(id=thesis.id).prolongation_date)
@@ -30,6 +30,16 @@ urlpatterns = [
             login_required(views.PdfView.as_view()),
             {"type": GradingPDF},
             name='grading_pdf'),
+    re_path(r'download/dossier/(?P<key>[0-9a-f\-]+)',
+            login_required(views.PdfView.as_view()),
+            {"type": DossierPDF},
+            name='dossier_pdf'),
+    path('download/export/', login_required(views.ExportView.as_view()),
+         name='export_pdfs'),
+    path('jobs/', views.create_job, name='create_job'),
+    path('jobs/<uuid:key>/', views.job_status, name='job_status'),
+    path('jobs/<uuid:key>/download/', views.job_download, name='job_download'),
+    path('download/metrics/', views.pdf_metrics, name='pdf_metrics'),
     re_path(r'prolong/(?P<key>[0-9a-f\-]+)', views.prolong, name="prolong"),
     re_path(r'grade/(?P<key>[0-9a-f\-]+)', views.grade, name="grade"),
     re_path(r'change/delete/(?P<key>[0-9a-f\-]+)',
@@ -1,11 +1,13 @@
-import operator
-
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
 from django.views import View
-from django.http import HttpResponseRedirect
+from django.conf import settings
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseRedirect, \
+    JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, reverse, get_object_or_404
 from django.urls import reverse_lazy
 
@@ -13,9 +15,18 @@ from django_sendfile import sendfile
 
 from website.forms import *
 from website.models import *
+from website.directory import supervisor_directory
+from website.paginator import KeysetPaginator
+from website.queries import query_budget
+from thesispool.export import PDFExport
+from thesispool.pdf import PDF_TYPES
+from thesispool.render import RenderUnavailable, render_executor
+from thesispool.scratch import scratch_space
 
 from django.contrib.auth.views import LoginView
 
+from datetime import datetime
+
 User = get_user_model()
 
 
@@ -41,7 +52,15 @@ def prolong(request, key):
             prolongation_date = form.cleaned_data["prolongation_date"]
             weeks = form.cleaned_data["weeks"]
 
-            thesis.prolong(prolongation_date, reason, weeks)
+            try:
+                thesis.prolong(prolongation_date, reason, weeks)
+            except ThesisChanged:
+                thesis.refresh_from_db()
+                form.add_error(None, CONFLICT_MESSAGE)
+
+                return render(request, 'website/prolong.html',
+                              {'thesis': thesis, 'form': form}, status=409)
+
             return HttpResponseRedirect(reverse('overview'))
 
     else:
@@ -60,7 +79,14 @@ def grade(request, key):
     if request.POST:
         form = GradeForm(request.POST)
         if form.is_valid():
-            form.persist(thesis)
+            try:
+                form.persist(thesis)
+            except ThesisChanged:
+                thesis.refresh_from_db()
+                form.add_error(None, CONFLICT_MESSAGE)
+
+                return render(request, 'website/grade.html',
+                              {'thesis': thesis, 'form': form}, status=409)
 
             return HttpResponseRedirect(reverse('overview'))
     else:
@@ -72,89 +98,92 @@ def grade(request, key):
 
 
 class Overview(View):
-
-    @method_decorator(never_cache)
-    def get(self, request, *args, **kwargs):
-        if request.user.is_secretary or request.user.is_head:
-            theses = Thesis.objects.all()
+    # columns to sort by for each value of the sort_by parameter,
+    # students and assessors are ordered by surname
+    ORDERINGS = {
+        "due_date": "due_date",
+        "status": "status",
+        "student": "student__last_name",
+        "title": "title",
+        "assessor": "assessor__last_name",
+    }
+
+    DEFAULT_ORDERING = [("status", False), ("due_date", False), ("id", False)]
+    RANKED_ORDERING = [("search_rank", False), ("id", False)]
+
+    def ordering(self, sort_by, ranked=False):
+        """Translate sort_by into (column, descending) pairs, "r_" as prefix
+        reverses the order. Theses without assessor are always ordered at
+        the back, ties are broken by id to keep the order stable.
+        Without sort_by, search results are ordered by relevance."""
+        to_reverse = sort_by.startswith("r_")
+        if to_reverse:
+            sort_by = sort_by[len("r_"):]
+
+        if sort_by not in self.ORDERINGS:
+            return self.RANKED_ORDERING if ranked else self.DEFAULT_ORDERING
+
+        return [(self.ORDERINGS[sort_by], to_reverse), ("id", to_reverse)]
+
+    def page_url(self, request, cursor):
+        """URL of another page keeping all filter and sort parameters"""
+        if cursor is None:
+            return None
+
+        params = request.GET.copy()
+        params["cursor"] = cursor
+
+        return "?" + params.urlencode()
+
+    def filter(self, user, params):
+        """Theses visible to the user, filtered by the search parameters"""
+        if user.is_secretary or user.is_head:
+            theses = Thesis.objects.with_relations()
         else:
-            theses = Thesis.objects.for_supervisor(request.user.username)
+            theses = Thesis.objects.with_relations().for_supervisor(
+                user.username)
 
-        if "due_date" in request.GET and request.GET["due_date"] != "":
-            if "." in request.GET["due_date"]:
-                month, year = request.GET["due_date"].split(".")
+        if "due_date" in params and params["due_date"] != "":
+            if "." in params["due_date"]:
+                month, year = params["due_date"].split(".")
                 bound_lower = year + "-" + month + "-" + "01"
                 bound_upper = year + "-" + str(int(month) + 1) + "-" + "01"
             else:
-                year = request.GET["due_date"]
+                year = params["due_date"]
                 bound_lower = year + "-" + "01" + "-" + "01"
                 bound_upper = str(int(year) + 1) + "-" + "01" + "-" + "01"
             theses = theses.filter(due_date__gte=bound_lower, due_date__lt=bound_upper)
 
-        if "status" in request.GET and request.GET["status"] != "":
-            theses = theses.filter(status=request.GET["status"])
+        if "status" in params and params["status"] != "":
+            theses = theses.filter(status=params["status"])
 
-        if "title" in request.GET and request.GET["title"] != "":
-            theses = theses.filter(title__contains=request.GET["title"])
+        if "title" in params and params["title"] != "":
+            theses = theses.search(params["title"], column="title")
 
-        # parameters: id, first_name and/or last_name
-        if "student" in request.GET and request.GET["student"] != "":
-            if True in [char.isdigit() for char in request.GET["student"]]:
-                students_with_id = Student.objects.filter(id__startswith=request.GET["student"])
-            else:
-                # following code based on assumption: no spaces in surnames
-                if " " in request.GET["student"]:
-                    students_name, students_surname = request.GET["student"].rsplit(" ", 1)
-                    students_with_name = Student.objects.filter(
-                        first_name__startswith=students_name)
-                    students_with_surname = Student.objects.filter(
-                        last_name__startswith=students_name)
-                else:
-                    students_with_name = Student.objects.filter(
-                        first_name__startswith=request.GET["student"])
-                    students_with_surname = Student.objects.filter(
-                        last_name__startswith=request.GET["student"])
-                students_with_id = [students.id for students in students_with_name or students_with_surname]
-
-            theses = theses.filter(student__in=students_with_id)
-
-        # parameters: first_name and/or last_name
-        if "assessor" in request.GET and request.GET["assessor"] != "":
-            if " " in request.GET["assessor"]:
-                assessor_name, assessor_surname = request.GET["assessor"].rsplit(" ", 1)
-                assessors_with_name = Assessor.objects.filter(
-                    first_name__startswith=assessor_name)
-                assessors_with_surname = Assessor.objects.filter(
-                    last_name__startswith=assessor_surname)
-            else:
-                assessors_with_name = Assessor.objects.filter(
-                    first_name__startswith=request.GET["assessor"])
-                assessors_with_surname = Assessor.objects.filter(
-                    last_name__startswith=request.GET["assessor"])
-            theses = theses.filter(
-                assessor__in=[assessor.id for assessor in assessors_with_name or assessors_with_surname])
-
-        if "sort_by" in request.GET and request.GET["sort_by"] != "":
-            sort_by = request.GET["sort_by"]
-            to_reverse = False
-            if "r_" in sort_by:
-                sort_by = sort_by.split("r_")[1]
-                to_reverse = True
-            # students are ordered by surname
-            if sort_by == "student":
-                theses = sorted(theses, key=operator.attrgetter("student.last_name"))
-            # assessors are ordered by surname, theses with no assessors are ordered at the back
-            elif sort_by == "assessor":
-                theses_has_assessor = sorted(theses.exclude(assessor=None),
-                                             key=operator.attrgetter("assessor.last_name"))
-                theses = theses_has_assessor + list(theses.filter(assessor=None))
-            else:
-                theses = theses.order_by(sort_by)
+        # parameters: id, first_name and/or last_name (or their prefixes)
+        if "student" in params and params["student"] != "":
+            theses = theses.filter(student__in=SearchToken.objects.matching(
+                SearchToken.STUDENT, params["student"]))
+
+        # parameters: first_name and/or last_name (or their prefixes)
+        if "assessor" in params and params["assessor"] != "":
+            theses = theses.filter(assessor__in=SearchToken.objects.matching(
+                SearchToken.ASSESSOR, params["assessor"]))
 
-            if to_reverse:
-                theses = theses[::-1]
+        return theses
 
-        context = {"theses": theses,
+    @method_decorator(never_cache)
+    @method_decorator(query_budget())
+    def get(self, request, *args, **kwargs):
+        theses = self.filter(request.user, request.GET)
+        ordering = self.ordering(request.GET.get("sort_by", ""),
+                                 ranked=request.GET.get("title", "") != "")
+        paginator = KeysetPaginator(theses, ordering, settings.OVERVIEW_PAGE_SIZE)
+        page = paginator.page(request.GET.get("cursor"))
+
+        context = {"theses": page,
+                   "next_url": self.page_url(request, page.next_cursor),
+                   "previous_url": self.page_url(request, page.previous_cursor),
                    "sort_by": request.GET["sort_by"] if "sort_by" in request.GET else "",
                    "due_date": request.GET["due_date"] if "due_date" in request.GET else "",
                    "status": request.GET["status"] if "status" in request.GET else "",
@@ -165,6 +194,42 @@ class Overview(View):
         return render(request, 'website/overview.html', context)
 
 
+class ExportView(Overview):
+    # values of the forms parameter
+    FORMS = PDF_TYPES
+
+    def pdf_types(self, params):
+        return [pdf_type for name, pdf_type in self.FORMS.items()
+                if name in params.getlist("forms")]
+
+    def theses(self, user, params):
+        """Theses matching the Overview filters, in the Overview order"""
+        ordering = self.ordering(params.get("sort_by", ""),
+                                 ranked=params.get("title", "") != "")
+
+        return self.filter(user, params).order_by(
+            *[("-" if descending else "") + column for column, descending in ordering])
+
+    @staticmethod
+    def filename():
+        return "{0}_formulare.zip".format(datetime.now().strftime("%Y%m%d"))
+
+    @method_decorator(never_cache)
+    def get(self, request, *args, **kwargs):
+        """Stream a ZIP with the requested forms of all theses matching the
+        Overview filters"""
+        pdf_types = self.pdf_types(request.GET)
+
+        if not pdf_types:
+            return HttpResponseBadRequest("No forms selected", content_type="text/plain")
+
+        response = StreamingHttpResponse(PDFExport(self.theses(request.user, request.GET), pdf_types),
+                                         content_type="application/zip")
+        response['Content-Disposition'] = 'attachment; filename="{0}"'.format(self.filename())
+
+        return response
+
+
 class PdfView(View):
     type = None
 
@@ -182,7 +247,91 @@ class PdfView(View):
         thesis = Thesis.objects.get(surrogate_key=kwargs["key"])
         pdf_type = kwargs["type"]
 
-        return self.send(request, pdf_type(thesis).get())
+        try:
+            return self.send(request, pdf_type(thesis).get())
+        except RenderUnavailable as e:
+            return unavailable(e)
+
+
+def unavailable(error):
+    """503 asking the client to retry once rendering capacity is free"""
+    response = HttpResponse(str(error), status=503, content_type="text/plain")
+    response['Retry-After'] = str(error.retry_after)
+
+    return response
+
+
+@login_required
+@never_cache
+def pdf_metrics(request):
+    """Render pool and disk use of generated PDFs, for staff"""
+    if not request.user.is_staff:
+        raise PermissionDenied
+
+    return JsonResponse({'render': render_executor.stats(),
+                         'files': scratch_space.stats()})
+
+
+@login_required
+@never_cache
+@require_POST
+def create_job(request):
+    """Queue a render job: kind "export" with the Overview filters and
+    forms, or kind "dossier" with the key of a thesis"""
+    kind = request.POST.get("kind")
+
+    if kind == RenderJob.EXPORT:
+        if not ExportView().pdf_types(request.POST):
+            return HttpResponseBadRequest("No forms selected", content_type="text/plain")
+        params = {"query": request.POST.urlencode()}
+
+    elif kind == RenderJob.DOSSIER:
+        try:
+            thesis = Thesis.objects.get(surrogate_key=request.POST.get("key"))
+        except (Thesis.DoesNotExist, ValidationError):
+            raise Http404("Unknown thesis")
+        params = {"key": str(thesis.surrogate_key)}
+
+    else:
+        return HttpResponseBadRequest("Unknown kind of job", content_type="text/plain")
+
+    job = RenderJob.objects.create(user=request.user, kind=kind, params=params)
+
+    return JsonResponse(job_status_data(job), status=202)
+
+
+@login_required
+@never_cache
+def job_status(request, key):
+    job = get_object_or_404(RenderJob, key=key, user=request.user)
+
+    return JsonResponse(job_status_data(job))
+
+
+@login_required
+@never_cache
+def job_download(request, key):
+    job = get_object_or_404(RenderJob, key=key, user=request.user)
+
+    if not job.is_done():
+        return JsonResponse(job_status_data(job), status=409)
+
+    return sendfile(request, job.path, attachment=True, attachment_filename=job.filename)
+
+
+def job_status_data(job):
+    data = {'id': str(job.key),
+            'kind': job.kind,
+            'status': job.status,
+            'done': job.done,
+            'total': job.total,
+            'error': job.error,
+            'status_url': reverse('job_status', args=[job.key])}
+
+    if job.is_done():
+        data['download_url'] = reverse('job_download', args=[job.key])
+
+    return data
 
 
 class CreateThesis(View):
@@ -228,7 +377,7 @@ class CreateThesis(View):
 
             if s_form.is_valid():
                 s_id = s_form.cleaned_data['supervisors']
-                self.supervisor = Supervisor.objects.fetch_supervisor(s_id)
+                self.supervisor = supervisor_directory.find(s_id)
         else:
             s_form = None
 
@@ -310,7 +459,15 @@ class ChangeView(View):
 
         if form.is_valid() and a_form.is_valid():
             assessor = a_form.cleaned_data["assessor"]
-            form.change_thesis(self.thesis, assessor)
+            try:
+                form.change_thesis(self.thesis, assessor)
+            except ThesisChanged:
+                self.thesis.refresh_from_db()
+                form.add_error(None, CONFLICT_MESSAGE)
+
+                return render(request, 'website/create_or_change.html',
+                              {'form': form, 'a_form': a_form, 'student': self.thesis.student,
+                               'headline': self.headline}, status=409)
 
             return HttpResponseRedirect('/overview/')
 
@@ -359,10 +516,14 @@ class DeleteThesis(View):
 @login_required
 @never_cache
 def find_student(request):
-    student, form = None, None
+    student, form, b_form, lookup = None, None, None, None
 
     if request.method == 'POST':
-        if request.POST.getlist('student_id') not in ([''], []):
+        if 'student_ids' in request.POST:
+            b_form = BulkStudentLookupForm(request.POST)
+            lookup = b_form.lookup()
+
+        elif request.POST.getlist('student_id') not in ([''], []):
             form = CheckStudentIdForm(request.POST)
 
             if form.is_valid():
@@ -375,6 +536,10 @@ def find_student(request):
 
     s_form = StudentForm()
 
-    context = {'form': form or CheckStudentIdForm(), 'student': student, 's_form': s_form}
+    context = {'form': form or CheckStudentIdForm(),
+               'student': student,
+               's_form': s_form,
+               'b_form': b_form or BulkStudentLookupForm(),
+               'lookup': lookup}
 
     return render(request, 'website/find_student.html', context)